@@ -0,0 +1,163 @@
+"""
+HTTP client for the Streamlit front end - one pooled keep-alive session per process, timeouts,
+retries for idempotent requests, and a short-lived per-user cache of GET responses
+"""
+
+import threading
+import time
+from typing import Any, Hashable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+class RequestStats:
+    """Counts what one Streamlit script run asked the API for"""
+
+    def __init__(self):
+        self.requests = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def __str__(self):
+        return (f"{self.requests} API requests ({self.elapsed * 1000:.0f} ms), "
+                f"{self.cache_hits} served from cache, {self.errors} errors")
+
+
+class ApiClient:
+    """Calls the FastAPI backend and returns (data, error) pairs like the app always has
+
+    GET responses are cached per user for cache_ttl seconds; a successful write by a user
+    drops that user's cached responses, so they always see their own changes.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: tuple[float, float] = (3.05, 15),
+        retries: int = 2,
+        backoff: float = 0.3,
+        pool_size: int = 10,
+        cache_ttl: float = 30,
+        cache_max_entries: int = 1000
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self._cache: dict[tuple[Hashable, str], tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+        # Retry connection failures and gateway errors, but never re-send a POST - it may have been applied
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "PUT", "DELETE"}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _cached(self, key: tuple[Hashable, str]) -> Optional[Any]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at < time.monotonic():
+                del self._cache[key]
+                return None
+            return data
+
+    def _store(self, key: tuple[Hashable, str], data: Any) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+            self._cache[key] = (time.monotonic() + self.cache_ttl, data)
+            if len(self._cache) > self.cache_max_entries:
+                now = time.monotonic()
+                for stale in [k for k, (expires_at, _) in self._cache.items() if expires_at < now]:
+                    del self._cache[stale]
+                # Still full: drop the oldest entries (dicts keep insertion order)
+                while len(self._cache) > self.cache_max_entries:
+                    del self._cache[next(iter(self._cache))]
+
+    def invalidate(self, user_key: Hashable) -> None:
+        """Forget one user's cached responses"""
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == user_key]:
+                del self._cache[key]
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[dict] = None,
+        token: Optional[str] = None,
+        user_key: Hashable = None,
+        stats: Optional[RequestStats] = None,
+        use_cache: bool = True
+    ) -> tuple[Optional[Any], Optional[str], int]:
+        """Send a request; returns (data, error, status code), where status 0 means no response"""
+        method = method.upper()
+        cache_key = (user_key, endpoint)
+        if method == "GET" and use_cache:
+            cached = self._cached(cache_key)
+            if cached is not None:
+                if stats:
+                    stats.cache_hits += 1
+                return cached, None, 200
+
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, f"{self.base_url}{endpoint}", json=data, headers=headers, timeout=self.timeout
+            )
+        except requests.exceptions.ConnectionError:
+            return self._failed(stats, "Cannot connect to API. Make sure the FastAPI server is running.")
+        except requests.exceptions.Timeout:
+            return self._failed(stats, "The API took too long to respond. Please try again.")
+        except requests.exceptions.RequestException as e:
+            return self._failed(stats, str(e))
+        finally:
+            if stats:
+                stats.requests += 1
+                stats.elapsed += time.perf_counter() - start
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+
+        if response.status_code != 200:
+            if stats:
+                stats.errors += 1
+            detail = body.get("detail", "Unknown error") if isinstance(body, dict) else response.reason
+            return None, detail, response.status_code
+
+        if method == "GET" and use_cache:
+            self._store(cache_key, body)
+        elif method in WRITE_METHODS:
+            self.invalidate(user_key)
+        return body, None, response.status_code
+
+    def _failed(self, stats: Optional[RequestStats], message: str):
+        if stats:
+            stats.errors += 1
+        return None, message, 0
+
+    def close(self) -> None:
+        self.session.close()
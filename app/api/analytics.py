@@ -0,0 +1,58 @@
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import get_async_db
+from app.dependencies import check_mentor_access, get_current_user, mentor_scope, require_admin
+from app.schemas.analytics import MentorSubmissionAnalytics, MissingReports, SubmissionAnalytics
+from app.schemas.users import UserResponse
+from app.services.analytics_service import get_mentor_submission_analytics_async, get_submission_analytics_async
+from app.services.missing_reports_service import find_missing_reports_async
+from app.utils.helpers import parse_iso_week
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+@router.get("/mentors/{mentor_id}", response_model=MentorSubmissionAnalytics)
+async def get_mentor_submission_analytics(
+    mentor_id: int,
+    year: Optional[int] = Query(None, ge=1, le=9999, description="ISO year; defaults to the current one"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Per-quarter submission rate, lateness and streaks of a mentor's mentees, from the rollups"""
+    check_mentor_access(current_user, mentor_id)
+    return await get_mentor_submission_analytics_async(db, mentor_id, year=year)
+
+
+@router.get("/submissions", response_model=SubmissionAnalytics)
+async def get_submission_analytics(
+    group_by: Literal["team", "office"] = Query("team"),
+    year: Optional[int] = Query(None, ge=1, le=9999, description="ISO year; defaults to the current one"),
+    current_user: UserResponse = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Per-quarter submission rate and lateness of every team or office, from the rollups (admins only)"""
+    return await get_submission_analytics_async(db, group_by, year=year)
+
+
+@router.get("/missing-reports", response_model=MissingReports)
+async def get_missing_reports(
+    week_from: Optional[str] = Query(None, description="ISO week, e.g. 2024-W09; defaults to the current week"),
+    week_to: Optional[str] = Query(None, description="Last ISO week of the range; defaults to week_from"),
+    mentor_id: Optional[int] = None,
+    team_name: Optional[str] = None,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Active mentees who haven't submitted for each week of a range, across every mentor for
+    admins; a mentor only sees their own mentees"""
+    mentor_id = mentor_scope(current_user, mentor_id)
+    try:
+        first = parse_iso_week(week_from) if week_from else date.today().isocalendar()[:2]
+        last = parse_iso_week(week_to) if week_to else first
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+    return await find_missing_reports_async(db, first, week_to=last, mentor_id=mentor_id, team_name=team_name)
@@ -1,21 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from models import get_db
-from app.schemas.users import UserCreate, UserLogin, UserResponse
-from app.services.user_service import create_user
-from app.services.auth_service import authenticate_user
+from models import get_async_db
+from app.dependencies import get_current_user
+from app.schemas.users import UserCreate, UserLogin, UserResponse, LoginResponse, TokenResponse, RefreshRequest
+from app.services.user_service import create_user_async
+from app.services.auth_service import login_async, refresh_tokens_async
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=UserResponse)
-async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user (mentor or mentee)"""
-    return create_user(db, user_data)
+    return await create_user_async(db, user_data)
 
 
-@router.post("/login", response_model=UserResponse)
-async def login_user(login_data: UserLogin, db: Session = Depends(get_db)):
-    """Authenticate user login"""
-    return authenticate_user(db, login_data) 
\ No newline at end of file
+@router.post("/login", response_model=LoginResponse)
+async def login_user(login_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    """Authenticate user login and issue access/refresh tokens"""
+    return await login_async(db, login_data)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh_tokens(refresh_data: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """Exchange a refresh token for a new access/refresh token pair"""
+    return await refresh_tokens_async(db, refresh_data.refresh_token)
+
+
+@router.get("/me", response_model=UserResponse)
+async def get_me(current_user: UserResponse = Depends(get_current_user)):
+    """Get the user the access token belongs to"""
+    return current_user
\ No newline at end of file
@@ -0,0 +1,58 @@
+from datetime import date, timedelta
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import get_async_db
+from app.dependencies import check_mentor_access, get_current_user
+from app.schemas.dashboard import MentorDashboard
+from app.schemas.users import UserResponse
+from app.services.dashboard_service import get_mentor_dashboard_async
+from app.services.digest_service import DIGEST_FORMATS, get_mentor_digest_async
+from app.utils.helpers import etag_matches, make_etag, parse_iso_week
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+@router.get("/mentor/{mentor_id}", response_model=MentorDashboard)
+async def get_mentor_dashboard(
+    mentor_id: int,
+    reports_per_mentee: int = Query(2, ge=1, le=20),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Everything the mentor dashboard shows, in one request"""
+    check_mentor_access(current_user, mentor_id)
+    return await get_mentor_dashboard_async(db, mentor_id, reports_per_mentee=reports_per_mentee)
+
+
+@router.get(
+    "/mentor/{mentor_id}/digest",
+    response_class=Response,
+    responses={
+        200: {"content": {"text/markdown": {}, "text/html": {}}},
+        304: {"description": "Digest unchanged since the ETag in If-None-Match"}
+    }
+)
+async def get_mentor_digest(
+    mentor_id: int,
+    week: Optional[str] = Query(None, description="ISO week, e.g. 2024-W09 (default: last week)"),
+    format: Literal["markdown", "html"] = "markdown",
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """All of a mentor's mentees' reports for a closed week as one Markdown or HTML document"""
+    check_mentor_access(current_user, mentor_id)
+    try:
+        iso_week = parse_iso_week(week) if week else (date.today() - timedelta(weeks=1)).isocalendar()[:2]
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
+    digest = await get_mentor_digest_async(db, mentor_id, iso_week, fmt=format)
+    # Digests never change once built, so their build time identifies them
+    etag = make_etag(f"{mentor_id}:{iso_week[0]}:{iso_week[1]}:{format}:{digest.generated_at.isoformat()}")
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=86400, immutable"}
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(content=digest.content, media_type=DIGEST_FORMATS[format], headers=headers)
@@ -1,15 +1,47 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+import io
+from datetime import date
+from typing import List, Optional
 
-from models import get_db
-from app.schemas.reports import WeeklyReportCreate, WeeklyReportResponse
+from models import get_async_db
+from app.dependencies import (
+    can_read_report,
+    check_mentee_access,
+    check_mentor_access,
+    get_current_user,
+    is_admin,
+    mentor_scope,
+    require_admin
+)
+from app.schemas.reports import (
+    WeeklyReportCreate,
+    WeeklyReportPatch,
+    WeeklyReportResponse,
+    WeeklyReportPage,
+    WeeklyReportSummaryPage,
+    ReportImportResult,
+    ReportSearchPage
+)
+from app.schemas.users import UserResponse
+from app.utils.helpers import etag_matches, if_match_versions, version_etag
+from app.services.import_service import parse_import_rows, import_reports_async
+from app.services.export_service import EXPORT_MEDIA_TYPES, export_statement, parquet_available, stream_export
+from app.services.search_service import SEARCH_FIELDS, search_reports_for_mentor_async
+from app.services.user_service import get_user_by_id_async
 from app.services.report_service import (
-    create_weekly_report,
-    get_latest_reports_for_mentee,
-    get_reports_for_mentor,
-    update_weekly_report,
-    delete_weekly_report
+    create_weekly_report_async,
+    get_latest_reports_for_mentee_async,
+    get_report_for_mentee_week_async,
+    get_reports_for_mentor_async,
+    query_reports_for_mentor_async,
+    query_report_summaries_for_mentor_async,
+    get_reports_by_ids_async,
+    get_report_async,
+    update_weekly_report_async,
+    patch_weekly_report_async,
+    delete_weekly_report_async
 )
 
 router = APIRouter(prefix="/reports", tags=["Weekly Reports"])
@@ -19,35 +51,284 @@ router = APIRouter(prefix="/reports", tags=["Weekly Reports"])
 async def create_report(
     report_data: WeeklyReportCreate, 
     mentee_id: int, 
-    db: Session = Depends(get_db)
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new weekly report (mentees only, for themselves)"""
+    if current_user.id != mentee_id and not is_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Reports can only be created by the mentee"
+        )
+    return await create_weekly_report_async(db, mentee_id, report_data)
+
+
+@router.post("/import", response_model=ReportImportResult)
+async def import_reports(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|jsonl)$", description="Defaults from Content-Type"),
+    batch_size: int = Query(500, ge=1, le=10000),
+    on_conflict: str = Query("skip", pattern="^(skip|update)$"),
+    current_user: UserResponse = Depends(require_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Create a new weekly report (mentees only)"""
-    return create_weekly_report(db, mentee_id, report_data)
+    """Bulk import reports from a CSV or JSONL request body (admins only, as rows name any mentee)"""
+    if format is None:
+        format = "jsonl" if "json" in request.headers.get("content-type", "") else "csv"
+    try:
+        body = (await request.body()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import body must be UTF-8"
+        )
+    
+    rows = parse_import_rows(io.StringIO(body, newline=""), format)
+    return await import_reports_async(db, rows, batch_size=batch_size, on_conflict=on_conflict)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_reports(
+    format: str = Query("csv", pattern="^(csv|jsonl|parquet)$"),
+    mentor_id: Optional[int] = None,
+    team_name: Optional[str] = None,
+    office_location: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    chunk_size: int = Query(1000, ge=1, le=50000),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream reports as CSV, JSONL or Parquet, filtered by mentor, mentee team/office and submission date;
+    mentors export their own mentees' reports, and only admins every mentor's"""
+    mentor_id = mentor_scope(current_user, mentor_id)
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet export requires pyarrow to be installed"
+        )
+    if mentor_id is not None:
+        mentor = await get_user_by_id_async(db, mentor_id)
+        if not mentor or mentor.user_type != "mentor":
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Mentor not found"
+            )
+    
+    stmt = export_statement(mentor_id, team_name, office_location, date_from, date_to)
+    return StreamingResponse(
+        stream_export(db, stmt, format, chunk_size),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="weekly_reports.{format}"'}
+    )
 
 
 @router.get("/mentees/{mentee_id}/latest", response_model=List[WeeklyReportResponse])
-async def get_latest_mentee_reports(mentee_id: int, db: Session = Depends(get_db)):
+async def get_latest_mentee_reports(
+    mentee_id: int,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get the latest 2 reports for a mentee"""
-    return get_latest_reports_for_mentee(db, mentee_id)
+    await check_mentee_access(db, current_user, mentee_id)
+    return await get_latest_reports_for_mentee_async(db, mentee_id)
+
+
+@router.get(
+    "/mentees/{mentee_id}/weeks/{year}/{week_number}",
+    response_model=WeeklyReportResponse,
+    responses={304: {"description": "Report unchanged since the ETag in If-None-Match"}}
+)
+async def get_mentee_week_report(
+    mentee_id: int,
+    year: int = Path(..., ge=1, le=9999),
+    week_number: int = Path(..., ge=1, le=53),
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a mentee's report for a specific ISO week, with conditional GET support"""
+    await check_mentee_access(db, current_user, mentee_id)
+    report = await get_report_for_mentee_week_async(db, mentee_id, year, week_number)
+    body = report.model_dump_json()
+    etag = version_etag(report.id, report.version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/mentors/{mentor_id}", response_model=List[WeeklyReportResponse])
-async def get_mentor_reports(mentor_id: int, db: Session = Depends(get_db)):
+async def get_mentor_reports(
+    mentor_id: int,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get all reports for a mentor's mentees"""
-    return get_reports_for_mentor(db, mentor_id)
+    check_mentor_access(current_user, mentor_id)
+    return await get_reports_for_mentor_async(db, mentor_id)
+
+
+@router.get("/mentors/{mentor_id}/query", response_model=WeeklyReportPage)
+async def query_mentor_reports(
+    mentor_id: int,
+    mentee_id: Optional[int] = None,
+    week_number: Optional[int] = Query(None, ge=1, le=53),
+    year: Optional[int] = Query(None, ge=1, le=9999),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a filtered page of a mentor's reports, newest week first"""
+    check_mentor_access(current_user, mentor_id)
+    return await query_reports_for_mentor_async(
+        db,
+        mentor_id,
+        mentee_id=mentee_id,
+        week_number=week_number,
+        year=year,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        cursor=cursor
+    )
+
+
+@router.get("/mentors/{mentor_id}/summaries", response_model=WeeklyReportSummaryPage)
+async def query_mentor_report_summaries(
+    mentor_id: int,
+    mentee_id: Optional[int] = None,
+    week_number: Optional[int] = Query(None, ge=1, le=53),
+    year: Optional[int] = Query(None, ge=1, le=9999),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    preview: bool = Query(False, description="Add the start of the accomplishments and each field's length"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a filtered page of a mentor's reports without their text, newest week first; fetch
+    the text of the ones opened with GET /reports/{report_id} or /reports/batch"""
+    check_mentor_access(current_user, mentor_id)
+    return await query_report_summaries_for_mentor_async(
+        db,
+        mentor_id,
+        preview=preview,
+        mentee_id=mentee_id,
+        week_number=week_number,
+        year=year,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        cursor=cursor
+    )
+
+
+@router.get("/mentors/{mentor_id}/search", response_model=ReportSearchPage)
+async def search_mentor_reports(
+    mentor_id: int,
+    q: str = Query(..., min_length=1, max_length=200),
+    fields: Optional[List[str]] = Query(None, description=f"Any of {', '.join(SEARCH_FIELDS)}; defaults to all"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search a mentor's reports, best match first, with HTML-escaped excerpts and matches wrapped in <mark>"""
+    check_mentor_access(current_user, mentor_id)
+    return await search_reports_for_mentor_async(db, mentor_id, q, fields=fields, limit=limit, offset=offset)
+
+
+@router.get("/batch", response_model=List[WeeklyReportResponse])
+async def get_reports_batch(
+    ids: List[int] = Query(..., min_length=1, max_length=100),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get several reports with their text in one request, in the order asked for (unknown IDs,
+    and reports the caller can't see, are left out)"""
+    reports = await get_reports_by_ids_async(db, ids)
+    return [report for report in reports if can_read_report(current_user, report)]
+
+
+def _report_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Report not found"
+    )
+
+
+@router.get("/{report_id}", response_model=WeeklyReportResponse)
+async def get_report(
+    report_id: int,
+    response: Response,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get one report with its text, and its version as the ETag for If-Match on PUT/PATCH"""
+    report = await get_report_async(db, report_id)
+    # Someone else's report looks like a missing one, as it does to writes
+    if not can_read_report(current_user, report):
+        raise _report_not_found()
+    response.headers["ETag"] = version_etag(report.id, report.version)
+    return report
 
 
-@router.put("/{report_id}", response_model=WeeklyReportResponse)
+def _owner(current_user: UserResponse) -> Optional[int]:
+    """Whose reports the caller may change: their own, or anyone's for admins"""
+    return None if is_admin(current_user) else current_user.id
+
+
+_IF_MATCH_RESPONSES = {412: {"description": "The report has changed since the version in If-Match"}}
+
+
+@router.put("/{report_id}", response_model=WeeklyReportResponse, responses=_IF_MATCH_RESPONSES)
 async def update_report(
     report_id: int,
     report_data: WeeklyReportCreate,
-    db: Session = Depends(get_db)
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Replace a weekly report's fields (the mentee's own); with If-Match, only if it is still the version read"""
+    report = await update_weekly_report_async(
+        db, report_id, report_data,
+        expected_versions=if_match_versions(if_match, report_id), mentee_id=_owner(current_user)
+    )
+    response.headers["ETag"] = version_etag(report.id, report.version)
+    return report
+
+
+@router.patch("/{report_id}", response_model=WeeklyReportResponse, responses=_IF_MATCH_RESPONSES)
+async def patch_report(
+    report_id: int,
+    changes: WeeklyReportPatch,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Update an existing weekly report"""
-    return update_weekly_report(db, report_id, report_data)
+    """Change only the fields given (week_number and year together) of the mentee's own report;
+    with If-Match, only if it is still the version read"""
+    report = await patch_weekly_report_async(
+        db, report_id, changes,
+        expected_versions=if_match_versions(if_match, report_id), mentee_id=_owner(current_user)
+    )
+    response.headers["ETag"] = version_etag(report.id, report.version)
+    return report
 
 
 @router.delete("/{report_id}")
-async def delete_report(report_id: int, db: Session = Depends(get_db)):
-    """Delete a weekly report"""
-    return delete_weekly_report(db, report_id) 
\ No newline at end of file
+async def delete_report(
+    report_id: int,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete a weekly report (the mentee's own)"""
+    return await delete_weekly_report_async(db, report_id, _owner(current_user)) 
\ No newline at end of file
@@ -1,19 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from models import get_db
+from models import get_async_db
+from app.dependencies import check_mentor_access, get_current_user, is_admin
 from app.schemas.users import UserResponse
-from app.services.user_service import get_user_by_id, get_mentees_for_mentor
+from app.services.user_service import get_user_profile_async, get_mentees_for_mentor_async
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: Session = Depends(get_db)):
-    """Get user profile by ID"""
-    user = get_user_by_id(db, user_id)
-    if not user:
+async def get_user(
+    user_id: int,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get user profile by ID: your own, your mentor's or one of your mentees'"""
+    user = await get_user_profile_async(db, user_id)
+    visible = user is not None and (
+        current_user.id in (user.id, user.mentor_id) or current_user.mentor_id == user.id or is_admin(current_user)
+    )
+    if not visible:
         raise HTTPException(
             status_code=404,
             detail="User not found"
@@ -22,6 +30,11 @@ async def get_user(user_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/mentors/{mentor_id}/mentees", response_model=List[UserResponse])
-async def get_mentees(mentor_id: int, db: Session = Depends(get_db)):
+async def get_mentees(
+    mentor_id: int,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get all mentees for a specific mentor"""
-    return get_mentees_for_mentor(db, mentor_id) 
\ No newline at end of file
+    check_mentor_access(current_user, mentor_id)
+    return await get_mentees_for_mentor_async(db, mentor_id)
\ No newline at end of file
@@ -0,0 +1,383 @@
+"""
+Command line tools for the weekly sync app
+
+Usage:
+    python -m app.cli import-reports reports.csv --batch-size 1000 --on-conflict skip
+    python -m app.cli rebuild-search-index
+    python -m app.cli db upgrade
+    python -m app.cli db backfill iso_week_start --batch-size 1000 --pause 0.05
+    python -m app.cli serve --workers 4 --port 8000
+    python -m app.cli analytics rebuild
+    python -m app.cli analytics check
+    python -m app.cli missing-reports --week-from 2024-W01 --week-to 2024-W13 --json
+    python -m app.cli notify missing_report_reminders --week 2024-W09
+    python -m app.cli scheduler
+    python -m app.cli digests build --week 2024-W09 --workers 4
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from models import SessionLocal, engine
+
+
+def import_reports_command(args) -> int:
+    from app.services.import_service import IMPORT_FORMATS, import_reports, parse_import_rows
+
+    path = Path(args.path)
+    fmt = args.format or ("jsonl" if path.suffix in (".jsonl", ".ndjson") else "csv")
+    if fmt not in IMPORT_FORMATS:
+        print(f"Unsupported format: {fmt}", file=sys.stderr)
+        return 2
+
+    with path.open(encoding="utf-8-sig", newline="") as lines, SessionLocal() as db:
+        result = import_reports(
+            db,
+            parse_import_rows(lines, fmt),
+            batch_size=args.batch_size,
+            on_conflict=args.on_conflict
+        )
+
+    if args.json:
+        print(result.model_dump_json(indent=2))
+    else:
+        print(f"{result.rows} rows: {result.written} written, {result.skipped} skipped, {result.failed} failed "
+              f"in {result.batches} batches ({result.elapsed_seconds}s, {result.rows_per_second} rows/s)")
+        for error in result.errors:
+            print(f"  row {error.row}: {error.error}")
+        if result.errors_truncated:
+            print(f"  ... {result.failed - len(result.errors)} more errors")
+    return 1 if result.failed else 0
+
+
+def rebuild_search_index_command(args) -> int:
+    from app.services.search_service import rebuild_search_index
+
+    with SessionLocal() as db:
+        rebuild_search_index(db)
+    print("Search index rebuilt")
+    return 0
+
+
+def analytics_rebuild_command(args) -> int:
+    from app.services.analytics_service import rebuild_submission_rollups
+
+    with SessionLocal() as db:
+        result = rebuild_submission_rollups(db)
+    print(f"Rollups rebuilt from {result.reports} reports: {result.rollups} quarter rows, "
+          f"{result.mentees} mentees ({result.elapsed_seconds}s)")
+    return 0
+
+
+def analytics_check_command(args) -> int:
+    from app.services.analytics_service import check_submission_rollups
+
+    with SessionLocal() as db:
+        mismatches = check_submission_rollups(db)
+    if not mismatches:
+        print("Rollups match the reports")
+        return 0
+    for mismatch in mismatches[:args.limit]:
+        print(f"  {mismatch.table} {mismatch.key} {mismatch.field}: "
+              f"expected {mismatch.expected}, found {mismatch.actual}")
+    if len(mismatches) > args.limit:
+        print(f"  ... {len(mismatches) - args.limit} more")
+    print(f"{len(mismatches)} mismatches; `python -m app.cli analytics rebuild` recomputes the rollups")
+    return 1
+
+
+def missing_reports_command(args) -> int:
+    from datetime import date, timedelta
+
+    from app.services.missing_reports_service import find_missing_reports
+    from app.utils.helpers import parse_iso_week
+
+    try:
+        # By default the week that just closed, for a job scheduled early each week
+        first = parse_iso_week(args.week_from) if args.week_from else (date.today() - timedelta(weeks=1)).isocalendar()[:2]
+        last = parse_iso_week(args.week_to) if args.week_to else first
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+
+    with SessionLocal() as db:
+        result = find_missing_reports(db, first, week_to=last, mentor_id=args.mentor_id, team_name=args.team)
+    if args.json:
+        print(result.model_dump_json(indent=2))
+        return 0
+
+    span = f"{result.week_from.year}-W{result.week_from.week_number:02d}"
+    if result.weeks > 1:
+        span += f" to {result.week_to.year}-W{result.week_to.week_number:02d}"
+    print(f"{span}: {result.missing_reports} of {result.expected_reports} reports missing "
+          f"from {sum(len(mentor.mentees) for mentor in result.mentors)} of {result.mentees} active mentees")
+    for mentor in result.mentors:
+        print(f"  {mentor.mentor_name} ({mentor.team_name}): {mentor.missing_reports} missing")
+        for mentee in mentor.mentees:
+            weeks = ", ".join(f"{week.year}-W{week.week_number:02d}" for week in mentee.missing_weeks)
+            print(f"    {mentee.mentee_name}: {weeks}")
+    return 0
+
+
+def notify_command(args) -> int:
+    from datetime import datetime, timezone
+
+    from app.config import settings
+    from app.services.notification_service import JOBS, due_week, run_notification_job
+    from app.utils.helpers import parse_iso_week
+    from app.utils.notifications import RateLimiter, build_transport
+
+    try:
+        week = parse_iso_week(args.week) if args.week else due_week(
+            datetime.now(timezone.utc).replace(tzinfo=None), settings.notification_hour)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+
+    result = run_notification_job(JOBS[args.job], week, build_transport(), RateLimiter(settings.notification_rate_per_second))
+    if not result.claimed:
+        print(f"{result.job} {result.period}: already finished, or running in another process")
+        return 0
+    print(f"{result.job} {result.period}: {result.sent} sent, {result.failed} failed "
+          f"({result.total_sent} of {result.recipients} recipients sent so far, {result.elapsed_seconds}s)")
+    return 1 if result.failed else 0
+
+
+def digests_build_command(args) -> int:
+    from datetime import date, timedelta
+
+    from app.services.digest_service import build_mentor_digests
+    from app.utils.helpers import parse_iso_week
+
+    try:
+        week = parse_iso_week(args.week) if args.week else (date.today() - timedelta(weeks=1)).isocalendar()[:2]
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+
+    with SessionLocal() as db:
+        result = build_mentor_digests(db, week, mentor_ids=args.mentor_id, workers=args.workers)
+    print(f"{result.year}-W{result.week_number:02d}: {result.built} digests built, {result.existing} already there "
+          f"({result.workers} rendering processes, {result.elapsed_seconds}s)")
+    return 0
+
+
+def scheduler_command(args) -> int:
+    import asyncio
+    import logging
+    import signal
+
+    from app.config import settings
+    from app.services.notification_service import build_scheduler
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    async def run():
+        scheduler = build_scheduler()
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        scheduler.start()
+        print(f"Scheduler running (checks every {settings.scheduler_tick_seconds:g}s); Ctrl+C stops it", flush=True)
+        await stop.wait()
+        await scheduler.stop()
+        print("Scheduler stopped", flush=True)
+
+    asyncio.run(run())
+    return 0
+
+
+def _print_backfill_progress(result) -> None:
+    print(f"  {result.rows} rows in {result.batches} batches ({result.elapsed_seconds}s)", flush=True)
+
+
+def db_upgrade_command(args) -> int:
+    from app.utils.migrations import upgrade_database
+
+    upgrade_database(
+        revision=args.revision,
+        defer_backfills=args.defer_backfills,
+        backfill_batch_size=args.batch_size,
+        backfill_pause_seconds=args.pause,
+        backfill_progress=_print_backfill_progress
+    )
+    return 0
+
+
+def db_alembic_command(args) -> int:
+    """downgrade/current/history/stamp/revision, passed straight to Alembic"""
+    from alembic import command
+    from app.utils.migrations import alembic_config
+
+    config = alembic_config()
+    if args.db_command == "downgrade":
+        command.downgrade(config, args.revision)
+    elif args.db_command == "stamp":
+        command.stamp(config, args.revision)
+    elif args.db_command == "current":
+        command.current(config, verbose=args.verbose)
+    elif args.db_command == "history":
+        command.history(config, verbose=args.verbose)
+    elif args.db_command == "revision":
+        command.revision(config, message=args.message, autogenerate=args.autogenerate)
+    return 0
+
+
+def db_backfill_command(args) -> int:
+    from app.utils.backfill import BACKFILLS, run_backfill
+
+    result = run_backfill(
+        engine,
+        BACKFILLS[args.name],
+        batch_size=args.batch_size,
+        pause_seconds=args.pause,
+        max_batches=args.max_batches,
+        progress=_print_backfill_progress
+    )
+    state = "done" if result.finished else "stopped early; run again to continue"
+    print(f"Backfilled {result.rows} rows in {result.batches} batches ({result.elapsed_seconds}s), {state}")
+    return 0
+
+
+def serve_command(args) -> int:
+    import uvicorn
+    from app.config import settings
+    from app.utils.migrations import SchemaVersionError, check_schema_version
+
+    if args.workers > 1:
+        if "SECRET_KEY" not in os.environ:
+            print("SECRET_KEY must be set when running more than one worker: each worker would otherwise "
+                  "sign tokens with its own random key and reject the others'", file=sys.stderr)
+            return 2
+        if settings.cache_backend == "memory":
+            print("warning: CACHE_BACKEND=memory keeps a separate cache per worker, and a write only "
+                  "invalidates the worker that handled it; other workers can serve stale data for up to "
+                  f"{settings.cache_ttl_seconds}s. Use CACHE_BACKEND=redis to share one cache.", file=sys.stderr)
+
+    # Fail once, here, rather than in every worker
+    try:
+        check_schema_version(engine)
+    except SchemaVersionError as e:
+        print(e, file=sys.stderr)
+        return 1
+    engine.dispose()
+
+    # Workers are spawned processes, each importing the app and opening its own connections
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level,
+        access_log=args.access_log,
+        proxy_headers=True,
+        timeout_keep_alive=args.keep_alive
+    )
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from app.utils.backfill import BACKFILLS
+
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Weekly sync app tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import-reports", help="Bulk import weekly reports from CSV or JSONL")
+    importer.add_argument("path", help="CSV or JSONL file")
+    importer.add_argument("--format", choices=["csv", "jsonl"], help="Defaults from the file extension")
+    importer.add_argument("--batch-size", type=int, default=500)
+    importer.add_argument("--on-conflict", choices=["skip", "update"], default="skip",
+                          help="What to do when the mentee already has a report for that week")
+    importer.add_argument("--json", action="store_true", help="Print the full result as JSON")
+    importer.set_defaults(handler=import_reports_command)
+
+    reindex = commands.add_parser("rebuild-search-index", help="Rebuild the full-text index over report bodies")
+    reindex.set_defaults(handler=rebuild_search_index_command)
+
+    serve = commands.add_parser("serve", help="Run the API in production mode with several worker processes")
+    serve.add_argument("--host", default="0.0.0.0")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", 1)),
+                       help="Worker processes (default: $WEB_CONCURRENCY or 1); about one per CPU core")
+    serve.add_argument("--log-level", default="info")
+    serve.add_argument("--access-log", action="store_true", help="Log every request (off by default)")
+    serve.add_argument("--keep-alive", type=int, default=5, help="Seconds to keep idle connections open")
+    serve.set_defaults(handler=serve_command)
+
+    analytics = commands.add_parser("analytics", help="Submission analytics rollups")
+    analytics_commands = analytics.add_subparsers(dest="analytics_command", required=True)
+    rebuild = analytics_commands.add_parser("rebuild", help="Recompute the rollups from every report")
+    rebuild.set_defaults(handler=analytics_rebuild_command)
+    check = analytics_commands.add_parser("check", help="Compare the rollups with the reports; exit 1 on mismatch")
+    check.add_argument("--limit", type=int, default=20, help="Mismatches to print")
+    check.set_defaults(handler=analytics_check_command)
+
+    missing = commands.add_parser("missing-reports", help="Active mentees without a report for a week range")
+    missing.add_argument("--week-from", help="ISO week, e.g. 2024-W09 (default: last week)")
+    missing.add_argument("--week-to", help="Last ISO week of the range (default: --week-from)")
+    missing.add_argument("--mentor-id", type=int)
+    missing.add_argument("--team")
+    missing.add_argument("--json", action="store_true", help="Print the full result as JSON")
+    missing.set_defaults(handler=missing_reports_command)
+
+    notify = commands.add_parser("notify", help="Send a notification job's messages for a week now")
+    notify.add_argument("job", choices=["missing_report_reminders", "mentor_digests"])
+    notify.add_argument("--week", help="ISO week, e.g. 2024-W09 (default: the week due now, usually last week)")
+    notify.set_defaults(handler=notify_command)
+
+    digests = commands.add_parser("digests", help="Weekly mentor digests")
+    digests_commands = digests.add_subparsers(dest="digests_command", required=True)
+    build = digests_commands.add_parser("build", help="Build the week's digests that don't exist yet")
+    build.add_argument("--week", help="ISO week, e.g. 2024-W09 (default: last week)")
+    build.add_argument("--mentor-id", type=int, action="append", help="Only this mentor (repeatable)")
+    build.add_argument("--workers", type=int, help="Rendering processes (default: DIGEST_WORKERS)")
+    build.set_defaults(handler=digests_build_command)
+
+    scheduler = commands.add_parser("scheduler", help="Run the notification scheduler as its own process")
+    scheduler.set_defaults(handler=scheduler_command)
+
+    db = commands.add_parser("db", help="Schema migrations and data backfills")
+    db_commands = db.add_subparsers(dest="db_command", required=True)
+
+    upgrade = db_commands.add_parser("upgrade", help="Migrate the database to a revision (default: latest)")
+    upgrade.add_argument("revision", nargs="?", default="head")
+    upgrade.add_argument("--defer-backfills", action="store_true",
+                         help="Only change the schema; run `db backfill` for the data later")
+    upgrade.add_argument("--batch-size", type=int, default=1000, help="Rows per backfill batch")
+    upgrade.add_argument("--pause", type=float, default=0.05, help="Seconds to pause between backfill batches")
+    upgrade.set_defaults(handler=db_upgrade_command)
+
+    downgrade = db_commands.add_parser("downgrade", help="Revert the database to a revision, e.g. -1")
+    downgrade.add_argument("revision")
+    stamp = db_commands.add_parser("stamp", help="Record a revision without running migrations")
+    stamp.add_argument("revision")
+    current = db_commands.add_parser("current", help="Show the database's revision")
+    history = db_commands.add_parser("history", help="List migrations")
+    for parser_ in (current, history):
+        parser_.add_argument("-v", "--verbose", action="store_true")
+    revision = db_commands.add_parser("revision", help="Create a new migration script")
+    revision.add_argument("-m", "--message", required=True)
+    revision.add_argument("--autogenerate", action="store_true", help="Diff the models against the database")
+    for parser_ in (downgrade, stamp, current, history, revision):
+        parser_.set_defaults(handler=db_alembic_command)
+
+    backfill = db_commands.add_parser("backfill", help="Run or resume a data backfill in throttled batches")
+    backfill.add_argument("name", choices=sorted(BACKFILLS))
+    backfill.add_argument("--batch-size", type=int, default=1000)
+    backfill.add_argument("--pause", type=float, default=0.05, help="Seconds to pause between batches")
+    backfill.add_argument("--max-batches", type=int, help="Stop after this many batches")
+    backfill.set_defaults(handler=db_backfill_command)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
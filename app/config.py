@@ -0,0 +1,95 @@
+import os
+import secrets
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class Settings(BaseModel):
+    """Application settings; each field can be overridden by the environment variable of the same name in upper case"""
+
+    # Database
+    database_url: str = "sqlite:///./weekly_reports.db"
+    async_database_url: Optional[str] = None  # derived from database_url when unset
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_pre_ping: bool = True
+    db_pool_recycle: int = 1800  # seconds; -1 disables recycling
+    db_echo: bool = False
+
+    # SQLite connection pragmas (ignored for other databases)
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 268435456  # 256 MiB; 0 disables memory-mapped I/O
+
+    # Password hashing
+    password_hasher: str = "scrypt"  # or "pbkdf2_sha256"
+    scrypt_n: int = 16384
+    scrypt_r: int = 8
+    scrypt_p: int = 1
+    pbkdf2_iterations: int = 600000
+    password_hash_workers: int = 4  # threads hashing/verifying at once
+
+    # Access tokens - set SECRET_KEY in production; the random default changes on every
+    # restart and differs between workers, which invalidates all issued tokens
+    secret_key: str = Field(default_factory=lambda: secrets.token_urlsafe(32))
+    access_token_ttl_seconds: int = 900
+    refresh_token_ttl_seconds: int = 1209600  # 14 days
+    # Comma-separated emails of admins, who may read and change everyone's data; everyone else
+    # only sees their own, and mentors their mentees'
+    admin_emails: str = ""
+
+    # Read-through cache for token users, profiles, mentee lists and latest reports
+    cache_backend: str = "memory"  # or "redis" to share one cache between workers
+    cache_url: Optional[str] = None  # e.g. redis://localhost:6379/0
+    cache_max_entries: int = 10000  # in-process backend only
+    cache_ttl_seconds: int = 60
+
+    # Report body storage on SQLite: "off", "zlib" or "zstd" (needs the zstandard package). Only
+    # affects writes; `db backfill compress_report_bodies` converts existing reports
+    report_compression: str = "off"
+    report_compression_min_bytes: int = 64  # shorter texts are stored as they are
+
+    # Background notifications: missing-report reminders to mentees and weekly digests to mentors,
+    # sent on Mondays at notification_hour (UTC) for the week that just closed
+    scheduler_enabled: bool = False  # run the scheduler in every API worker; or run `python -m app.cli scheduler`
+    scheduler_tick_seconds: float = 60
+    notification_hour: int = 9
+    notification_transport: str = "file"  # or "smtp"
+    notification_file: str = "./notifications.jsonl"  # file transport: one JSON message per line
+    smtp_host: str = "localhost"
+    smtp_port: int = 1025
+    smtp_sender: str = "weekly-sync@localhost"
+    notification_batch_size: int = 100  # recipients loaded, sent and recorded together
+    notification_rate_per_second: float = 10  # messages per second, per process
+    notification_max_attempts: int = 3
+    digest_workers: int = 4  # processes rendering the weekly mentor digests; 1 renders in-process
+
+    # Metrics
+    slow_query_ms: float = 200  # log statements slower than this; -1 disables the slow-query log
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Build settings from environment variables"""
+        values = {
+            name: os.environ[name.upper()]
+            for name in cls.model_fields
+            if name.upper() in os.environ
+        }
+        return cls(**values)
+
+
+def async_url_for(database_url: str) -> str:
+    """Map a sync database URL to the async driver used by the API"""
+    scheme, sep, rest = database_url.partition("://")
+    backend = scheme.split("+")[0]
+    if backend == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if backend in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return database_url
+
+
+settings = Settings.from_env()
@@ -0,0 +1,107 @@
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from models import get_async_db
+from app.config import settings
+from app.schemas.reports import WeeklyReportResponse
+from app.schemas.users import UserResponse
+from app.services.user_service import get_user_by_id_async, get_user_profile_async
+from app.utils.cache import current_user_cache
+from app.utils.security import ACCESS_TOKEN, TokenError, decode_token
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> UserResponse:
+    """Resolve the user from the request's bearer access token"""
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+    try:
+        user_id = decode_token(credentials.credentials, ACCESS_TOKEN)
+    except TokenError as e:
+        raise _unauthorized(str(e))
+
+    # Cached by ID, so authorizing a request is usually a signature check plus a cache lookup
+    user = current_user_cache.get(user_id)
+    if user is None:
+        db_user = await get_user_by_id_async(db, user_id)
+        if not db_user or not db_user.is_active:
+            raise _unauthorized("User not found or deactivated")
+        user = UserResponse.model_validate(db_user)
+        current_user_cache.set(user_id, user)
+    return user
+
+
+# Authorization: admins can access everything, mentors their own and their mentees' data, and
+# mentees their own. Checks use the token's user and cached profiles, so they rarely cost a query.
+
+def _forbidden() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Not allowed to access this user's data"
+    )
+
+
+def is_admin(user: UserResponse) -> bool:
+    """Whether the user is one of the ADMIN_EMAILS"""
+    admins = {email.strip().lower() for email in settings.admin_emails.split(",") if email.strip()}
+    return user.email.lower() in admins
+
+
+async def require_admin(current_user: UserResponse = Depends(get_current_user)) -> UserResponse:
+    """The current user, who must be an admin"""
+    if not is_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admins only"
+        )
+    return current_user
+
+
+def check_mentor_access(current_user: UserResponse, mentor_id: int) -> None:
+    """Allow a mentor's own data (and admins)"""
+    if current_user.id != mentor_id and not is_admin(current_user):
+        raise _forbidden()
+
+
+async def check_mentee_access(db: AsyncSession, current_user: UserResponse, mentee_id: int) -> None:
+    """Allow a mentee's data to the mentee, their mentor and admins"""
+    if current_user.id == mentee_id or is_admin(current_user):
+        return
+    if current_user.user_type == "mentor":
+        mentee = await get_user_profile_async(db, mentee_id)
+        if mentee is not None and mentee.mentor_id == current_user.id:
+            return
+    raise _forbidden()
+
+
+def can_read_report(current_user: UserResponse, report: WeeklyReportResponse) -> bool:
+    """Reports are visible to their mentee, the mentor they were sent to and admins"""
+    return current_user.id in (report.mentee_id, report.mentor_id) or is_admin(current_user)
+
+
+def mentor_scope(current_user: UserResponse, mentor_id: Optional[int]) -> Optional[int]:
+    """The mentor whose mentees an org-wide view is limited to: any (or none, meaning everyone's)
+    for admins, and the mentor themselves for mentors; mentees can't use these views"""
+    if is_admin(current_user):
+        return mentor_id
+    if current_user.user_type != "mentor":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Mentors and admins only"
+        )
+    check_mentor_access(current_user, current_user.id if mentor_id is None else mentor_id)
+    return current_user.id
@@ -1,17 +1,43 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+from models import engine, async_engine
+from app.config import settings
+from app.api import auth, users, reports, dashboard, analytics
+from app.utils.cache import cache_stats
+from app.utils.metrics import MetricsMiddleware, registry
+from app.utils.migrations import check_schema_version
+
 
-from models import create_tables
-from app.api import auth, users, reports
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The schema is managed by migrations (python -m app.cli db upgrade); refuse to start on a stale one
+    check_schema_version(engine)
+    scheduler = None
+    if settings.scheduler_enabled:
+        from app.services.notification_service import build_scheduler
+
+        # Every worker runs one; each job's run for a week is claimed by a single process
+        scheduler = build_scheduler()
+        scheduler.start()
+    yield
+    if scheduler is not None:
+        await scheduler.stop()
+    # Close pooled connections so workers shut down cleanly
+    await async_engine.dispose()
+    engine.dispose()
 
-# Create database tables on startup
-create_tables()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="1:1 Weekly Report System",
     description="A system for managing mentor-mentee weekly sync reports",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
+app.add_middleware(MetricsMiddleware)
 
 # Root endpoint
 @app.get("/")
@@ -22,7 +48,19 @@ async def root():
         "docs": "/docs"
     }
 
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters per cache for this worker process"""
+    return cache_stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Per-route latency and SQL metrics for this worker process, in Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 # Include API routers
 app.include_router(auth.router)
 app.include_router(users.router)
-app.include_router(reports.router) 
\ No newline at end of file
+app.include_router(reports.router)
+app.include_router(dashboard.router)
+app.include_router(analytics.router) 
\ No newline at end of file
@@ -0,0 +1,99 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class QuarterSubmissions(BaseModel):
+    """Reports submitted in one quarter of an ISO year, against the weeks that were due"""
+    year: int
+    quarter: int
+    reports: int
+    expected_reports: int  # ISO weeks of the quarter up to this week, from each mentee's start
+    submission_rate: Optional[float] = None  # None when no week was due yet
+    late_reports: int
+    average_days_late: Optional[float] = None  # over all reports, on-time ones counting 0
+
+
+class MenteeSubmissionAnalytics(BaseModel):
+    mentee_id: int
+    mentee_name: str
+    team_name: str
+    office_location: str
+    quarters: List[QuarterSubmissions]
+    longest_streak: int
+    current_streak: int  # consecutive weeks up to this week (or last week if this week is still open)
+
+
+class MentorSubmissionAnalytics(BaseModel):
+    mentor_id: int
+    year: int
+    quarters: List[QuarterSubmissions]  # all of the mentor's active mentees together
+    mentees: List[MenteeSubmissionAnalytics]
+
+
+class GroupSubmissionAnalytics(BaseModel):
+    group: str
+    mentees: int
+    quarters: List[QuarterSubmissions]
+    longest_streak: int
+
+
+class SubmissionAnalytics(BaseModel):
+    group_by: str
+    year: int
+    groups: List[GroupSubmissionAnalytics]
+
+
+class IsoWeek(BaseModel):
+    year: int
+    week_number: int
+
+
+class MissingMentee(BaseModel):
+    mentee_id: int
+    mentee_name: str
+    team_name: str
+    missing_weeks: List[IsoWeek]
+
+
+class MentorMissingReports(BaseModel):
+    """A mentor's mentees with missing reports; mentees who submitted everything are left out"""
+    mentor_id: Optional[int] = None
+    mentor_name: Optional[str] = None
+    team_name: Optional[str] = None
+    missing_reports: int
+    mentees: List[MissingMentee]
+
+
+class TeamMissingReports(BaseModel):
+    team_name: str
+    mentees: int
+    expected_reports: int
+    missing_reports: int
+    mentees_missing: int  # mentees missing at least one week
+
+
+class MissingReports(BaseModel):
+    week_from: IsoWeek
+    week_to: IsoWeek
+    weeks: int
+    mentees: int  # active mentees in scope
+    expected_reports: int
+    missing_reports: int
+    mentors: List[MentorMissingReports]
+    teams: List[TeamMissingReports]
+
+
+class RollupRebuildResult(BaseModel):
+    reports: int
+    rollups: int
+    mentees: int
+    elapsed_seconds: float
+
+
+class RollupMismatch(BaseModel):
+    """A rollup value that differs from what the reports say; None where a row is missing"""
+    table: str
+    key: List[int]
+    field: str
+    expected: Optional[str] = None
+    actual: Optional[str] = None
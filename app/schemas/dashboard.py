@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import List
+
+from app.schemas.reports import WeeklyReportResponse
+from app.schemas.users import UserResponse
+
+
+class MenteeDashboard(BaseModel):
+    mentee: UserResponse
+    latest_reports: List[WeeklyReportResponse]
+    report_count: int
+    streak_weeks: int  # consecutive weeks submitted, up to this week (or last week if this week is still open)
+    submitted_current_week: bool
+
+
+class MentorDashboard(BaseModel):
+    mentor_id: int
+    year: int
+    week_number: int  # the current ISO week
+    missing_current_week: int
+    mentees: List[MenteeDashboard]
+
+
+class DigestBuildResult(BaseModel):
+    year: int
+    week_number: int
+    built: int  # digests written by this call
+    existing: int  # already built, left as they were
+    workers: int  # processes that rendered them
+    elapsed_seconds: float
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class NotificationRunResult(BaseModel):
+    """What one call to run a notification job did; totals cover every run of the job for the period"""
+    job: str
+    period: str  # ISO week, e.g. 2024-W09
+    claimed: bool  # False if the run had finished, or another process holds it
+    finished: bool
+    recipients: int
+    sent: int  # in this call
+    failed: int  # in this call; retried on a later run until notification_max_attempts
+    total_sent: int
+    elapsed_seconds: float
@@ -1,14 +1,43 @@
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field, model_validator
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+
+def _check_iso_week(year: int, week_number: int) -> None:
+    # Week 53 only exists in some years; a week that doesn't would be stored without iso_week_start
+    try:
+        date.fromisocalendar(year, week_number, 1)
+    except ValueError:
+        raise ValueError(f"Invalid ISO week {week_number}, {year}")
 
 
 class WeeklyReportCreate(BaseModel):
-    week_number: int
-    year: int
+    week_number: int = Field(ge=1, le=53)
+    year: int = Field(ge=1, le=9999)
     accomplishments: str
     blockers_concerns_comments: str
     aspirations: str
 
+    @model_validator(mode="after")
+    def _valid_iso_week(self):
+        _check_iso_week(self.year, self.week_number)
+        return self
+
+
+class WeeklyReportPatch(BaseModel):
+    """The fields to change; those left out (or null) stay as they are"""
+    week_number: Optional[int] = Field(None, ge=1, le=53)
+    year: Optional[int] = Field(None, ge=1, le=9999)
+    accomplishments: Optional[str] = None
+    blockers_concerns_comments: Optional[str] = None
+    aspirations: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _valid_iso_week(self):
+        if self.week_number is not None and self.year is not None:
+            _check_iso_week(self.year, self.week_number)
+        return self
+
 
 class WeeklyReportResponse(BaseModel):
     id: int
@@ -21,6 +50,68 @@ class WeeklyReportResponse(BaseModel):
     aspirations: str
     submission_date: datetime
     mentee_name: str
+    version: int  # bumped by every write; the ETag of PUT/PATCH responses and GET /reports/{report_id}
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+
+class WeeklyReportPage(BaseModel):
+    items: List[WeeklyReportResponse]
+    next_cursor: Optional[str] = None
+
+
+class WeeklyReportSummary(BaseModel):
+    """A report without its text, for lists; the preview fields are only filled in when asked for"""
+    id: int
+    mentee_id: int
+    mentor_id: int
+    week_number: int
+    year: int
+    submission_date: datetime
+    mentee_name: str
+    preview: Optional[str] = None  # start of the accomplishments
+    accomplishments_chars: Optional[int] = None
+    blockers_concerns_comments_chars: Optional[int] = None
+    aspirations_chars: Optional[int] = None
+
+
+class WeeklyReportSummaryPage(BaseModel):
+    items: List[WeeklyReportSummary]
+    next_cursor: Optional[str] = None
+
+
+class WeeklyReportImportRow(WeeklyReportCreate):
+    """One row of a bulk import; the mentee is identified by ID or email"""
+    mentee_id: Optional[int] = None
+    mentee_email: Optional[str] = None
+    submission_date: Optional[datetime] = None
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ReportImportResult(BaseModel):
+    rows: int
+    written: int
+    skipped: int
+    failed: int
+    batches: int
+    elapsed_seconds: float
+    rows_per_second: float
+    errors: List[ImportRowError]
+    errors_truncated: bool = False
+
+
+class ReportSearchHit(BaseModel):
+    """A matching report, without its text, with HTML excerpts of the fields that matched"""
+    report: WeeklyReportSummary
+    rank: float
+    highlights: Dict[str, str]
+
+
+class ReportSearchPage(BaseModel):
+    items: List[ReportSearchHit]
+    next_offset: Optional[int] = None
@@ -28,4 +28,19 @@ class UserResponse(BaseModel):
     mentor_id: Optional[int] = None
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+
+class TokenResponse(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+
+class LoginResponse(UserResponse, TokenResponse):
+    pass
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
@@ -0,0 +1,354 @@
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import MenteeSubmissionStats, SubmissionRollup, User, WeeklyReport
+from app.schemas.analytics import (
+    GroupSubmissionAnalytics,
+    MenteeSubmissionAnalytics,
+    MentorSubmissionAnalytics,
+    QuarterSubmissions,
+    RollupMismatch,
+    RollupRebuildResult,
+    SubmissionAnalytics
+)
+
+QUARTERS = (1, 2, 3, 4)
+GROUP_COLUMNS = {"team": User.team_name, "office": User.office_location}
+_ROLLUP_FIELDS = ("reports", "late_reports", "days_late")
+_STATS_FIELDS = ("reports", "first_week_start", "last_week_start", "longest_streak", "latest_streak")
+
+
+def _monday(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def quarter_bounds(year: int, quarter: int) -> tuple[date, date]:
+    """Mondays of the first and last ISO week of a quarter (weeks 1-13, 14-26, 27-39, 40 to 52 or 53)"""
+    last_week = 13 * quarter if quarter < 4 else date(year, 12, 28).isocalendar()[1]
+    return date.fromisocalendar(year, 13 * (quarter - 1) + 1, 1), date.fromisocalendar(year, last_week, 1)
+
+
+def expected_reports(year: int, quarter: int, start: Optional[date], today: date) -> int:
+    """ISO weeks of the quarter from the week of start through the current week"""
+    if start is None:
+        return 0
+    first, last = quarter_bounds(year, quarter)
+    first, last = max(first, _monday(start)), min(last, _monday(today))
+    return (last - first).days // 7 + 1 if last >= first else 0
+
+
+def mentee_start(created_at, first_week_start: Optional[date]) -> Optional[date]:
+    """When a mentee's reports start being due: their first report or their sign-up, whichever is earlier"""
+    days = [day for day in (created_at and created_at.date(), first_week_start) if day is not None]
+    return min(days, default=None)
+
+
+def _current_streak(last_week_start: Optional[date], latest_streak: Optional[int], today: date) -> int:
+    # A run still counts if it ended last week and this week's report isn't in yet
+    alive = last_week_start is not None and last_week_start >= _monday(today) - timedelta(weeks=1)
+    return (latest_streak or 0) if alive else 0
+
+
+def _quarter(year: int, quarter: int, expected: int, reports: int = 0, late_reports: int = 0,
+             days_late: int = 0) -> QuarterSubmissions:
+    return QuarterSubmissions(
+        year=year,
+        quarter=quarter,
+        reports=reports,
+        expected_reports=expected,
+        # Reports written ahead for future weeks don't push a mentee past 100%
+        submission_rate=round(min(reports / expected, 1.0), 3) if expected else None,
+        late_reports=late_reports,
+        average_days_late=round(days_late / reports, 2) if reports else None
+    )
+
+
+def get_mentor_submission_analytics(
+    db: Session,
+    mentor_id: int,
+    year: Optional[int] = None,
+    today: Optional[date] = None
+) -> MentorSubmissionAnalytics:
+    """Submission rate, lateness and streaks of a mentor's active mentees for each quarter of a year
+
+    Reads only the rollup tables and the mentees themselves, never weekly_reports: one row per
+    mentee and quarter they submitted in.
+    """
+    mentor = db.query(User).filter(
+        and_(User.id == mentor_id, User.user_type == "mentor")
+    ).first()
+    if not mentor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Mentor not found"
+        )
+
+    today = today or date.today()
+    year = year or today.isocalendar()[0]
+    rows = db.execute(
+        select(
+            User.id,
+            User.name,
+            User.team_name,
+            User.office_location,
+            User.created_at,
+            MenteeSubmissionStats.first_week_start,
+            MenteeSubmissionStats.last_week_start,
+            MenteeSubmissionStats.longest_streak,
+            MenteeSubmissionStats.latest_streak,
+            SubmissionRollup.quarter,
+            SubmissionRollup.reports,
+            SubmissionRollup.late_reports,
+            SubmissionRollup.days_late
+        )
+        .select_from(User)
+        .outerjoin(MenteeSubmissionStats, MenteeSubmissionStats.mentee_id == User.id)
+        .outerjoin(SubmissionRollup, and_(SubmissionRollup.mentee_id == User.id, SubmissionRollup.year == year))
+        .where(User.mentor_id == mentor_id, User.is_active == True)
+        .order_by(User.name, User.id)
+    ).all()
+
+    mentees: dict[int, tuple] = {}
+    rollups: dict[tuple[int, int], tuple[int, int, int]] = {}
+    for row in rows:
+        mentees.setdefault(row.id, row)
+        if row.quarter is not None:
+            rollups[row.id, row.quarter] = (row.reports, row.late_reports, row.days_late)
+
+    totals = {quarter: [0, 0, 0, 0] for quarter in QUARTERS}
+    results = []
+    for mentee_id, row in mentees.items():
+        start = mentee_start(row.created_at, row.first_week_start)
+        quarters = []
+        for quarter in QUARTERS:
+            counts = rollups.get((mentee_id, quarter), (0, 0, 0))
+            expected = expected_reports(year, quarter, start, today)
+            quarters.append(_quarter(year, quarter, expected, *counts))
+            for n, value in enumerate((expected, *counts)):
+                totals[quarter][n] += value
+        results.append(MenteeSubmissionAnalytics(
+            mentee_id=mentee_id,
+            mentee_name=row.name,
+            team_name=row.team_name,
+            office_location=row.office_location,
+            quarters=quarters,
+            longest_streak=row.longest_streak or 0,
+            current_streak=_current_streak(row.last_week_start, row.latest_streak, today)
+        ))
+
+    return MentorSubmissionAnalytics(
+        mentor_id=mentor_id,
+        year=year,
+        quarters=[_quarter(year, quarter, *totals[quarter]) for quarter in QUARTERS],
+        mentees=results
+    )
+
+
+def get_submission_analytics(
+    db: Session,
+    group_by: str,
+    year: Optional[int] = None,
+    today: Optional[date] = None
+) -> SubmissionAnalytics:
+    """Submission rate and lateness of all active mentees per team or office, for each quarter of a year
+
+    Rollups are summed per group in SQL; expected reports depend on when each mentee started,
+    so those come from one pass over the mentees' stats rows.
+    """
+    if group_by not in GROUP_COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"group_by must be one of: {', '.join(GROUP_COLUMNS)}"
+        )
+    group = GROUP_COLUMNS[group_by]
+    today = today or date.today()
+    year = year or today.isocalendar()[0]
+    active_mentee = and_(User.user_type == "mentee", User.is_active == True)
+
+    groups: dict[str, dict] = {}
+    mentees = db.execute(
+        select(group, User.created_at, MenteeSubmissionStats.first_week_start, MenteeSubmissionStats.longest_streak)
+        .select_from(User)
+        .outerjoin(MenteeSubmissionStats, MenteeSubmissionStats.mentee_id == User.id)
+        .where(active_mentee)
+    ).all()
+    for name, created_at, first_week_start, longest_streak in mentees:
+        entry = groups.setdefault(name, {"mentees": 0, "longest": 0, "counts": {q: [0, 0, 0, 0] for q in QUARTERS}})
+        entry["mentees"] += 1
+        entry["longest"] = max(entry["longest"], longest_streak or 0)
+        start = mentee_start(created_at, first_week_start)
+        for quarter in QUARTERS:
+            entry["counts"][quarter][0] += expected_reports(year, quarter, start, today)
+
+    sums = db.execute(
+        select(
+            group,
+            SubmissionRollup.quarter,
+            func.sum(SubmissionRollup.reports),
+            func.sum(SubmissionRollup.late_reports),
+            func.sum(SubmissionRollup.days_late)
+        )
+        .join(User, User.id == SubmissionRollup.mentee_id)
+        .where(SubmissionRollup.year == year, active_mentee)
+        .group_by(group, SubmissionRollup.quarter)
+    ).all()
+    for name, quarter, *counts in sums:
+        groups[name]["counts"][quarter][1:] = counts
+
+    return SubmissionAnalytics(
+        group_by=group_by,
+        year=year,
+        groups=[
+            GroupSubmissionAnalytics(
+                group=name,
+                mentees=entry["mentees"],
+                quarters=[_quarter(year, quarter, *entry["counts"][quarter]) for quarter in QUARTERS],
+                longest_streak=entry["longest"]
+            )
+            for name, entry in sorted(groups.items())
+        ]
+    )
+
+
+def compute_submission_rollups(db: Session):
+    """What the rollup tables should hold, from the full report history: (rollups, stats) DataFrames
+
+    Vectorised over every report at once, independently of the triggers that maintain the
+    tables, so it also serves as their check.
+    """
+    import numpy as np
+    import pandas as pd
+
+    reports = pd.DataFrame(
+        db.execute(select(
+            WeeklyReport.mentee_id,
+            WeeklyReport.year,
+            WeeklyReport.week_number,
+            WeeklyReport.iso_week_start,
+            WeeklyReport.submission_date
+        )).all(),
+        columns=["mentee_id", "year", "week_number", "iso_week_start", "submission_date"]
+    )
+    if reports.empty:
+        return (pd.DataFrame(columns=["mentee_id", "year", "quarter", *_ROLLUP_FIELDS]),
+                pd.DataFrame(columns=["mentee_id", *_STATS_FIELDS]))
+    week_start = pd.to_datetime(reports["iso_week_start"])
+    # Due by the end of the report's ISO week (Sunday); whole days after that
+    overdue = pd.to_datetime(reports["submission_date"]).dt.normalize() - (week_start + pd.Timedelta(days=6))
+    days_late = overdue.dt.days.clip(lower=0).fillna(0).astype("int64")
+    rollups = (
+        reports.assign(
+            quarter=np.minimum((reports["week_number"] - 1) // 13 + 1, 4),
+            late=(days_late > 0).astype("int64"),
+            days_late=days_late
+        )
+        .groupby(["mentee_id", "year", "quarter"], as_index=False)
+        .agg(reports=("late", "size"), late_reports=("late", "sum"), days_late=("days_late", "sum"))
+    )
+
+    # Gaps and islands: week ordinal minus rank within the mentee is constant along a run of consecutive weeks
+    weeks = pd.DataFrame({"mentee_id": reports["mentee_id"], "week_start": week_start}).dropna()
+    weeks = weeks.sort_values(["mentee_id", "week_start"])
+    ordinal = (weeks["week_start"] - pd.Timestamp("2000-01-03")).dt.days // 7
+    weeks["run"] = ordinal - weeks.groupby("mentee_id").cumcount()
+    runs = weeks.groupby(["mentee_id", "run"], as_index=False).agg(
+        first_week=("week_start", "min"), last_week=("week_start", "max"), weeks=("week_start", "size")
+    )
+    streaks = runs.groupby("mentee_id").agg(
+        first_week_start=("first_week", "min"),
+        last_week_start=("last_week", "max"),
+        longest_streak=("weeks", "max"),
+        latest_streak=("weeks", "last")  # runs are in week order within a mentee
+    )
+    stats = reports.groupby("mentee_id").size().rename("reports").to_frame().join(streaks)
+    stats[["longest_streak", "latest_streak"]] = stats[["longest_streak", "latest_streak"]].fillna(0).astype("int64")
+    for column in ("first_week_start", "last_week_start"):
+        stats[column] = stats[column].dt.date.astype(object).where(stats[column].notna(), None)
+    return rollups, stats.reset_index()
+
+
+def _records(frame) -> list[dict]:
+    # Plain Python values for the driver, not NumPy scalars
+    return [
+        {key: value.item() if hasattr(value, "item") else value for key, value in record.items()}
+        for record in frame.to_dict("records")
+    ]
+
+
+def rebuild_submission_rollups(db: Session) -> RollupRebuildResult:
+    """Recompute both rollup tables from the full report history, e.g. after loading data with the triggers off
+
+    The tables are cleared before the reports are read: on SQLite that takes the write lock,
+    so no report can change between the read and the rewrite (writers wait until the commit).
+    """
+    start = time.perf_counter()
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE weekly_reports IN SHARE MODE"))
+    db.execute(delete(SubmissionRollup))
+    db.execute(delete(MenteeSubmissionStats))
+    rollups, stats = compute_submission_rollups(db)
+    if len(rollups):
+        db.execute(insert(SubmissionRollup), _records(rollups))
+    if len(stats):
+        db.execute(insert(MenteeSubmissionStats), _records(stats))
+    db.commit()
+    return RollupRebuildResult(
+        reports=int(rollups["reports"].sum()),
+        rollups=len(rollups),
+        mentees=len(stats),
+        elapsed_seconds=round(time.perf_counter() - start, 3)
+    )
+
+
+def _mismatches(table: str, expected: dict, actual: dict, fields: tuple[str, ...]) -> list[RollupMismatch]:
+    found = []
+    for key in sorted(expected.keys() | actual.keys()):
+        want, have = expected.get(key), actual.get(key)
+        if want is None or have is None:
+            # A missing or extra row is one mismatch, not one per field
+            found.append(RollupMismatch(table=table, key=list(key), field="*",
+                                        expected=want and str(want), actual=have and str(have)))
+            continue
+        found += [
+            RollupMismatch(table=table, key=list(key), field=field, expected=str(wanted), actual=str(had))
+            for field, wanted, had in zip(fields, want, have) if wanted != had
+        ]
+    return found
+
+
+def check_submission_rollups(db: Session) -> list[RollupMismatch]:
+    """Compare the rollup tables with a fresh computation from the reports; empty means consistent"""
+    rollups, stats = compute_submission_rollups(db)
+    rollup_key = ("mentee_id", "year", "quarter")
+    expected_rollups = {
+        tuple(record[k] for k in rollup_key): tuple(record[f] for f in _ROLLUP_FIELDS) for record in _records(rollups)
+    }
+    expected_stats = {(record["mentee_id"],): tuple(record[f] for f in _STATS_FIELDS) for record in _records(stats)}
+
+    actual_rollups = {
+        tuple(row[:3]): tuple(row[3:])
+        for row in db.execute(select(*(getattr(SubmissionRollup, c) for c in rollup_key + _ROLLUP_FIELDS)))
+    }
+    actual_stats = {
+        (row[0],): tuple(row[1:])
+        for row in db.execute(select(MenteeSubmissionStats.mentee_id,
+                                     *(getattr(MenteeSubmissionStats, c) for c in _STATS_FIELDS)))
+    }
+    return (_mismatches("submission_rollups", expected_rollups, actual_rollups, _ROLLUP_FIELDS)
+            + _mismatches("mentee_submission_stats", expected_stats, actual_stats, _STATS_FIELDS))
+
+
+async def get_mentor_submission_analytics_async(db: AsyncSession, mentor_id: int, **options) -> MentorSubmissionAnalytics:
+    """Async version of get_mentor_submission_analytics"""
+    return await db.run_sync(get_mentor_submission_analytics, mentor_id, **options)
+
+
+async def get_submission_analytics_async(db: AsyncSession, group_by: str, **options) -> SubmissionAnalytics:
+    """Async version of get_submission_analytics"""
+    return await db.run_sync(get_submission_analytics, group_by, **options)
@@ -1,16 +1,52 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
+from typing import Optional
 
 from models import User
-from app.schemas.users import UserLogin
-from app.utils.security import verify_password
-from app.services.user_service import get_user_by_email
+from app.config import settings
+from app.schemas.users import UserLogin, UserResponse, LoginResponse, TokenResponse
+from app.utils.security import (
+    ACCESS_TOKEN,
+    REFRESH_TOKEN,
+    TokenError,
+    create_token,
+    decode_token,
+    verify_password,
+    verify_password_async,
+    needs_rehash,
+    hash_password,
+    hash_password_async
+)
+from app.services.user_service import get_user_by_email, get_user_by_email_async, get_user_by_id_async
+
+
+# Unknown emails' passwords are verified against this, so they take as long as wrong passwords and
+# response times don't tell which emails are registered; hashed once, on the first such login
+_DUMMY_PASSWORD = "not the password of any user"
+_dummy_hash: Optional[str] = None
+
+
+def _dummy_password_hash() -> str:
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(_DUMMY_PASSWORD)
+    return _dummy_hash
+
+
+async def _dummy_password_hash_async() -> str:
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await hash_password_async(_DUMMY_PASSWORD)
+    return _dummy_hash
 
 
 def authenticate_user(db: Session, login_data: UserLogin) -> User:
     """Authenticate user login credentials"""
     user = get_user_by_email(db, login_data.email)
     
+    if not user:
+        verify_password(login_data.password, _dummy_password_hash())
     if not user or not verify_password(login_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -23,4 +59,72 @@ def authenticate_user(db: Session, login_data: UserLogin) -> User:
             detail="Account is deactivated"
         )
     
-    return user 
\ No newline at end of file
+    # Upgrade legacy or outdated-cost hashes while we have the plaintext
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_password(login_data.password)
+        db.commit()
+    
+    return user
+
+
+async def authenticate_user_async(db: AsyncSession, login_data: UserLogin) -> User:
+    """Async version of authenticate_user; hashing runs in the hashing pool, not on the event loop"""
+    user = await get_user_by_email_async(db, login_data.email)
+    
+    if not user:
+        await verify_password_async(login_data.password, await _dummy_password_hash_async())
+    if not user or not await verify_password_async(login_data.password, user.password_hash):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid email or password"
+        )
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Account is deactivated"
+        )
+    
+    if needs_rehash(user.password_hash):
+        user.password_hash = await hash_password_async(login_data.password)
+        await db.commit()
+    
+    return user
+
+
+def issue_tokens(user_id: int) -> TokenResponse:
+    """Issue a fresh access/refresh token pair for a user"""
+    return TokenResponse(
+        access_token=create_token(user_id, ACCESS_TOKEN),
+        refresh_token=create_token(user_id, REFRESH_TOKEN),
+        expires_in=settings.access_token_ttl_seconds
+    )
+
+
+async def login_async(db: AsyncSession, login_data: UserLogin) -> LoginResponse:
+    """Authenticate a user and return their profile together with a token pair"""
+    user = await authenticate_user_async(db, login_data)
+    return LoginResponse(
+        **UserResponse.model_validate(user).model_dump(),
+        **issue_tokens(user.id).model_dump()
+    )
+
+
+async def refresh_tokens_async(db: AsyncSession, refresh_token: str) -> TokenResponse:
+    """Exchange a valid refresh token for a new token pair"""
+    try:
+        user_id = decode_token(refresh_token, REFRESH_TOKEN)
+    except TokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e)
+        )
+    
+    user = await get_user_by_id_async(db, user_id)
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found or deactivated"
+        )
+    
+    return issue_tokens(user.id)
@@ -0,0 +1,134 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, and_, case, cast, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import User, WeeklyReport
+from app.schemas.dashboard import MenteeDashboard, MentorDashboard
+from app.schemas.users import UserResponse
+from app.services.report_service import _report_response
+
+
+def _week_ordinal(dialect: str, year, week_number):
+    """SQL expression numbering ISO weeks consecutively, so week n+1 is always ordinal + 1 (even across years)"""
+    if dialect == "sqlite":
+        jan4 = func.printf("%04d-01-04", year)
+        # julianday() of the Monday of the ISO week; Mondays are exactly 7 days apart
+        monday = (
+            func.julianday(jan4)
+            - (cast(func.strftime("%w", jan4), Integer) + 6) % 7
+            + (week_number - 1) * 7
+        )
+        return cast(monday, Integer) // 7
+    if dialect == "postgresql":
+        monday = func.to_date(func.concat(year, "-", week_number), "IYYY-IW")
+        return (monday - func.to_date("2000-01-03", "YYYY-MM-DD")) // 7
+    raise HTTPException(
+        status_code=status.HTTP_501_NOT_IMPLEMENTED,
+        detail=f"Dashboard is not supported on {dialect}"
+    )
+
+
+def get_mentor_dashboard(
+    db: Session,
+    mentor_id: int,
+    reports_per_mentee: int = 2,
+    today: Optional[date] = None
+) -> MentorDashboard:
+    """Every active mentee of a mentor with their latest reports, submission streak and this week's status
+
+    One statement does the work, whatever the number of mentees: ROW_NUMBER() ranks each
+    mentee's reports newest first, a key-only pass over the same ranking finds the latest run
+    of consecutive weeks (week ordinal + rank is constant within a run), and only the top
+    reports_per_mentee reports per mentee are joined back for their text.
+    """
+    # Verify mentor exists
+    mentor = db.query(User).filter(
+        and_(User.id == mentor_id, User.user_type == "mentor")
+    ).first()
+    if not mentor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Mentor not found"
+        )
+
+    current_year, current_week, _ = (today or date.today()).isocalendar()
+    dialect = db.get_bind().dialect.name
+    current_ordinal = _week_ordinal(dialect, literal(current_year), literal(current_week))
+
+    ranked = select(
+        WeeklyReport.id,
+        WeeklyReport.mentee_id,
+        _week_ordinal(dialect, WeeklyReport.year, WeeklyReport.week_number).label("ordinal"),
+        func.row_number().over(
+            partition_by=WeeklyReport.mentee_id,
+            order_by=(WeeklyReport.year.desc(), WeeklyReport.week_number.desc())
+        ).label("rn")
+    ).where(WeeklyReport.mentor_id == mentor_id).cte("ranked")
+
+    islands = select(
+        ranked.c.mentee_id,
+        ranked.c.ordinal,
+        (ranked.c.ordinal + ranked.c.rn).label("run"),
+        func.first_value(ranked.c.ordinal + ranked.c.rn).over(
+            partition_by=ranked.c.mentee_id, order_by=ranked.c.rn
+        ).label("latest_run")
+    ).cte("islands")
+
+    streaks = select(
+        islands.c.mentee_id,
+        func.count().label("report_count"),
+        func.max(islands.c.ordinal).label("latest_ordinal"),
+        func.sum(case((islands.c.run == islands.c.latest_run, 1), else_=0)).label("run_length"),
+        func.max(case((islands.c.ordinal == current_ordinal, 1), else_=0)).label("has_current")
+    ).group_by(islands.c.mentee_id).cte("streaks")
+
+    rows = db.execute(
+        select(
+            User,
+            WeeklyReport,
+            streaks.c.report_count,
+            streaks.c.latest_ordinal,
+            streaks.c.run_length,
+            streaks.c.has_current,
+            current_ordinal.label("current_ordinal")
+        )
+        .select_from(User)
+        .outerjoin(ranked, and_(ranked.c.mentee_id == User.id, ranked.c.rn <= reports_per_mentee))
+        .outerjoin(WeeklyReport, WeeklyReport.id == ranked.c.id)
+        .outerjoin(streaks, streaks.c.mentee_id == User.id)
+        .where(User.mentor_id == mentor_id, User.is_active == True)
+        .order_by(User.name, User.id, ranked.c.rn)
+    ).all()
+
+    mentees: dict[int, MenteeDashboard] = {}
+    for mentee, report, report_count, latest_ordinal, run_length, has_current, current in rows:
+        entry = mentees.get(mentee.id)
+        if entry is None:
+            # A run still counts if it ended last week and this week's report isn't in yet
+            alive = latest_ordinal is not None and latest_ordinal >= current - 1
+            entry = mentees[mentee.id] = MenteeDashboard(
+                mentee=UserResponse.model_validate(mentee),
+                latest_reports=[],
+                report_count=report_count or 0,
+                streak_weeks=run_length if alive else 0,
+                submitted_current_week=bool(has_current)
+            )
+        if report is not None:
+            entry.latest_reports.append(_report_response(report, mentee.name))
+
+    return MentorDashboard(
+        mentor_id=mentor_id,
+        year=current_year,
+        week_number=current_week,
+        missing_current_week=sum(not entry.submitted_current_week for entry in mentees.values()),
+        mentees=list(mentees.values())
+    )
+
+
+async def get_mentor_dashboard_async(db: AsyncSession, mentor_id: int, **options) -> MentorDashboard:
+    """Async version of get_mentor_dashboard"""
+    return await db.run_sync(get_mentor_dashboard, mentor_id, **options)
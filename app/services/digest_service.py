@@ -0,0 +1,271 @@
+import html
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from itertools import repeat
+from multiprocessing import get_context
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, sessionmaker
+
+from models import MenteeSubmissionStats, MentorDigest, User, WeeklyReport, create_db_engine
+from app.config import settings
+from app.schemas.dashboard import DigestBuildResult
+from app.utils.helpers import format_iso_week
+
+DIGEST_FORMATS = {"markdown": "text/markdown; charset=utf-8", "html": "text/html; charset=utf-8"}
+CHUNK_MENTORS = 25  # mentors rendered per task; each chunk is one query and one insert
+# Starting a process costs about as much as rendering a thousand digests, so smaller builds use fewer
+MENTORS_PER_WORKER = 1000
+SECTIONS = (
+    ("accomplishments", "Accomplishments"),
+    ("blockers_concerns_comments", "Blockers, concerns and comments"),
+    ("aspirations", "Aspirations"),
+)
+
+
+def digest_mentor_ids(db: Session) -> list[int]:
+    """Active mentors with at least one active mentee"""
+    mentor = aliased(User)
+    return list(db.execute(
+        select(User.mentor_id)
+        .join(mentor, mentor.id == User.mentor_id)
+        .where(User.user_type == "mentee", User.is_active == True, mentor.is_active == True)
+        .distinct()
+        .order_by(User.mentor_id)
+    ).scalars())
+
+
+def week_reports_by_mentor(db: Session, week: tuple[int, int], mentor_ids: list[int]) -> dict[int, list[Row]]:
+    """Each mentor's active mentees who owed a report for the week (as in find_missing_reports), by name,
+    with their report for it if any (report_id None otherwise)"""
+    next_monday = date.fromisocalendar(*week, 1) + timedelta(weeks=1)
+    rows = db.execute(
+        select(User.mentor_id, User.id, User.name, WeeklyReport.id.label("report_id"),
+               WeeklyReport.accomplishments, WeeklyReport.blockers_concerns_comments, WeeklyReport.aspirations,
+               WeeklyReport.submission_date)
+        .outerjoin(MenteeSubmissionStats, MenteeSubmissionStats.mentee_id == User.id)
+        .outerjoin(WeeklyReport, and_(
+            WeeklyReport.mentee_id == User.id,
+            WeeklyReport.year == week[0],
+            WeeklyReport.week_number == week[1]
+        ))
+        .where(User.mentor_id.in_(mentor_ids), User.user_type == "mentee", User.is_active == True,
+               or_(User.created_at < next_monday, MenteeSubmissionStats.first_week_start < next_monday))
+        .order_by(User.mentor_id, User.name, User.id)
+    ).all()
+    mentees: dict[int, list[Row]] = {}
+    for row in rows:
+        mentees.setdefault(row.mentor_id, []).append(row)
+    return mentees
+
+
+def _submitted(row: Row, week: tuple[int, int]) -> str:
+    if row.submission_date is None:
+        return "Submitted"
+    days_late = (row.submission_date.date() - date.fromisocalendar(*week, 7)).days
+    late = f" ({days_late} day{'s' if days_late > 1 else ''} late)" if days_late > 0 else ""
+    return f"Submitted {row.submission_date:%A, %B} {row.submission_date.day}{late}"
+
+
+def _title(week: tuple[int, int]) -> str:
+    monday = date.fromisocalendar(*week, 1)
+    return f"Weekly reports for {format_iso_week(*week)} (week of {monday:%B} {monday.day}, {monday.year})"
+
+
+def render_markdown(mentor_name: str, week: tuple[int, int], mentees: list[Row], generated_at: datetime) -> str:
+    submitted = sum(row.report_id is not None for row in mentees)
+    lines = [f"# {_title(week)}", "",
+             f"{mentor_name}: {submitted} of {len(mentees)} mentees submitted. "
+             f"Generated {generated_at:%Y-%m-%d %H:%M} UTC; reports sent after that aren't included.", ""]
+    for row in mentees:
+        lines += [f"## {row.name}", ""]
+        if row.report_id is None:
+            lines += ["No report for this week.", ""]
+            continue
+        lines += [f"_{_submitted(row, week)}_", ""]
+        for field, heading in SECTIONS:
+            lines += [f"### {heading}", "", getattr(row, field).strip(), ""]
+    return "\n".join(lines)
+
+
+def _html_text(text: str) -> str:
+    paragraphs = [part.strip() for part in text.strip().split("\n\n") if part.strip()]
+    return "".join(f"<p>{html.escape(part).replace(chr(10), '<br>')}</p>" for part in paragraphs)
+
+
+def render_html(mentor_name: str, week: tuple[int, int], mentees: list[Row], generated_at: datetime) -> str:
+    submitted = sum(row.report_id is not None for row in mentees)
+    title = html.escape(_title(week))
+    parts = [f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{title}</title></head><body>",
+             f"<h1>{title}</h1>",
+             f"<p>{html.escape(mentor_name)}: {submitted} of {len(mentees)} mentees submitted. "
+             f"Generated {generated_at:%Y-%m-%d %H:%M} UTC; reports sent after that aren't included.</p>"]
+    for row in mentees:
+        parts.append(f"<section><h2>{html.escape(row.name)}</h2>")
+        if row.report_id is None:
+            parts.append("<p>No report for this week.</p>")
+        else:
+            parts.append(f"<p><em>{html.escape(_submitted(row, week))}</em></p>")
+            for field, heading in SECTIONS:
+                parts.append(f"<h3>{heading}</h3>{_html_text(getattr(row, field))}")
+        parts.append("</section>")
+    parts.append("</body></html>\n")
+    return "\n".join(parts)
+
+
+def render_mentor_digests(db: Session, week: tuple[int, int], mentor_ids: list[int], generated_at: datetime) -> list[dict]:
+    """mentor_digests rows for some mentors, rendered from one query"""
+    mentors = db.execute(select(User.id, User.name).where(User.id.in_(mentor_ids)).order_by(User.id)).all()
+    by_mentor = week_reports_by_mentor(db, week, mentor_ids)
+    rows = []
+    for mentor in mentors:
+        mentees = by_mentor.get(mentor.id, [])
+        rows.append({
+            "mentor_id": mentor.id,
+            "year": week[0],
+            "week_number": week[1],
+            "mentees": len(mentees),
+            "reports": sum(row.report_id is not None for row in mentees),
+            "markdown": render_markdown(mentor.name, week, mentees, generated_at),
+            "html": render_html(mentor.name, week, mentees, generated_at),
+            "generated_at": generated_at
+        })
+    return rows
+
+
+# Each pool process opens its own engine, once
+_worker_sessions: Optional[sessionmaker] = None
+
+
+def _init_worker(database_url: str) -> None:
+    global _worker_sessions
+    _worker_sessions = sessionmaker(bind=create_db_engine(database_url))
+
+
+def _render_chunk(week: tuple[int, int], mentor_ids: list[int], generated_at: datetime) -> list[dict]:
+    with _worker_sessions() as db:
+        return render_mentor_digests(db, week, mentor_ids, generated_at)
+
+
+def _insert_digests(db: Session, rows: list[dict]) -> int:
+    """Insert digests that don't exist yet; an existing one is never replaced"""
+    if not rows:
+        return 0
+    dialect = db.get_bind().dialect.name
+    stmt = (postgresql_insert if dialect == "postgresql" else sqlite_insert)(MentorDigest)
+    stmt = stmt.on_conflict_do_nothing(index_elements=["mentor_id", "year", "week_number"])
+    return len(db.execute(stmt.returning(MentorDigest.mentor_id), rows).all())
+
+
+def build_mentor_digests(
+    db: Session,
+    week: tuple[int, int],
+    mentor_ids: Optional[list[int]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_MENTORS,
+    mentors_per_worker: int = MENTORS_PER_WORKER,
+    now: Optional[datetime] = None
+) -> DigestBuildResult:
+    """Render and store the week's digest for every mentor with active mentees (or those given) that has none
+
+    Chunks of mentors are rendered in a pool of spawned processes (one per mentors_per_worker
+    digests, up to workers), each reading through its own engine, while this process does all
+    the writing (SQLite has one writer anyway). Safe to run
+    again or concurrently: existing digests are skipped, and a lost race is ignored.
+    """
+    started = time.perf_counter()
+    workers = settings.digest_workers if workers is None else workers
+    generated_at = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    candidates = digest_mentor_ids(db) if mentor_ids is None else mentor_ids
+    existing = set(db.execute(
+        select(MentorDigest.mentor_id).where(MentorDigest.year == week[0], MentorDigest.week_number == week[1])
+    ).scalars())
+    pending = [mentor_id for mentor_id in candidates if mentor_id not in existing]
+    chunks = [pending[start:start + chunk_size] for start in range(0, len(pending), chunk_size)]
+
+    built = 0
+    url = db.get_bind().url
+    workers = min(workers, len(chunks), -(-len(pending) // mentors_per_worker) if mentors_per_worker else len(chunks))
+    if workers > 1 and url.database not in (None, "", ":memory:"):
+        with ProcessPoolExecutor(workers, mp_context=get_context("spawn"), initializer=_init_worker,
+                                 initargs=(url.render_as_string(hide_password=False),)) as pool:
+            for rows in pool.map(_render_chunk, repeat(week), chunks, repeat(generated_at)):
+                built += _insert_digests(db, rows)
+                db.commit()
+    else:
+        workers = 1
+        for chunk in chunks:
+            built += _insert_digests(db, render_mentor_digests(db, week, chunk, generated_at))
+            db.commit()
+
+    return DigestBuildResult(
+        year=week[0],
+        week_number=week[1],
+        built=built,
+        existing=len(candidates) - len(pending),
+        workers=workers if chunks else 0,
+        elapsed_seconds=round(time.perf_counter() - started, 3)
+    )
+
+
+def week_closed(week: tuple[int, int], today: date) -> bool:
+    return date.fromisocalendar(*week, 7) < today
+
+
+def get_mentor_digest(
+    db: Session,
+    mentor_id: int,
+    week: tuple[int, int],
+    fmt: str = "markdown",
+    today: Optional[date] = None
+) -> Row:
+    """(content, generated_at) of a mentor's digest for a closed week: one primary-key read
+
+    Reads never build: digests are built by the scheduler or `app.cli digests build`, so a
+    missing one is a 404 that says why (the week isn't over, predates the mentor or their first
+    digest, or hasn't been built yet).
+    """
+    try:
+        date.fromisocalendar(*week, 1)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid ISO week: {error}")
+    column = MentorDigest.markdown if fmt == "markdown" else MentorDigest.html
+    stmt = select(column.label("content"), MentorDigest.generated_at).where(
+        MentorDigest.mentor_id == mentor_id, MentorDigest.year == week[0], MentorDigest.week_number == week[1]
+    )
+    digest = db.execute(stmt).first()
+    if digest is not None:
+        return digest
+
+    name = format_iso_week(*week)
+    if not week_closed(week, today or date.today()):
+        detail = f"The digest for {name} is built once the week is over"
+    else:
+        mentor = db.get(User, mentor_id)
+        if mentor is None or mentor.user_type != "mentor":
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mentor not found")
+        first = db.execute(
+            select(MentorDigest.year, MentorDigest.week_number)
+            .where(MentorDigest.mentor_id == mentor_id)
+            .order_by(MentorDigest.year, MentorDigest.week_number)
+            .limit(1)
+        ).first()
+        if mentor.created_at is not None and week < mentor.created_at.isocalendar()[:2]:
+            detail = f"There is no digest for {name}, before the mentor joined"
+        elif first is not None and week < tuple(first):
+            detail = f"There is no digest for {name}; this mentor's digests start at {format_iso_week(*first)}"
+        else:
+            detail = f"The digest for {name} hasn't been built yet"
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+
+async def get_mentor_digest_async(db: AsyncSession, mentor_id: int, week: tuple[int, int], **options) -> Row:
+    """Async version of get_mentor_digest"""
+    return await db.run_sync(get_mentor_digest, mentor_id, week, **options)
@@ -0,0 +1,176 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import User, WeeklyReport
+
+EXPORT_COLUMNS = [
+    "id",
+    "mentee_id",
+    "mentor_id",
+    "mentee_name",
+    "team_name",
+    "office_location",
+    "week_number",
+    "year",
+    "submission_date",
+    "accomplishments",
+    "blockers_concerns_comments",
+    "aspirations",
+]
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def export_statement(
+    mentor_id: Optional[int] = None,
+    team_name: Optional[str] = None,
+    office_location: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Build the SELECT for an export; team and office filter on the mentee's profile"""
+    stmt = select(
+        WeeklyReport.id,
+        WeeklyReport.mentee_id,
+        WeeklyReport.mentor_id,
+        User.name.label("mentee_name"),
+        User.team_name,
+        User.office_location,
+        WeeklyReport.week_number,
+        WeeklyReport.year,
+        WeeklyReport.submission_date,
+        WeeklyReport.accomplishments,
+        WeeklyReport.blockers_concerns_comments,
+        WeeklyReport.aspirations,
+    ).join(User, WeeklyReport.mentee_id == User.id)
+
+    if mentor_id is not None:
+        stmt = stmt.where(WeeklyReport.mentor_id == mentor_id)
+    if team_name is not None:
+        stmt = stmt.where(User.team_name == team_name)
+    if office_location is not None:
+        stmt = stmt.where(User.office_location == office_location)
+    if date_from is not None:
+        stmt = stmt.where(WeeklyReport.submission_date >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        stmt = stmt.where(WeeklyReport.submission_date < datetime.combine(date_to + timedelta(days=1), time.min))
+
+    return stmt.order_by(WeeklyReport.id)
+
+
+def _format_csv(rows, include_header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if include_header:
+        writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow([value.isoformat() if isinstance(value, datetime) else value for value in row])
+    return buffer.getvalue().encode()
+
+
+def _format_jsonl(rows) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=lambda value: value.isoformat()) + "\n"
+        for row in rows
+    ).encode()
+
+
+class _ChunkSink:
+    """Write-only file object for pyarrow that hands back what was written since the last drain"""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def stream_export(db: AsyncSession, stmt, fmt: str, chunk_size: int = 1000) -> AsyncIterator[bytes]:
+    """Stream an export in chunks of chunk_size rows from a server-side cursor, so memory use stays flat
+
+    Takes ownership of the session and closes it when done - it outlives the request's
+    dependency scope, which ends before a streaming response body is sent.
+    """
+    writer = sink = schema = None
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ("id", pa.int64()),
+            ("mentee_id", pa.int64()),
+            ("mentor_id", pa.int64()),
+            ("mentee_name", pa.string()),
+            ("team_name", pa.string()),
+            ("office_location", pa.string()),
+            ("week_number", pa.int32()),
+            ("year", pa.int32()),
+            ("submission_date", pa.timestamp("us")),
+            ("accomplishments", pa.string()),
+            ("blockers_concerns_comments", pa.string()),
+            ("aspirations", pa.string()),
+        ])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+
+    try:
+        result = await db.stream(stmt.execution_options(yield_per=chunk_size))
+        first = True
+        async for rows in result.partitions():
+            if fmt == "csv":
+                yield _format_csv(rows, include_header=first)
+            elif fmt == "jsonl":
+                yield _format_jsonl(rows)
+            else:
+                columns = list(zip(*rows))
+                # One row group per chunk
+                writer.write_table(pa.table(
+                    {name: list(values) for name, values in zip(EXPORT_COLUMNS, columns)}, schema=schema
+                ))
+                yield sink.drain()
+            first = False
+
+        if fmt == "csv" and first:
+            yield _format_csv([], include_header=True)
+        if writer is not None:
+            writer.close()
+            yield sink.drain()
+    finally:
+        await db.close()
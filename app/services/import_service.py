@@ -0,0 +1,171 @@
+import csv
+import json
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Union
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import User, WeeklyReport
+from app.schemas.reports import WeeklyReportImportRow, ImportRowError, ReportImportResult
+from app.utils.cache import latest_reports_cache
+
+IMPORT_FORMATS = ("csv", "jsonl")
+CONFLICT_MODES = ("skip", "update")
+BODY_COLUMNS = ("accomplishments", "blockers_concerns_comments", "aspirations")
+
+
+def parse_import_rows(lines: Iterable[str], fmt: str) -> Iterator[tuple[int, Union[dict, str]]]:
+    """Yield (row number, raw row) pairs from CSV or JSONL lines; unparseable rows yield an error message instead"""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            # Blank spreadsheet cells mean "not given"
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in ("", None)}
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, f"Invalid JSON: {e.msg}"
+                continue
+            yield line_number, row if isinstance(row, dict) else "Expected a JSON object"
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors())
+
+
+def _insert_statement(db: Session, on_conflict: str):
+    """INSERT ... ON CONFLICT on the unique (mentee_id, week_number, year) constraint, returning written IDs"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite_insert(WeeklyReport)
+    elif dialect == "postgresql":
+        stmt = postgresql_insert(WeeklyReport)
+    else:
+        raise ValueError(f"Bulk import is not supported on {dialect}")
+
+    conflict_target = ["mentee_id", "week_number", "year"]
+    if on_conflict == "update":
+        stmt = stmt.on_conflict_do_update(
+            index_elements=conflict_target,
+            set_={
+                **{column: stmt.excluded[column] for column in BODY_COLUMNS},
+                "updated_at": datetime.now(timezone.utc),
+                "version": WeeklyReport.version + 1
+            }
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=conflict_target)
+    return stmt.returning(WeeklyReport.id)
+
+
+def import_reports(
+    db: Session,
+    rows: Iterable[tuple[int, Union[dict, str]]],
+    batch_size: int = 500,
+    on_conflict: str = "skip",
+    max_errors: int = 1000
+) -> ReportImportResult:
+    """Validate and insert reports in batches; existing weeks are skipped or updated depending on on_conflict"""
+    if on_conflict not in CONFLICT_MODES:
+        raise ValueError(f"on_conflict must be one of {CONFLICT_MODES}")
+
+    start = time.perf_counter()
+
+    # Resolve every mentee -> mentor up front with one query
+    mentees = db.execute(
+        select(User.id, User.email, User.mentor_id).where(User.user_type == "mentee")
+    ).all()
+    mentor_by_mentee_id = {mentee.id: mentee.mentor_id for mentee in mentees}
+    mentee_by_email = {mentee.email.lower(): mentee.id for mentee in mentees}
+
+    stmt = _insert_statement(db, on_conflict)
+    total = written = failed = batches = 0
+    errors: list[ImportRowError] = []
+    seen_keys: dict[tuple[int, int, int], int] = {}
+    batch: list[dict] = []
+
+    def fail(row_number: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < max_errors:
+            errors.append(ImportRowError(row=row_number, error=message))
+
+    def flush():
+        nonlocal written, batches
+        if batch:
+            written += len(db.execute(stmt, batch).all())
+            db.commit()
+            latest_reports_cache.invalidate(*{row["mentee_id"] for row in batch})
+            batches += 1
+            batch.clear()
+
+    for row_number, raw in rows:
+        total += 1
+        if isinstance(raw, str):
+            fail(row_number, raw)
+            continue
+        try:
+            row = WeeklyReportImportRow.model_validate(raw)
+        except ValidationError as e:
+            fail(row_number, _validation_message(e))
+            continue
+
+        mentee_id = row.mentee_id
+        if mentee_id is None and row.mentee_email:
+            mentee_id = mentee_by_email.get(row.mentee_email.lower())
+        if mentee_id is None and not row.mentee_email:
+            fail(row_number, "mentee_id or mentee_email is required")
+            continue
+        if mentee_id not in mentor_by_mentee_id:
+            fail(row_number, "Mentee not found")
+            continue
+
+        key = (mentee_id, row.week_number, row.year)
+        if key in seen_keys:
+            fail(row_number, f"Duplicate of row {seen_keys[key]}")
+            continue
+        seen_keys[key] = row_number
+
+        batch.append({
+            "mentee_id": mentee_id,
+            "mentor_id": mentor_by_mentee_id[mentee_id],
+            "week_number": row.week_number,
+            "year": row.year,
+            "accomplishments": row.accomplishments,
+            "blockers_concerns_comments": row.blockers_concerns_comments,
+            "aspirations": row.aspirations,
+            "submission_date": row.submission_date or datetime.now(timezone.utc)
+        })
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    elapsed = time.perf_counter() - start
+    return ReportImportResult(
+        rows=total,
+        written=written,
+        skipped=total - written - failed,
+        failed=failed,
+        batches=batches,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        errors=errors,
+        errors_truncated=failed > len(errors)
+    )
+
+
+async def import_reports_async(db: AsyncSession, rows: Iterable[tuple[int, Union[dict, str]]], **options) -> ReportImportResult:
+    """Async version of import_reports"""
+    return await db.run_sync(import_reports, rows, **options)
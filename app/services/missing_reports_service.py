@@ -0,0 +1,162 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Date, Integer, and_, exists, literal, or_, select, true, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+
+from models import MenteeSubmissionStats, User, WeeklyReport
+from app.schemas.analytics import (
+    IsoWeek,
+    MentorMissingReports,
+    MissingMentee,
+    MissingReports,
+    TeamMissingReports
+)
+from app.services.analytics_service import mentee_start
+
+# The calendar is one SELECT per week joined with UNION ALL; SQLite allows 500 of those
+MAX_WEEKS = 260
+
+
+def iso_weeks(week_from: tuple[int, int], week_to: tuple[int, int]) -> list[tuple[int, int, date]]:
+    """(year, week_number, Monday) of every ISO week from week_from through week_to"""
+    try:
+        start, end = date.fromisocalendar(*week_from, 1), date.fromisocalendar(*week_to, 1)
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid ISO week: {error}")
+    if end < start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="week_to is before week_from")
+    weeks = (end - start).days // 7 + 1
+    if weeks > MAX_WEEKS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_WEEKS} weeks at a time"
+        )
+    mondays = [start + timedelta(weeks=n) for n in range(weeks)]
+    return [(*monday.isocalendar()[:2], monday) for monday in mondays]
+
+
+def _calendar(weeks: list[tuple[int, int, date]]):
+    """The weeks as a CTE: (idx, year, week_number, week_start, next_week_start)"""
+    return union_all(*(
+        select(
+            literal(idx, Integer).label("idx"),
+            literal(year, Integer).label("year"),
+            literal(week_number, Integer).label("week_number"),
+            literal(monday, Date).label("week_start"),
+            literal(monday + timedelta(weeks=1), Date).label("next_week_start")
+        )
+        for idx, (year, week_number, monday) in enumerate(weeks)
+    )).cte("calendar")
+
+
+def find_missing_reports(
+    db: Session,
+    week_from: tuple[int, int],
+    week_to: Optional[tuple[int, int]] = None,
+    mentor_id: Optional[int] = None,
+    team_name: Optional[str] = None
+) -> MissingReports:
+    """Active mentees without a report for each ISO week of a range, grouped by mentor, with totals per team
+
+    A mentee owes a report for every week from the one they signed up in, or of their first
+    report if earlier. One set-based statement finds the gaps: every active mentee crossed
+    with a calendar of the weeks, anti-joined to weekly_reports through the
+    (mentee_id, year, week_number) index. A second reads the mentees and their mentors.
+    """
+    weeks = iso_weeks(week_from, week_to or week_from)
+    mentor = aliased(User)
+    scope = [User.user_type == "mentee", User.is_active == True]
+    if mentor_id is not None:
+        scope.append(User.mentor_id == mentor_id)
+    if team_name is not None:
+        scope.append(User.team_name == team_name)
+
+    mentees = db.execute(
+        select(
+            User.id,
+            User.name,
+            User.team_name,
+            User.created_at,
+            MenteeSubmissionStats.first_week_start,
+            mentor.id.label("mentor_id"),
+            mentor.name.label("mentor_name"),
+            mentor.team_name.label("mentor_team_name")
+        )
+        .outerjoin(MenteeSubmissionStats, MenteeSubmissionStats.mentee_id == User.id)
+        .outerjoin(mentor, mentor.id == User.mentor_id)
+        .where(*scope)
+        .order_by(mentor.name, User.mentor_id, User.name, User.id)
+    ).all()
+
+    calendar = _calendar(weeks)
+    gaps = db.execute(
+        select(User.id, calendar.c.idx)
+        .select_from(User)
+        .join(calendar, true())
+        .outerjoin(MenteeSubmissionStats, MenteeSubmissionStats.mentee_id == User.id)
+        .where(
+            *scope,
+            or_(User.created_at < calendar.c.next_week_start,
+                calendar.c.week_start >= MenteeSubmissionStats.first_week_start),
+            ~exists().where(and_(
+                WeeklyReport.mentee_id == User.id,
+                WeeklyReport.year == calendar.c.year,
+                WeeklyReport.week_number == calendar.c.week_number
+            ))
+        )
+    ).all()
+    # No ORDER BY: sorting in SQL costs a temp b-tree over every gap, sorting each mentee's few here doesn't
+    missing_weeks = [IsoWeek(year=year, week_number=week_number) for year, week_number, _ in weeks]
+    missing_by_mentee: dict[int, list[int]] = {}
+    for mentee_id, idx in gaps:
+        missing_by_mentee.setdefault(mentee_id, []).append(idx)
+
+    mentors: dict[Optional[int], MentorMissingReports] = {}
+    teams: dict[str, TeamMissingReports] = {}
+    expected = 0
+    for row in mentees:
+        start = mentee_start(row.created_at, row.first_week_start)
+        # The weeks are consecutive, so the owed ones are those from the start week on
+        skipped = 0 if start is None else (start - timedelta(days=start.weekday()) - weeks[0][2]).days // 7
+        owed = 0 if start is None else len(weeks) - min(max(skipped, 0), len(weeks))
+        expected += owed
+        missing = [missing_weeks[idx] for idx in sorted(missing_by_mentee.get(row.id, ()))]
+        team = teams.setdefault(row.team_name, TeamMissingReports(
+            team_name=row.team_name, mentees=0, expected_reports=0, missing_reports=0, mentees_missing=0
+        ))
+        team.mentees += 1
+        team.expected_reports += owed
+        team.missing_reports += len(missing)
+        team.mentees_missing += bool(missing)
+        if not missing:
+            continue
+        entry = mentors.setdefault(row.mentor_id, MentorMissingReports(
+            mentor_id=row.mentor_id,
+            mentor_name=row.mentor_name,
+            team_name=row.mentor_team_name,
+            missing_reports=0,
+            mentees=[]
+        ))
+        entry.missing_reports += len(missing)
+        entry.mentees.append(MissingMentee(
+            mentee_id=row.id, mentee_name=row.name, team_name=row.team_name, missing_weeks=missing
+        ))
+
+    return MissingReports(
+        week_from=IsoWeek(year=weeks[0][0], week_number=weeks[0][1]),
+        week_to=IsoWeek(year=weeks[-1][0], week_number=weeks[-1][1]),
+        weeks=len(weeks),
+        mentees=len(mentees),
+        expected_reports=expected,
+        missing_reports=len(gaps),
+        mentors=list(mentors.values()),
+        teams=sorted(teams.values(), key=lambda team: team.team_name)
+    )
+
+
+async def find_missing_reports_async(db: AsyncSession, week_from: tuple[int, int], **options) -> MissingReports:
+    """Async version of find_missing_reports"""
+    return await db.run_sync(find_missing_reports, week_from, **options)
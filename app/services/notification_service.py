@@ -0,0 +1,300 @@
+import logging
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import NotificationDelivery, NotificationJobRun, SessionLocal, User
+from app.config import Settings, settings
+from app.schemas.dashboard import DigestBuildResult
+from app.schemas.notifications import NotificationRunResult
+from app.services.digest_service import build_mentor_digests, digest_mentor_ids, week_reports_by_mentor
+from app.services.missing_reports_service import find_missing_reports
+from app.utils.helpers import format_iso_week
+from app.utils.notifications import Message, NotificationTransport, RateLimiter, build_transport
+from app.utils.scheduler import ScheduledJob, Scheduler
+
+logger = logging.getLogger("app.notifications")
+
+LEASE_SECONDS = 300  # renewed after every batch
+RETRY_SECONDS = 900  # before failed deliveries are tried again
+PREVIEW_CHARS = 200
+
+
+@dataclass(frozen=True)
+class NotificationJob:
+    """A weekly notification: who gets one for an ISO week, and their messages, a batch at a time"""
+
+    name: str
+    recipients: Callable[[Session, tuple[int, int]], list[int]]
+    messages: Callable[[Session, tuple[int, int], list[int]], list[Message]]
+
+
+def _week_label(week: tuple[int, int]) -> str:
+    monday = date.fromisocalendar(*week, 1)
+    return f"{format_iso_week(*week)} (week of {monday:%B} {monday.day})"
+
+
+def _missing_report_recipients(db: Session, week: tuple[int, int]) -> list[int]:
+    result = find_missing_reports(db, week)
+    return [mentee.mentee_id for mentor in result.mentors for mentee in mentor.mentees]
+
+
+def _missing_report_messages(db: Session, week: tuple[int, int], mentee_ids: list[int]) -> list[Message]:
+    mentees = db.execute(
+        select(User.id, User.name, User.email).where(User.id.in_(mentee_ids), User.is_active == True)
+    ).all()
+    return [
+        Message(
+            recipient_id=mentee.id,
+            to=mentee.email,
+            subject=f"Your weekly report for {format_iso_week(*week)} is missing",
+            body=f"Hi {mentee.name},\n\nWe haven't received your weekly report for {_week_label(week)} yet. "
+                 "Please take a few minutes to send it to your mentor.\n"
+        )
+        for mentee in mentees
+    ]
+
+
+def _digest_recipients(db: Session, week: tuple[int, int]) -> list[int]:
+    return digest_mentor_ids(db)
+
+
+def _preview(text: str) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= PREVIEW_CHARS else text[:PREVIEW_CHARS - 3].rstrip() + "..."
+
+
+def _digest_messages(db: Session, week: tuple[int, int], mentor_ids: list[int]) -> list[Message]:
+    mentors = db.execute(
+        select(User.id, User.name, User.email).where(User.id.in_(mentor_ids), User.is_active == True)
+    ).all()
+    mentees = week_reports_by_mentor(db, week, mentor_ids)
+
+    messages = []
+    for mentor in mentors:
+        team = mentees.get(mentor.id)
+        if not team:
+            continue
+        submitted = sum(row.report_id is not None for row in team)
+        lines = [f"Hi {mentor.name},", "",
+                 f"Weekly reports for {_week_label(week)}: {submitted} of {len(team)} mentees submitted.", ""]
+        for row in team:
+            if row.report_id is None:
+                lines += [f"{row.name}: no report", ""]
+            else:
+                lines += [row.name,
+                          f"  Accomplishments: {_preview(row.accomplishments)}",
+                          f"  Blockers, concerns and comments: {_preview(row.blockers_concerns_comments)}", ""]
+        messages.append(Message(
+            recipient_id=mentor.id,
+            to=mentor.email,
+            subject=f"Weekly reports for {format_iso_week(*week)}: {submitted} of {len(team)} submitted",
+            body="\n".join(lines)
+        ))
+    return messages
+
+
+JOBS = {
+    # Mentees who haven't sent last week's report
+    "missing_report_reminders": NotificationJob(
+        name="missing_report_reminders",
+        recipients=_missing_report_recipients,
+        messages=_missing_report_messages
+    ),
+    # Mentors, with what each of their mentees reported last week
+    "mentor_digests": NotificationJob(
+        name="mentor_digests",
+        recipients=_digest_recipients,
+        messages=_digest_messages
+    ),
+}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def due_week(now: datetime, hour: int) -> tuple[int, int]:
+    """The ISO week whose notifications are due at now: last week from Monday at hour (UTC), the one before until then"""
+    monday = now.date() - timedelta(days=now.weekday())
+    weeks_back = 1 if now >= datetime.combine(monday, datetime.min.time()) + timedelta(hours=hour) else 2
+    return (monday - timedelta(weeks=weeks_back)).isocalendar()[:2]
+
+
+def _claim_run(db: Session, job: str, period: str, worker: str, now: datetime) -> bool:
+    """Take the run of a job for a period unless it has finished or another process holds an unexpired lease"""
+    lease_expires_at = now + timedelta(seconds=LEASE_SECONDS)
+    run = db.get(NotificationJobRun, (job, period))
+    if run is None:
+        db.add(NotificationJobRun(job=job, period=period, claimed_by=worker, lease_expires_at=lease_expires_at,
+                                  started_at=now, recipients=0, sent=0, failed=0))
+        try:
+            db.commit()
+            return True
+        except IntegrityError:
+            # Another process inserted it first
+            db.rollback()
+            return False
+    if run.finished_at is not None:
+        return False
+    # A single conditional UPDATE, so two processes can't both take over an expired lease
+    claimed = db.execute(
+        update(NotificationJobRun)
+        .where(NotificationJobRun.job == job, NotificationJobRun.period == period,
+               NotificationJobRun.finished_at.is_(None), NotificationJobRun.lease_expires_at <= now)
+        .values(claimed_by=worker, lease_expires_at=lease_expires_at)
+    ).rowcount
+    db.commit()
+    return claimed == 1
+
+
+def _record_deliveries(db: Session, job: str, period: str, messages: list[Message], errors: list[Optional[str]],
+                       now: datetime) -> None:
+    dialect = db.get_bind().dialect.name
+    stmt = (postgresql_insert if dialect == "postgresql" else sqlite_insert)(NotificationDelivery)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["job", "period", "recipient_id"],
+        set_={
+            "status": stmt.excluded.status,
+            "attempts": NotificationDelivery.attempts + 1,
+            "sent_at": stmt.excluded.sent_at,
+            "error": stmt.excluded.error
+        }
+    )
+    db.execute(stmt, [
+        {"job": job, "period": period, "recipient_id": message.recipient_id, "status": "failed" if error else "sent",
+         "attempts": 1, "sent_at": None if error else now, "error": error}
+        for message, error in zip(messages, errors)
+    ])
+
+
+def run_notification_job(
+    job: NotificationJob,
+    week: tuple[int, int],
+    transport: NotificationTransport,
+    limiter: RateLimiter,
+    session_factory: Callable[[], Session] = SessionLocal,
+    config: Settings = settings,
+    stop: Optional[threading.Event] = None,
+    worker: Optional[str] = None,
+    now: Optional[datetime] = None
+) -> NotificationRunResult:
+    """Send a job's messages for an ISO week to everyone who hasn't had theirs, in batches
+
+    Safe to run again, from any process: the run is claimed under a lease, each batch's outcome
+    is recorded with the lease renewed right after it is sent, and recipients already sent to
+    (or failed notification_max_attempts times) are skipped. A crash between sending a batch and
+    recording it can repeat that one batch. Failures leave the run open for a retry after
+    RETRY_SECONDS; stop (set on shutdown) ends it between batches, for another process to resume.
+    """
+    started = time.perf_counter()
+    worker = worker or worker_name()
+    period = format_iso_week(*week)
+    result = NotificationRunResult(job=job.name, period=period, claimed=False, finished=False,
+                                   recipients=0, sent=0, failed=0, total_sent=0, elapsed_seconds=0.0)
+    with session_factory() as db:
+        if not _claim_run(db, job.name, period, worker, now or _utcnow()):
+            return result
+        result.claimed = True
+
+        recipients = job.recipients(db, week)
+        done = {
+            row.recipient_id
+            for row in db.execute(
+                select(NotificationDelivery.recipient_id).where(
+                    NotificationDelivery.job == job.name,
+                    NotificationDelivery.period == period,
+                    (NotificationDelivery.status == "sent")
+                    | (NotificationDelivery.attempts >= config.notification_max_attempts)
+                )
+            )
+        }
+        pending = [recipient for recipient in recipients if recipient not in done]
+        run_filter = (NotificationJobRun.job == job.name, NotificationJobRun.period == period,
+                      NotificationJobRun.claimed_by == worker)
+
+        for start in range(0, len(pending), config.notification_batch_size):
+            if stop is not None and stop.is_set():
+                break
+            messages = job.messages(db, week, pending[start:start + config.notification_batch_size])
+            errors = transport.send_batch(messages, limiter)
+            batch_time = now or _utcnow()
+            _record_deliveries(db, job.name, period, messages, errors, batch_time)
+            renewed = db.execute(update(NotificationJobRun).where(*run_filter).values(
+                lease_expires_at=batch_time + timedelta(seconds=LEASE_SECONDS)
+            )).rowcount
+            db.commit()
+            result.failed += sum(error is not None for error in errors)
+            result.sent += len(errors) - sum(error is not None for error in errors)
+            if not renewed:
+                # The lease ran out and another process took the run over
+                return result
+
+        counts = dict(db.execute(
+            select(NotificationDelivery.status, func.count())
+            .where(NotificationDelivery.job == job.name, NotificationDelivery.period == period)
+            .group_by(NotificationDelivery.status)
+        ).all())
+        end = now or _utcnow()
+        stopped = stop is not None and stop.is_set()
+        result.finished = not stopped and not result.failed
+        result.recipients = len(recipients)
+        result.total_sent = counts.get("sent", 0)
+        if result.finished:
+            values = {"finished_at": end}
+        else:
+            # Stopped: free the run for whoever starts next; failed: retry after a while
+            values = {"lease_expires_at": end if stopped else end + timedelta(seconds=RETRY_SECONDS)}
+        db.execute(update(NotificationJobRun).where(*run_filter).values(
+            recipients=len(recipients), sent=counts.get("sent", 0), failed=counts.get("failed", 0), **values
+        ))
+        db.commit()
+    result.elapsed_seconds = round(time.perf_counter() - started, 3)
+    return result
+
+
+def build_scheduler(
+    session_factory: Callable[[], Session] = SessionLocal,
+    config: Settings = settings,
+    transport: Optional[NotificationTransport] = None
+) -> Scheduler:
+    """A scheduler building the due week's mentor digests and sending every job in JOBS for it,
+    through one transport and rate limit"""
+    transport = transport or build_transport(config)
+    limiter = RateLimiter(config.notification_rate_per_second)
+
+    def scheduled(job: NotificationJob) -> ScheduledJob:
+        def run(now: datetime, stop: threading.Event) -> NotificationRunResult:
+            result = run_notification_job(job, due_week(now, config.notification_hour), transport, limiter,
+                                          session_factory=session_factory, config=config, stop=stop)
+            if result.claimed:
+                logger.info("%s %s: %d sent, %d failed, %d of %d recipients sent so far (%ss)", result.job,
+                            result.period, result.sent, result.failed, result.total_sent, result.recipients,
+                            result.elapsed_seconds)
+            return result
+        return ScheduledJob(name=job.name, run=run)
+
+    def build_digests(now: datetime, stop: threading.Event) -> DigestBuildResult:
+        with session_factory() as db:
+            result = build_mentor_digests(db, due_week(now, config.notification_hour), workers=config.digest_workers)
+        if result.built:
+            logger.info("mentor digests %s: %d built (%d rendering processes, %ss)", format_iso_week(result.year, result.week_number),
+                        result.built, result.workers, result.elapsed_seconds)
+        return result
+
+    jobs = [ScheduledJob(name="mentor_digest_artifacts", run=build_digests)]
+    return Scheduler(jobs + [scheduled(job) for job in JOBS.values()], tick_seconds=config.scheduler_tick_seconds)
@@ -1,103 +1,182 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, delete, func, insert, literal, literal_column, select, tuple_, update
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
-from datetime import datetime, timezone
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Callable, Iterable, Optional
 
-from models import User, WeeklyReport
-from app.schemas.reports import WeeklyReportCreate, WeeklyReportResponse
+from models import User, WeeklyReport, iso_week_start
+from app.schemas.reports import (
+    WeeklyReportCreate,
+    WeeklyReportPatch,
+    WeeklyReportResponse,
+    WeeklyReportPage,
+    WeeklyReportSummary,
+    WeeklyReportSummaryPage
+)
+from app.utils.cache import latest_reports_cache
+from app.utils.helpers import encode_cursor, decode_cursor
+
+
+def _report_response(report: WeeklyReport, mentee_name: str) -> WeeklyReportResponse:
+    """Build a report response from an ORM row and the mentee's name"""
+    return WeeklyReportResponse(
+        id=report.id,
+        mentee_id=report.mentee_id,
+        mentor_id=report.mentor_id,
+        week_number=report.week_number,
+        year=report.year,
+        accomplishments=report.accomplishments,
+        blockers_concerns_comments=report.blockers_concerns_comments,
+        aspirations=report.aspirations,
+        submission_date=report.submission_date,
+        mentee_name=mentee_name,
+        version=report.version
+    )
+
+
+# Columns a write returns to build its response, so no follow-up SELECT is needed. RETURNING
+# only sees the written row, so the name comes from a correlated subquery; it is spelled out
+# because SQLAlchemy renders INSERT ... RETURNING columns unqualified on SQLite, which would
+# make the subquery ambiguous.
+_RETURNED_COLUMNS = (
+    WeeklyReport.id,
+    WeeklyReport.mentee_id,
+    WeeklyReport.mentor_id,
+    WeeklyReport.week_number,
+    WeeklyReport.year,
+    WeeklyReport.accomplishments,
+    WeeklyReport.blockers_concerns_comments,
+    WeeklyReport.aspirations,
+    WeeklyReport.submission_date,
+    WeeklyReport.version,
+    literal_column("(SELECT users.name FROM users WHERE users.id = weekly_reports.mentee_id)").label("mentee_name")
+)
+
+
+# What list views show of a report without opening it
+_SUMMARY_COLUMNS = (
+    WeeklyReport.id,
+    WeeklyReport.mentee_id,
+    WeeklyReport.mentor_id,
+    WeeklyReport.week_number,
+    WeeklyReport.year,
+    WeeklyReport.submission_date,
+    User.name.label("mentee_name")
+)
+BODY_FIELDS = ("accomplishments", "blockers_concerns_comments", "aspirations")
+PREVIEW_CHARS = 120
+
+
+def _duplicate_week(week_number: int, year: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Report already exists for week {week_number}, {year}"
+    )
 
 
 def create_weekly_report(db: Session, mentee_id: int, report_data: WeeklyReportCreate) -> WeeklyReportResponse:
     """Create a new weekly report for a mentee"""
-    # Verify mentee exists and is actually a mentee
-    mentee = db.query(User).filter(
-        and_(User.id == mentee_id, User.user_type == "mentee")
-    ).first()
-    if not mentee:
+    # One statement: the SELECT only yields a row if the mentee exists and is actually a mentee,
+    # and the unique (mentee, week, year) constraint rejects duplicates
+    stmt = insert(WeeklyReport).from_select(
+        [
+            "mentee_id",
+            "mentor_id",
+            "week_number",
+            "year",
+            "iso_week_start",
+            "accomplishments",
+            "blockers_concerns_comments",
+            "aspirations"
+        ],
+        select(
+            User.id,
+            User.mentor_id,
+            literal(report_data.week_number),
+            literal(report_data.year),
+            literal(iso_week_start(report_data.year, report_data.week_number), WeeklyReport.iso_week_start.type),
+            literal(report_data.accomplishments, WeeklyReport.accomplishments.type),
+            literal(report_data.blockers_concerns_comments, WeeklyReport.blockers_concerns_comments.type),
+            literal(report_data.aspirations, WeeklyReport.aspirations.type)
+        ).where(and_(User.id == mentee_id, User.user_type == "mentee"))
+    ).returning(*_RETURNED_COLUMNS)
+    
+    try:
+        row = db.execute(stmt).first()
+    except IntegrityError:
+        db.rollback()
+        raise _duplicate_week(report_data.week_number, report_data.year)
+    if row is None:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Mentee not found"
         )
     
-    # Check if report already exists for this week
-    existing_report = db.query(WeeklyReport).filter(
-        and_(
-            WeeklyReport.mentee_id == mentee_id,
-            WeeklyReport.week_number == report_data.week_number,
-            WeeklyReport.year == report_data.year
-        )
-    ).first()
-    
-    if existing_report:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Report already exists for week {report_data.week_number}, {report_data.year}"
-        )
-    
-    # Create new report
-    db_report = WeeklyReport(
-        mentee_id=mentee_id,
-        mentor_id=mentee.mentor_id,
-        week_number=report_data.week_number,
-        year=report_data.year,
-        accomplishments=report_data.accomplishments,
-        blockers_concerns_comments=report_data.blockers_concerns_comments,
-        aspirations=report_data.aspirations
-    )
-    
-    db.add(db_report)
     db.commit()
-    db.refresh(db_report)
+    latest_reports_cache.invalidate(mentee_id)
     
     # Return report with mentee name
-    return WeeklyReportResponse(
-        id=db_report.id,
-        mentee_id=db_report.mentee_id,
-        mentor_id=db_report.mentor_id,
-        week_number=db_report.week_number,
-        year=db_report.year,
-        accomplishments=db_report.accomplishments,
-        blockers_concerns_comments=db_report.blockers_concerns_comments,
-        aspirations=db_report.aspirations,
-        submission_date=db_report.submission_date,
-        mentee_name=mentee.name
-    )
+    return _report_response(row, row.mentee_name)
 
 
 def get_latest_reports_for_mentee(db: Session, mentee_id: int) -> list[WeeklyReportResponse]:
-    """Get the latest 2 reports for a mentee"""
+    """Get the latest 2 reports for a mentee (cached; report writes invalidate the mentee's entry)"""
+    return latest_reports_cache.get_or_load(mentee_id, lambda: _load_latest_reports_for_mentee(db, mentee_id))
+
+
+def _load_latest_reports_for_mentee(db: Session, mentee_id: int) -> list[WeeklyReportResponse]:
+    # Latest 2 reports joined to the mentee's name in one statement; the outer join still
+    # returns the name when there are no reports, and no row at all means no such mentee
+    latest_ids = select(WeeklyReport.id).where(
+        WeeklyReport.mentee_id == mentee_id
+    ).order_by(
+        WeeklyReport.year.desc(),
+        WeeklyReport.week_number.desc()
+    ).limit(2)
+    rows = db.query(User.name, WeeklyReport).outerjoin(
+        WeeklyReport, and_(WeeklyReport.mentee_id == User.id, WeeklyReport.id.in_(latest_ids))
+    ).filter(
+        User.id == mentee_id
+    ).order_by(
+        WeeklyReport.year.desc(),
+        WeeklyReport.week_number.desc()
+    ).all()
+    
     # Verify mentee exists
-    mentee = db.query(User).filter(User.id == mentee_id).first()
-    if not mentee:
+    if not rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Mentee not found"
         )
     
-    # Get latest 2 reports
-    reports = db.query(WeeklyReport).filter(
-        WeeklyReport.mentee_id == mentee_id
-    ).order_by(
-        WeeklyReport.year.desc(),
-        WeeklyReport.week_number.desc()
-    ).limit(2).all()
-    
     # Format response with mentee name
-    return [
-        WeeklyReportResponse(
-            id=report.id,
-            mentee_id=report.mentee_id,
-            mentor_id=report.mentor_id,
-            week_number=report.week_number,
-            year=report.year,
-            accomplishments=report.accomplishments,
-            blockers_concerns_comments=report.blockers_concerns_comments,
-            aspirations=report.aspirations,
-            submission_date=report.submission_date,
-            mentee_name=mentee.name
+    return [_report_response(report, mentee_name) for mentee_name, report in rows if report is not None]
+
+
+def get_report_for_mentee_week(db: Session, mentee_id: int, year: int, week_number: int) -> WeeklyReportResponse:
+    """Get a mentee's report for one ISO week (point read on the mentee/week/year unique index)"""
+    row = db.query(WeeklyReport, User.name).join(
+        User, WeeklyReport.mentee_id == User.id
+    ).filter(
+        and_(
+            WeeklyReport.mentee_id == mentee_id,
+            WeeklyReport.week_number == week_number,
+            WeeklyReport.year == year
         )
-        for report in reports
-    ]
+    ).first()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+    
+    report, mentee_name = row
+    return _report_response(report, mentee_name)
 
 
 def get_reports_for_mentor(db: Session, mentor_id: int) -> list[WeeklyReportResponse]:
@@ -133,60 +212,316 @@ def get_reports_for_mentor(db: Session, mentor_id: int) -> list[WeeklyReportResp
             blockers_concerns_comments=report.blockers_concerns_comments,
             aspirations=report.aspirations,
             submission_date=report.submission_date,
-            mentee_name=mentee_name
+            mentee_name=mentee_name,
+            version=report.version
         )
         for report, mentee_name in reports
     ]
 
 
-def update_weekly_report(db: Session, report_id: int, report_data: WeeklyReportCreate) -> WeeklyReportResponse:
-    """Update an existing weekly report"""
-    # Get existing report
-    report = db.query(WeeklyReport).filter(WeeklyReport.id == report_id).first()
-    if not report:
+def _mentor_report_page(
+    db: Session,
+    columns: tuple,
+    key: Callable[[Row], tuple[int, int, int]],
+    mentor_id: int,
+    mentee_id: Optional[int] = None,
+    week_number: Optional[int] = None,
+    year: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> tuple[list[Row], Optional[str]]:
+    """One page of a mentor's reports as rows of the given columns, filtered in SQL and
+    keyset-paginated on (year, week_number, id); key(row) gives a row's position"""
+    # Verify mentor exists
+    mentor = db.query(User).filter(
+        and_(User.id == mentor_id, User.user_type == "mentor")
+    ).first()
+    if not mentor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Report not found"
+            detail="Mentor not found"
         )
     
-    # Update report fields
-    report.week_number = report_data.week_number
-    report.year = report_data.year
-    report.accomplishments = report_data.accomplishments
-    report.blockers_concerns_comments = report_data.blockers_concerns_comments
-    report.aspirations = report_data.aspirations
-    report.updated_at = datetime.now(timezone.utc)
+    query = select(*columns).select_from(WeeklyReport).join(
+        User, WeeklyReport.mentee_id == User.id
+    ).where(
+        WeeklyReport.mentor_id == mentor_id
+    )
     
-    db.commit()
-    db.refresh(report)
+    # Apply optional filters
+    if mentee_id is not None:
+        query = query.where(WeeklyReport.mentee_id == mentee_id)
+    if week_number is not None:
+        query = query.where(WeeklyReport.week_number == week_number)
+    if year is not None:
+        query = query.where(WeeklyReport.year == year)
+    if date_from is not None:
+        query = query.where(WeeklyReport.submission_date >= datetime.combine(date_from, time.min))
+    if date_to is not None:
+        query = query.where(WeeklyReport.submission_date < datetime.combine(date_to + timedelta(days=1), time.min))
     
-    # Get mentee name for response
-    mentee = db.query(User).filter(User.id == report.mentee_id).first()
+    # Resume after the last row of the previous page
+    if cursor:
+        try:
+            cursor_year, cursor_week, cursor_id = decode_cursor(cursor, 3)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.where(
+            tuple_(WeeklyReport.year, WeeklyReport.week_number, WeeklyReport.id)
+            < tuple_(cursor_year, cursor_week, cursor_id)
+        )
     
-    return WeeklyReportResponse(
-        id=report.id,
-        mentee_id=report.mentee_id,
-        mentor_id=report.mentor_id,
-        week_number=report.week_number,
-        year=report.year,
-        accomplishments=report.accomplishments,
-        blockers_concerns_comments=report.blockers_concerns_comments,
-        aspirations=report.aspirations,
-        submission_date=report.submission_date,
-        mentee_name=mentee.name
+    # Fetch one extra row to find out whether another page exists
+    rows = db.execute(query.order_by(
+        WeeklyReport.year.desc(),
+        WeeklyReport.week_number.desc(),
+        WeeklyReport.id.desc()
+    ).limit(limit + 1)).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*key(rows[-1]))
+    return rows, next_cursor
+
+
+def query_reports_for_mentor(db: Session, mentor_id: int, **filters) -> WeeklyReportPage:
+    """Get one page of a mentor's reports, filtered in SQL and keyset-paginated on (year, week_number, id)
+
+    Filters: mentee_id, week_number, year, date_from, date_to, limit and cursor.
+    """
+    rows, next_cursor = _mentor_report_page(
+        db, (WeeklyReport, User.name), lambda row: (row[0].year, row[0].week_number, row[0].id), mentor_id, **filters
     )
+    return WeeklyReportPage(
+        items=[_report_response(report, mentee_name) for report, mentee_name in rows],
+        next_cursor=next_cursor
+    )
+
+
+def _body_text(db: Session, column):
+    """A body column as text in SQL; on SQLite it may be stored compressed"""
+    return func.wr_decompress(column) if db.get_bind().dialect.name == "sqlite" else column
+
+
+def query_report_summaries_for_mentor(db: Session, mentor_id: int, preview: bool = False, **filters) -> WeeklyReportSummaryPage:
+    """Like query_reports_for_mentor, but without report text; preview adds the start of the
+    accomplishments and each field's length, computed in SQL so the bodies never leave the database"""
+    columns = _SUMMARY_COLUMNS
+    if preview:
+        columns += (
+            func.substr(_body_text(db, WeeklyReport.accomplishments), 1, PREVIEW_CHARS).label("preview"),
+            *(func.length(_body_text(db, getattr(WeeklyReport, field))).label(f"{field}_chars") for field in BODY_FIELDS)
+        )
+    rows, next_cursor = _mentor_report_page(
+        db, columns, lambda row: (row.year, row.week_number, row.id), mentor_id, **filters
+    )
+    return WeeklyReportSummaryPage(
+        items=[WeeklyReportSummary(**row._mapping) for row in rows],
+        next_cursor=next_cursor
+    )
+
+
+def get_reports_by_ids(db: Session, report_ids: list[int]) -> list[WeeklyReportResponse]:
+    """Full reports in the order of report_ids (one query); IDs that don't exist are left out"""
+    rows = db.execute(
+        select(WeeklyReport, User.name).join(
+            User, WeeklyReport.mentee_id == User.id
+        ).where(WeeklyReport.id.in_(report_ids))
+    ).all()
+    reports = {report.id: _report_response(report, mentee_name) for report, mentee_name in rows}
+    return [reports[report_id] for report_id in dict.fromkeys(report_ids) if report_id in reports]
+
+
+def get_report(db: Session, report_id: int) -> WeeklyReportResponse:
+    """Get one report with its text, e.g. when a listed summary is opened"""
+    reports = get_reports_by_ids(db, [report_id])
+    if not reports:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+    return reports[0]
+
+
+def _write_report(
+    db: Session,
+    report_id: int,
+    values: dict,
+    expected_versions: Optional[Iterable[int]],
+    mentee_id: Optional[int]
+) -> WeeklyReportResponse:
+    """Write some columns of a report, bumping its version, if it is still at one of expected_versions (any if None)"""
+    # One statement: UPDATE ... RETURNING the new row and the mentee's name. The version check
+    # is part of the WHERE, so of two writers who read the same version only the first wins;
+    # so is the owner, so someone else's report looks like a missing one.
+    report = [WeeklyReport.id == report_id]
+    if mentee_id is not None:
+        report.append(WeeklyReport.mentee_id == mentee_id)
+    conditions = list(report)
+    if expected_versions is not None:
+        conditions.append(WeeklyReport.version.in_(list(expected_versions)))
+    if "week_number" in values:
+        values["iso_week_start"] = iso_week_start(values["year"], values["week_number"])
+    stmt = update(WeeklyReport).where(*conditions).values(
+        **values,
+        version=WeeklyReport.version + 1,
+        updated_at=datetime.now(timezone.utc)
+    ).returning(*_RETURNED_COLUMNS).execution_options(synchronize_session=False)
+    
+    try:
+        row = db.execute(stmt).first()
+    except IntegrityError:
+        # Moved onto a week the mentee already has a report for
+        db.rollback()
+        raise _duplicate_week(values["week_number"], values["year"])
+    if row is None:
+        # Only a conditional write needs a second look to tell a stale version from a missing report
+        current = None
+        if expected_versions is not None:
+            current = db.execute(select(WeeklyReport.version).where(*report)).scalar()
+        db.rollback()
+        if current is not None:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail=f"Report has been changed since it was read (now version {current}); fetch it again"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+    
+    db.commit()
+    latest_reports_cache.invalidate(row.mentee_id)
+    
+    return _report_response(row, row.mentee_name)
+
+
+def update_weekly_report(
+    db: Session,
+    report_id: int,
+    report_data: WeeklyReportCreate,
+    expected_versions: Optional[Iterable[int]] = None,
+    mentee_id: Optional[int] = None
+) -> WeeklyReportResponse:
+    """Replace a weekly report's fields; with expected_versions (from If-Match), only if it is still at one of them,
+    and with mentee_id, only if it is that mentee's"""
+    return _write_report(db, report_id, report_data.model_dump(), expected_versions, mentee_id)
 
 
-def delete_weekly_report(db: Session, report_id: int) -> dict:
-    """Delete a weekly report"""
-    report = db.query(WeeklyReport).filter(WeeklyReport.id == report_id).first()
-    if not report:
+def patch_weekly_report(
+    db: Session,
+    report_id: int,
+    changes: WeeklyReportPatch,
+    expected_versions: Optional[Iterable[int]] = None,
+    mentee_id: Optional[int] = None
+) -> WeeklyReportResponse:
+    """Change only the given fields of a weekly report, as update_weekly_report does for all of them
+
+    Columns left out aren't written, so neither is their compressed text, and the search index
+    and rollup triggers only fire for the columns they watch.
+    """
+    values = changes.model_dump(exclude_none=True)
+    if not values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No fields to update"
+        )
+    if ("week_number" in values) != ("year" in values):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="week_number and year must be changed together"
+        )
+    return _write_report(db, report_id, values, expected_versions, mentee_id)
+
+
+def delete_weekly_report(db: Session, report_id: int, mentee_id: Optional[int] = None) -> dict:
+    """Delete a weekly report; with mentee_id, only if it is that mentee's"""
+    conditions = [WeeklyReport.id == report_id]
+    if mentee_id is not None:
+        conditions.append(WeeklyReport.mentee_id == mentee_id)
+    mentee_id = db.execute(
+        delete(WeeklyReport).where(*conditions).returning(WeeklyReport.mentee_id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if mentee_id is None:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Report not found"
         )
     
-    db.delete(report)
     db.commit()
+    latest_reports_cache.invalidate(mentee_id)
     
-    return {"message": "Report deleted successfully"} 
\ No newline at end of file
+    return {"message": "Report deleted successfully"} 
+
+
+# Async variants for the API layer. Each runs the sync implementation above through
+# AsyncSession.run_sync, so database I/O goes through the async driver and yields the
+# event loop instead of blocking it, while the query logic lives in one place.
+
+async def create_weekly_report_async(db: AsyncSession, mentee_id: int, report_data: WeeklyReportCreate) -> WeeklyReportResponse:
+    """Async version of create_weekly_report"""
+    return await db.run_sync(create_weekly_report, mentee_id, report_data)
+
+
+async def get_latest_reports_for_mentee_async(db: AsyncSession, mentee_id: int) -> list[WeeklyReportResponse]:
+    """Async version of get_latest_reports_for_mentee; cache hits never touch the session"""
+    reports = latest_reports_cache.get(mentee_id)
+    if reports is None:
+        reports = await db.run_sync(_load_latest_reports_for_mentee, mentee_id)
+        latest_reports_cache.set(mentee_id, reports)
+    return reports
+
+
+async def get_report_for_mentee_week_async(db: AsyncSession, mentee_id: int, year: int, week_number: int) -> WeeklyReportResponse:
+    """Async version of get_report_for_mentee_week"""
+    return await db.run_sync(get_report_for_mentee_week, mentee_id, year, week_number)
+
+
+async def get_reports_for_mentor_async(db: AsyncSession, mentor_id: int) -> list[WeeklyReportResponse]:
+    """Async version of get_reports_for_mentor"""
+    return await db.run_sync(get_reports_for_mentor, mentor_id)
+
+
+async def query_reports_for_mentor_async(db: AsyncSession, mentor_id: int, **filters) -> WeeklyReportPage:
+    """Async version of query_reports_for_mentor"""
+    return await db.run_sync(query_reports_for_mentor, mentor_id, **filters)
+
+
+async def query_report_summaries_for_mentor_async(db: AsyncSession, mentor_id: int, **options) -> WeeklyReportSummaryPage:
+    """Async version of query_report_summaries_for_mentor"""
+    return await db.run_sync(query_report_summaries_for_mentor, mentor_id, **options)
+
+
+async def get_reports_by_ids_async(db: AsyncSession, report_ids: list[int]) -> list[WeeklyReportResponse]:
+    """Async version of get_reports_by_ids"""
+    return await db.run_sync(get_reports_by_ids, report_ids)
+
+
+async def get_report_async(db: AsyncSession, report_id: int) -> WeeklyReportResponse:
+    """Async version of get_report"""
+    return await db.run_sync(get_report, report_id)
+
+
+async def update_weekly_report_async(db: AsyncSession, report_id: int, report_data: WeeklyReportCreate,
+                                     **options) -> WeeklyReportResponse:
+    """Async version of update_weekly_report"""
+    return await db.run_sync(update_weekly_report, report_id, report_data, **options)
+
+
+async def patch_weekly_report_async(db: AsyncSession, report_id: int, changes: WeeklyReportPatch,
+                                    **options) -> WeeklyReportResponse:
+    """Async version of patch_weekly_report"""
+    return await db.run_sync(patch_weekly_report, report_id, changes, **options)
+
+
+async def delete_weekly_report_async(db: AsyncSession, report_id: int, mentee_id: Optional[int] = None) -> dict:
+    """Async version of delete_weekly_report"""
+    return await db.run_sync(delete_weekly_report, report_id, mentee_id)
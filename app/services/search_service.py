@@ -0,0 +1,185 @@
+import html
+import re
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import User, WeeklyReport
+from app.schemas.reports import ReportSearchHit, ReportSearchPage, WeeklyReportSummary
+from app.services.report_service import _SUMMARY_COLUMNS
+
+SEARCH_FIELDS = ("accomplishments", "blockers_concerns_comments", "aspirations")
+HIGHLIGHT_START, HIGHLIGHT_END = "<mark>", "</mark>"
+# What the database wraps matches in: private-use characters, which survive html.escape and
+# can't be forged by report text the way literal <mark> tags could
+_MATCH_START, _MATCH_END = "\ue000", "\ue001"
+SNIPPET_TOKENS = 16
+
+# Words, "quoted phrases" and word* prefixes; everything else in the query is ignored
+_TERM_PATTERN = re.compile(r'"([^"]*)"|(\w+\*?)', re.UNICODE)
+
+
+def parse_search_terms(q: str) -> list[str]:
+    """Split a user query into words, phrases and prefixes with FTS syntax characters removed"""
+    terms = []
+    for phrase, word in _TERM_PATTERN.findall(q):
+        if phrase:
+            words = re.findall(r"\w+", phrase, re.UNICODE)
+            if words:
+                terms.append(" ".join(words))
+        else:
+            terms.append(word)
+    return terms
+
+
+def _fts5_query(mentor_id: int, terms: list[str], fields: Sequence[str]) -> str:
+    """All terms must match within the chosen fields; the mentor_key column scopes matches to one mentor"""
+    quoted = []
+    for term in terms:
+        prefix = term.endswith("*")
+        quoted.append('"' + term.rstrip("*") + '"' + ("*" if prefix else ""))
+    return f'mentor_key : "m{mentor_id}" AND {{{" ".join(fields)}}} : ({" AND ".join(quoted)})'
+
+
+def _highlight(excerpt: str) -> str:
+    """An excerpt as HTML: the report text escaped, matches wrapped in <mark>"""
+    return html.escape(excerpt).replace(_MATCH_START, HIGHLIGHT_START).replace(_MATCH_END, HIGHLIGHT_END)
+
+
+def _search_sqlite(db: Session, mentor_id: int, terms: list[str], fields: Sequence[str], limit: int, offset: int):
+    # bm25 weights follow the FTS column order; mentor_key never counts towards the rank
+    rank = "bm25(weekly_reports_fts, 0.0, 1.0, 1.0, 1.0)"
+    snippets = ", ".join(
+        f"snippet(weekly_reports_fts, {SEARCH_FIELDS.index(field) + 1}, :start, :end, '…', {SNIPPET_TOKENS}) AS {field}"
+        for field in fields
+    )
+    matches = db.execute(
+        text(
+            f"SELECT rowid AS id, {rank} AS rank, {snippets} FROM weekly_reports_fts "
+            f"WHERE weekly_reports_fts MATCH :query ORDER BY rank, rowid LIMIT :limit OFFSET :offset"
+        ),
+        {"query": _fts5_query(mentor_id, terms, fields), "start": _MATCH_START, "end": _MATCH_END,
+         "limit": limit, "offset": offset}
+    ).mappings().all()
+    # bm25 is lower-is-better; flip the sign so higher ranks are better matches
+    return [(row["id"], -row["rank"], {field: _highlight(row[field]) for field in fields}) for row in matches]
+
+
+def _search_postgresql(db: Session, mentor_id: int, terms: list[str], fields: Sequence[str], limit: int, offset: int):
+    # The combined document matches the expression of the GIN index, so the index is used for the match
+    document = func.to_tsvector(
+        literal_column("'english'"),
+        WeeklyReport.accomplishments + " " + WeeklyReport.blockers_concerns_comments + " " + WeeklyReport.aspirations
+    )
+    query = func.to_tsquery(
+        literal_column("'english'"),
+        " & ".join(
+            "(" + " <-> ".join(word + (":*" if term.endswith("*") else "") for word in term.rstrip("*").split()) + ")"
+            for term in terms
+        )
+    )
+    rank = func.ts_rank(document, query)
+    options = f"StartSel={_MATCH_START}, StopSel={_MATCH_END}, MaxWords={SNIPPET_TOKENS}, MinWords=5"
+    headlines = [
+        func.ts_headline(literal_column("'english'"), getattr(WeeklyReport, field), query, options).label(field)
+        for field in fields
+    ]
+    matches = db.execute(
+        select(WeeklyReport.id, rank.label("rank"), *headlines)
+        .where(and_(WeeklyReport.mentor_id == mentor_id, document.op("@@")(query)))
+        .order_by(rank.desc(), WeeklyReport.id)
+        .limit(limit)
+        .offset(offset)
+    ).mappings().all()
+    # Restricting to some fields only narrows the highlights on PostgreSQL, where one index covers all three
+    return [(row["id"], row["rank"], {field: _highlight(row[field]) for field in fields}) for row in matches]
+
+
+def search_reports_for_mentor(
+    db: Session,
+    mentor_id: int,
+    q: str,
+    fields: Optional[Sequence[str]] = None,
+    limit: int = 20,
+    offset: int = 0
+) -> ReportSearchPage:
+    """Full-text search a mentor's reports, best match first, with highlighted excerpts as HTML
+
+    Hits carry the report without its text; the excerpts are what a results list shows, and the
+    text of a report that is opened comes from GET /reports/{report_id}.
+    """
+    fields = list(fields or SEARCH_FIELDS)
+    unknown = [field for field in fields if field not in SEARCH_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown search field: {unknown[0]}"
+        )
+    terms = parse_search_terms(q)
+    if not terms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query has no words"
+        )
+
+    # Verify mentor exists
+    mentor = db.query(User).filter(
+        and_(User.id == mentor_id, User.user_type == "mentor")
+    ).first()
+    if not mentor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Mentor not found"
+        )
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        matches = _search_sqlite(db, mentor_id, terms, fields, limit + 1, offset)
+    elif dialect == "postgresql":
+        matches = _search_postgresql(db, mentor_id, terms, fields, limit + 1, offset)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"Search is not supported on {dialect}"
+        )
+
+    # Fetch one extra match to find out whether another page exists
+    next_offset = None
+    if len(matches) > limit:
+        matches = matches[:limit]
+        next_offset = offset + limit
+
+    # Load the page's report summaries with one query, then put them back in rank order
+    reports = {
+        row.id: row
+        for row in db.execute(
+            select(*_SUMMARY_COLUMNS).join(User, WeeklyReport.mentee_id == User.id)
+            .where(WeeklyReport.id.in_([report_id for report_id, _, _ in matches]))
+        )
+    }
+    return ReportSearchPage(
+        items=[
+            ReportSearchHit(report=WeeklyReportSummary(**reports[report_id]._mapping), rank=rank, highlights=highlights)
+            for report_id, rank, highlights in matches
+            if report_id in reports
+        ],
+        next_offset=next_offset
+    )
+
+
+def rebuild_search_index(db: Session) -> None:
+    """Rebuild the full-text index from the reports table, e.g. after loading data with the triggers off"""
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(text("INSERT INTO weekly_reports_fts(weekly_reports_fts) VALUES ('rebuild')"))
+        db.execute(text("INSERT INTO weekly_reports_fts(weekly_reports_fts) VALUES ('optimize')"))
+    elif db.get_bind().dialect.name == "postgresql":
+        db.execute(text("REINDEX INDEX ix_weekly_reports_search"))
+    db.commit()
+
+
+async def search_reports_for_mentor_async(db: AsyncSession, mentor_id: int, q: str, **options) -> ReportSearchPage:
+    """Async version of search_reports_for_mentor"""
+    return await db.run_sync(search_reports_for_mentor, mentor_id, q, **options)
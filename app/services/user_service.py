@@ -1,10 +1,13 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import and_
 from fastapi import HTTPException, status
+from typing import Optional
 
 from models import User
-from app.schemas.users import UserCreate
-from app.utils.security import hash_password
+from app.schemas.users import UserCreate, UserResponse
+from app.utils.cache import mentee_list_cache, user_profile_cache
+from app.utils.security import hash_password, hash_password_async
 
 
 def get_user_by_email(db: Session, email: str) -> User:
@@ -17,15 +20,34 @@ def get_user_by_id(db: Session, user_id: int) -> User:
     return db.query(User).filter(User.id == user_id).first()
 
 
-def create_user(db: Session, user_data: UserCreate) -> User:
-    """Create a new user (mentee or mentor)"""
+def get_user_profile(db: Session, user_id: int) -> Optional[UserResponse]:
+    """Get a user's public profile by ID, from the cache when possible"""
+    profile = user_profile_cache.get(user_id)
+    if profile is None:
+        profile = _load_user_profile(db, user_id)
+        if profile is not None:
+            user_profile_cache.set(user_id, profile)
+    return profile
+
+
+def _load_user_profile(db: Session, user_id: int) -> Optional[UserResponse]:
+    user = get_user_by_id(db, user_id)
+    return UserResponse.model_validate(user) if user else None
+
+
+def _email_registered() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Email already registered"
+    )
+
+
+def create_user(db: Session, user_data: UserCreate, password_hash: Optional[str] = None) -> User:
+    """Create a new user (mentee or mentor); pass password_hash if the password was already hashed"""
     # Check if user already exists
     existing_user = get_user_by_email(db, user_data.email)
     if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
+        raise _email_registered()
     
     # Determine user type and mentor
     mentor_id = None
@@ -50,7 +72,7 @@ def create_user(db: Session, user_data: UserCreate) -> User:
     db_user = User(
         name=user_data.name,
         email=user_data.email,
-        password_hash=hash_password(user_data.password),
+        password_hash=password_hash or hash_password(user_data.password),
         user_type=user_type,
         mentor_id=mentor_id,
         team_name=user_data.team_name,
@@ -62,11 +84,18 @@ def create_user(db: Session, user_data: UserCreate) -> User:
     db.commit()
     db.refresh(db_user)
     
+    if mentor_id is not None:
+        mentee_list_cache.invalidate(mentor_id)
+    
     return db_user
 
 
-def get_mentees_for_mentor(db: Session, mentor_id: int) -> list[User]:
-    """Get all mentees for a specific mentor"""
+def get_mentees_for_mentor(db: Session, mentor_id: int) -> list[UserResponse]:
+    """Get all mentees for a specific mentor (cached; create_user invalidates the mentor's entry)"""
+    return mentee_list_cache.get_or_load(mentor_id, lambda: _load_mentees_for_mentor(db, mentor_id))
+
+
+def _load_mentees_for_mentor(db: Session, mentor_id: int) -> list[UserResponse]:
     # Verify mentor exists
     mentor = db.query(User).filter(and_(User.id == mentor_id, User.user_type == "mentor")).first()
     if not mentor:
@@ -80,4 +109,44 @@ def get_mentees_for_mentor(db: Session, mentor_id: int) -> list[User]:
         and_(User.mentor_id == mentor_id, User.is_active == True)
     ).all()
     
-    return mentees 
\ No newline at end of file
+    return [UserResponse.model_validate(mentee) for mentee in mentees]
+
+
+# Async variants for the API layer (see report_service for how these work)
+
+async def get_user_by_email_async(db: AsyncSession, email: str) -> User:
+    """Async version of get_user_by_email"""
+    return await db.run_sync(get_user_by_email, email)
+
+
+async def get_user_by_id_async(db: AsyncSession, user_id: int) -> User:
+    """Async version of get_user_by_id"""
+    return await db.run_sync(get_user_by_id, user_id)
+
+
+async def get_user_profile_async(db: AsyncSession, user_id: int) -> Optional[UserResponse]:
+    """Async version of get_user_profile; cache hits never touch the session"""
+    profile = user_profile_cache.get(user_id)
+    if profile is None:
+        profile = await db.run_sync(_load_user_profile, user_id)
+        if profile is not None:
+            user_profile_cache.set(user_id, profile)
+    return profile
+
+
+async def create_user_async(db: AsyncSession, user_data: UserCreate) -> User:
+    """Async version of create_user; the password is hashed in the hashing pool, not on the event loop,
+    and only once the email is known to be free, so duplicate sign-ups don't cost a hash"""
+    if await get_user_by_email_async(db, user_data.email):
+        raise _email_registered()
+    password_hash = await hash_password_async(user_data.password)
+    return await db.run_sync(create_user, user_data, password_hash)
+
+
+async def get_mentees_for_mentor_async(db: AsyncSession, mentor_id: int) -> list[UserResponse]:
+    """Async version of get_mentees_for_mentor; cache hits never touch the session"""
+    mentees = mentee_list_cache.get(mentor_id)
+    if mentees is None:
+        mentees = await db.run_sync(_load_mentees_for_mentor, mentor_id)
+        mentee_list_cache.set(mentor_id, mentees)
+    return mentees
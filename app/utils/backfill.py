@@ -0,0 +1,120 @@
+"""
+Online data backfills - fill a column for existing rows in small keyset-ordered batches, each
+in its own short transaction with a pause in between, so writers are never locked out for long
+and an interrupted run simply resumes with the rows still pending
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from sqlalchemy import bindparam, column, select, table, text, update
+from sqlalchemy.engine import Engine, Row
+
+from app.utils import compression
+from models import iso_week_start
+
+REPORT_BODY_COLUMNS = ("accomplishments", "blockers_concerns_comments", "aspirations")
+
+
+@dataclass(frozen=True)
+class Backfill:
+    """How to compute one or more columns for the rows of a table that still need them"""
+
+    table: str
+    reads: tuple[str, ...]  # columns compute() needs, besides the key
+    writes: tuple[str, ...]  # columns compute() returns
+    pending: str  # SQL condition selecting rows not yet backfilled
+    compute: Callable[[Row], dict]
+    key: str = "id"
+
+
+@dataclass
+class BackfillResult:
+    rows: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    finished: bool = False
+
+
+def _compress_bodies(row: Row) -> dict:
+    codec = compression.text_codec
+    if not codec.enabled:
+        raise RuntimeError("Report compression is off; set REPORT_COMPRESSION to zlib or zstd first")
+    return {name: codec.encode(compression.decode_text(row._mapping[name])) for name in REPORT_BODY_COLUMNS}
+
+
+BACKFILLS = {
+    "iso_week_start": Backfill(
+        table="weekly_reports",
+        reads=("year", "week_number"),
+        writes=("iso_week_start",),
+        pending="iso_week_start IS NULL",
+        compute=lambda row: {"iso_week_start": iso_week_start(row.year, row.week_number)}
+    ),
+    # Store existing report bodies the way REPORT_COMPRESSION says (SQLite); texts too short to
+    # gain stay plain, and the keyset means they're only looked at once per run
+    "compress_report_bodies": Backfill(
+        table="weekly_reports",
+        reads=REPORT_BODY_COLUMNS,
+        writes=REPORT_BODY_COLUMNS,
+        pending=" OR ".join(f"typeof({name}) = 'text'" for name in REPORT_BODY_COLUMNS),
+        compute=_compress_bodies
+    ),
+    # Back to plain text, e.g. before turning compression off or downgrading past it
+    "decompress_report_bodies": Backfill(
+        table="weekly_reports",
+        reads=REPORT_BODY_COLUMNS,
+        writes=REPORT_BODY_COLUMNS,
+        pending=" OR ".join(f"typeof({name}) = 'blob'" for name in REPORT_BODY_COLUMNS),
+        compute=lambda row: {name: compression.decode_text(row._mapping[name]) for name in REPORT_BODY_COLUMNS}
+    ),
+}
+
+
+def run_backfill(
+    engine: Engine,
+    backfill: Backfill,
+    batch_size: int = 1000,
+    pause_seconds: float = 0.05,
+    max_batches: Optional[int] = None,
+    progress: Optional[Callable[[BackfillResult], None]] = None
+) -> BackfillResult:
+    """Backfill pending rows batch by batch; max_batches stops early (finished stays False)"""
+    key = column(backfill.key)
+    # A column may be both read and written
+    target = table(backfill.table, key, *(column(name) for name in dict.fromkeys(backfill.reads + backfill.writes)))
+    read = select(target.c[backfill.key], *(target.c[name] for name in backfill.reads)).where(
+        text(f"({backfill.pending})")
+    ).order_by(target.c[backfill.key]).limit(batch_size)
+    write = update(target).where(target.c[backfill.key] == bindparam("_key")).values(
+        {name: bindparam(name) for name in backfill.writes}
+    )
+
+    result = BackfillResult()
+    start = time.perf_counter()
+    last_key = None
+    while max_batches is None or result.batches < max_batches:
+        with engine.begin() as conn:
+            # Keyset on the key so rows compute() leaves pending (e.g. NULL for bad input) aren't re-read
+            batch_read = read if last_key is None else read.where(target.c[backfill.key] > last_key)
+            rows = conn.execute(batch_read).all()
+            if rows:
+                conn.execute(write, [{"_key": row[0], **backfill.compute(row)} for row in rows])
+        if not rows:
+            result.finished = True
+            break
+        last_key = rows[-1][0]
+        result.rows += len(rows)
+        result.batches += 1
+        result.elapsed_seconds = round(time.perf_counter() - start, 3)
+        if progress:
+            progress(result)
+        if len(rows) < batch_size:
+            result.finished = True
+            break
+        # Let other writers in before taking the write lock again
+        time.sleep(pause_seconds)
+
+    result.elapsed_seconds = round(time.perf_counter() - start, 3)
+    return result
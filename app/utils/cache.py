@@ -0,0 +1,193 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from app.config import Settings, settings
+
+
+class CacheBackend:
+    """Key/value store behind the read-through caches; entries expire after a per-entry ttl in seconds"""
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, *keys: Hashable) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """Thread-safe in-process LRU cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache(CacheBackend):
+    """Cache shared by every worker, kept in Redis; eviction is Redis's own (set maxmemory-policy allkeys-lru)
+
+    Values are pickled, so only point this at a Redis instance the app alone writes to.
+    """
+
+    def __init__(self, url: str, ttl: float = 60.0, prefix: str = "weekly-sync:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis needs the redis package (pip install redis)")
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def _key(self, key: Hashable) -> str:
+        return self.prefix + ":".join(str(part) for part in (key if isinstance(key, tuple) else (key,)))
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        data = self._client.get(self._key(key))
+        return None if data is None else pickle.loads(data)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl_ms = int((self.ttl if ttl is None else ttl) * 1000)
+        self._client.set(self._key(key), pickle.dumps(value), px=max(ttl_ms, 1))
+
+    def delete(self, *keys: Hashable) -> None:
+        if keys:
+            self._client.delete(*(self._key(key) for key in keys))
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=self.prefix + "*", count=1000):
+            self._client.delete(key)
+
+
+def build_cache_backend(config: Settings = settings) -> CacheBackend:
+    """Create the backend named by CACHE_BACKEND"""
+    if config.cache_backend == "memory":
+        return LRUCache(maxsize=config.cache_max_entries, ttl=config.cache_ttl_seconds)
+    if config.cache_backend == "redis":
+        if not config.cache_url:
+            raise ValueError("CACHE_BACKEND=redis needs CACHE_URL")
+        return RedisCache(config.cache_url, ttl=config.cache_ttl_seconds)
+    raise ValueError(f"Unknown cache backend: {config.cache_backend}")
+
+
+class ReadThroughCache:
+    """A named slice of a cache backend that loads missing entries and counts hits and misses
+
+    Writers call invalidate() after committing, so readers never see data older than the last write
+    made through the services (other processes sharing the database can be up to ttl seconds stale
+    with the in-process backend).
+    """
+
+    def __init__(self, name: str, backend: CacheBackend, ttl: Optional[float] = None):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = self.misses = self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self.backend.get((self.name, key))
+        self._count("misses" if value is None else "hits")
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.backend.set((self.name, key), value, self.ttl)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value, or call loader and cache what it returns; exceptions are not cached"""
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, *keys: Hashable) -> None:
+        if keys:
+            self.backend.delete(*((self.name, key) for key in keys))
+            self._count("invalidations", len(keys))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.invalidations = 0
+
+
+cache_backend = build_cache_backend()
+
+# Active users resolved from access tokens, by user ID
+current_user_cache = ReadThroughCache("current_user", cache_backend)
+# User profiles, by user ID
+user_profile_cache = ReadThroughCache("user", cache_backend)
+# Active mentees of a mentor, by mentor ID
+mentee_list_cache = ReadThroughCache("mentees", cache_backend)
+# A mentee's latest reports, by mentee ID
+latest_reports_cache = ReadThroughCache("latest_reports", cache_backend)
+
+CACHES = [current_user_cache, user_profile_cache, mentee_list_cache, latest_reports_cache]
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of every cache in this process"""
+    stats = {cache.name: cache.stats() for cache in CACHES}
+    if isinstance(cache_backend, LRUCache):
+        stats["entries"] = len(cache_backend)
+    return stats
+
+
+def clear_caches() -> None:
+    """Drop every cached entry and reset the counters"""
+    cache_backend.clear()
+    for cache in CACHES:
+        cache.reset_stats()
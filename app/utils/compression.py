@@ -0,0 +1,145 @@
+"""
+Compressed storage for report bodies - a column type that stores long text as a compressed
+blob on SQLite and hands back plain strings, and the wr_decompress() SQL function the
+full-text index reads bodies through
+"""
+
+import zlib
+from functools import lru_cache
+from typing import Optional, Union
+
+from sqlalchemy import Text
+from sqlalchemy.types import TypeDecorator
+
+from app.config import Settings, settings
+
+# Stored values start with a two-byte header: the codec, then the preset dictionary (0 for
+# none). Ids are never reused, so every value ever written stays readable whatever the settings.
+ZLIB, ZSTD = 1, 2
+CODECS = {"zlib": ZLIB, "zstd": ZSTD}
+# zlib values are bare deflate streams; the header already says how to read them, so the zlib
+# wrapper's own header and checksum would be 6 wasted bytes per value
+RAW_DEFLATE = -15
+
+# Preset dictionary 1: phrasing common to weekly reports, most frequent last (zlib looks
+# back from the end). Short texts get most of their saving from it, having too little
+# history of their own to reference.
+PRESET_DICTIONARY_1 = (
+    " customer support ticket escalation vendor contract budget audit compliance security review"
+    " hiring interview candidate onboarding new hire documentation wiki runbook postmortem"
+    " incident outage on-call rotation alert monitoring dashboard metrics latency p95 error rate"
+    " kubernetes cluster terraform infrastructure network database migration schema index query"
+    " cache performance memory refactor cleanup tech debt flaky tests test coverage ci pipeline build"
+    " staging production release deploy rollout rollback feature flag prototype design doc roadmap"
+    " quarter planning estimate sprint demo retro standup one-on-one stakeholder product manager"
+    " Looking forward to Hoping to Would like to I want to get better at improve my skills learn more about"
+    " Next week I plan to Next week I will My goal for next week is to Continue working on"
+    " Not sure how to Concerned about Waiting on Blocked by Blocked on Need help with No blockers. None."
+    " Fixed a bug in Reviewed pull requests Paired with Met with Helped with Started working on"
+    " Finished the Completed the Shipped the Worked on This week I "
+).encode()
+
+DICTIONARIES = {1: PRESET_DICTIONARY_1}
+CURRENT_DICTIONARY = 1
+
+try:
+    import zstandard
+except ImportError:  # optional; only needed to write or read zstd values
+    zstandard = None
+
+
+@lru_cache(maxsize=None)
+def _zstd_dictionary(dictionary_id: int):
+    return zstandard.ZstdCompressionDict(DICTIONARIES[dictionary_id], dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+
+
+def _require_zstandard() -> None:
+    if zstandard is None:
+        raise RuntimeError("zstd-compressed report text needs the zstandard package (pip install zstandard)")
+
+
+def decode_text(value: Union[str, bytes, None]) -> Optional[str]:
+    """The text of a stored value, compressed or not"""
+    if value is None or isinstance(value, str):
+        return value
+    codec, dictionary_id, payload = value[0], value[1], bytes(value[2:])
+    if codec == ZLIB:
+        options = {"zdict": DICTIONARIES[dictionary_id]} if dictionary_id else {}
+        decompressor = zlib.decompressobj(RAW_DEFLATE, **options)
+        return (decompressor.decompress(payload) + decompressor.flush()).decode()
+    if codec == ZSTD:
+        _require_zstandard()
+        options = {"dict_data": _zstd_dictionary(dictionary_id)} if dictionary_id else {}
+        return zstandard.ZstdDecompressor(**options).decompress(payload).decode()
+    raise ValueError(f"Unknown text codec {codec}")
+
+
+class TextCodec:
+    """Compresses text of at least min_bytes with zlib or zstd, when that actually saves space"""
+
+    def __init__(self, algorithm: str = "off", min_bytes: int = 64, level: Optional[int] = None):
+        if algorithm != "off" and algorithm not in CODECS:
+            raise ValueError(f"Unknown report compression: {algorithm}")
+        if algorithm == "zstd":
+            _require_zstandard()
+        self.algorithm = algorithm
+        self.min_bytes = min_bytes
+        self.level = level
+
+    @property
+    def enabled(self) -> bool:
+        return self.algorithm != "off"
+
+    def compress(self, text: str) -> bytes:
+        raw = text.encode()
+        if self.algorithm == "zlib":
+            compressor = zlib.compressobj(
+                6 if self.level is None else self.level, zlib.DEFLATED, RAW_DEFLATE,
+                zdict=DICTIONARIES[CURRENT_DICTIONARY]
+            )
+            payload = compressor.compress(raw) + compressor.flush()
+        elif self.algorithm == "zstd":
+            payload = zstandard.ZstdCompressor(
+                level=3 if self.level is None else self.level, dict_data=_zstd_dictionary(CURRENT_DICTIONARY)
+            ).compress(raw)
+        else:
+            raise RuntimeError("Report compression is off; set REPORT_COMPRESSION to zlib or zstd")
+        return bytes((CODECS[self.algorithm], CURRENT_DICTIONARY)) + payload
+
+    def encode(self, text: str) -> Union[str, bytes]:
+        """What to store for a text: compressed bytes, or the text itself if short or incompressible"""
+        if not self.enabled or len(text) * 4 < self.min_bytes:
+            return text
+        raw_size = len(text.encode())
+        if raw_size < self.min_bytes:
+            return text
+        compressed = self.compress(text)
+        return compressed if len(compressed) < raw_size else text
+
+
+def build_text_codec(config: Settings = settings) -> TextCodec:
+    """Create the codec named by REPORT_COMPRESSION"""
+    return TextCodec(config.report_compression, config.report_compression_min_bytes)
+
+
+# Writes use whatever this is when they run; reads handle every format regardless
+text_codec = build_text_codec()
+
+
+class CompressedText(TypeDecorator):
+    """Text stored compressed on SQLite when REPORT_COMPRESSION is on; reads always return str
+
+    Values are only decompressed for the rows and columns a query actually selects. Other
+    databases store plain text (PostgreSQL already compresses long values in TOAST).
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name != "sqlite":
+            return value
+        return text_codec.encode(value)
+
+    def process_result_value(self, value, dialect):
+        return decode_text(value)
@@ -0,0 +1,71 @@
+import base64
+import binascii
+import hashlib
+from typing import Optional
+
+
+def encode_cursor(*values: int) -> str:
+    """Encode a keyset position (e.g. year, week_number, id) as an opaque cursor"""
+    raw = ":".join(str(value) for value in values)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> tuple[int, ...]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        values = tuple(int(part) for part in raw.split(":"))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+    # Anything outside a 64-bit integer can't be a database key, and fails when bound
+    if len(values) != size or not all(-2**63 <= value < 2**63 for value in values):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def make_etag(content: str) -> str:
+    """Build a strong ETag header value from a response representation"""
+    return '"' + hashlib.sha256(content.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, '*' matches anything)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def version_etag(resource_id: int, version: int) -> str:
+    """A strong ETag naming one version of a versioned row, so If-Match can be checked in SQL"""
+    return f'"{resource_id}.{version}"'
+
+
+def if_match_versions(if_match: Optional[str], resource_id: int) -> Optional[set[int]]:
+    """The versions of a row an If-Match header accepts (strong comparison): None without a
+    header or with '*', an empty set if none of its ETags are one of this row's version_etag()s"""
+    if not if_match or if_match.strip() == "*":
+        return None
+    versions = set()
+    for tag in (tag.strip() for tag in if_match.split(",")):
+        if len(tag) < 2 or not (tag.startswith('"') and tag.endswith('"')):
+            continue  # weak (W/) or malformed
+        row_id, _, version = tag[1:-1].partition(".")
+        if row_id == str(resource_id) and version.isdigit():
+            versions.add(int(version))
+    return versions
+
+
+def parse_iso_week(value: str) -> tuple[int, int]:
+    """Parse an ISO week like 2024-W09 into (year, week_number), raising ValueError if it is malformed"""
+    year, separator, week = value.upper().partition("-W")
+    if not (separator and year.isdigit() and week.isdigit() and len(year) == 4):
+        raise ValueError(f"Invalid ISO week {value!r}, expected e.g. 2024-W09")
+    return int(year), int(week)
+
+
+def format_iso_week(year: int, week_number: int) -> str:
+    """The ISO week as 2024-W09, the form parse_iso_week reads"""
+    return f"{year}-W{week_number:02d}"
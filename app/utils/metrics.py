@@ -0,0 +1,247 @@
+"""
+Per-route request metrics - latency histograms plus SQL statement counts, SQL time and rows
+returned - gathered by ASGI middleware and SQLAlchemy engine events, rendered in the
+Prometheus text format
+"""
+
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger("app.sql.slow")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class _RequestStats:
+    """SQL work done while serving one request"""
+
+    __slots__ = ("statements", "sql_seconds", "rows")
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+
+
+# The stats of the request being served; SQLAlchemy runs sync code for AsyncSession in a
+# greenlet that shares the request task's context, so events see the same object
+_current: ContextVar[Optional[_RequestStats]] = ContextVar("request_sql_stats", default=None)
+
+
+class _RouteMetrics:
+    __slots__ = ("buckets", "latency_sum", "requests", "statements", "sql_seconds", "rows", "statuses")
+
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+        self.requests = 0
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.statuses: dict[int, int] = {}
+
+
+class MetricsRegistry:
+    """Metrics per (method, route template) for this process"""
+
+    def __init__(self):
+        self._routes: dict[tuple[str, str], _RouteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float, stats: _RequestStats) -> None:
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = _RouteMetrics()
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    metrics.buckets[i] += 1
+            metrics.latency_sum += seconds
+            metrics.requests += 1
+            metrics.statements += stats.statements
+            metrics.sql_seconds += stats.sql_seconds
+            metrics.rows += stats.rows
+            metrics.statuses[status_code] = metrics.statuses.get(status_code, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = [
+                "# HELP http_request_duration_seconds Request latency by route",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), metrics in routes:
+                labels = f'method="{method}",route="{_escape(route)}"'
+                for bound, count in zip(LATENCY_BUCKETS, metrics.buckets):
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {metrics.requests}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {metrics.latency_sum:.6f}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {metrics.requests}")
+
+            lines += ["# HELP http_requests_total Requests by route and status", "# TYPE http_requests_total counter"]
+            for (method, route), metrics in routes:
+                for status_code, count in sorted(metrics.statuses.items()):
+                    lines.append(
+                        f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status_code}"}} {count}'
+                    )
+
+            for name, help_text, attribute, fmt in (
+                ("db_statements_total", "SQL statements executed while serving the route", "statements", "{}"),
+                ("db_statement_duration_seconds_total", "Time spent executing SQL for the route", "sql_seconds", "{:.6f}"),
+                ("db_rows_total", "Rows returned by or written by SQL for the route", "rows", "{}"),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (method, route), metrics in routes:
+                    value = fmt.format(getattr(metrics, attribute))
+                    lines.append(f'{name}{{method="{method}",route="{_escape(route)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request and attributing its SQL work to the matched route"""
+
+    def __init__(self, app, metrics: MetricsRegistry = registry):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = _RequestStats()
+        token = _current.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            # The router stores the matched route in the scope; label by its template so
+            # /reports/1 and /reports/2 share one series
+            route = scope.get("route")
+            self.metrics.observe(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_code,
+                time.perf_counter() - start,
+                stats
+            )
+
+
+class _RowCountingCursor:
+    """Wraps a DBAPI cursor to count the rows fetched through it"""
+
+    def __init__(self, cursor, stats: _RequestStats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._stats.rows += 1
+            yield row
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+
+def _parameter_shape(value) -> str:
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shapes(parameters, executemany: bool = False) -> str:
+    """Types and lengths of bound parameters, never their values"""
+    if executemany:
+        rows = list(parameters)
+        return f"{len(rows)} x {parameter_shapes(rows[0]) if rows else '()'}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {_parameter_shape(value)}" for key, value in parameters.items()) + "}"
+    return "(" + ", ".join(_parameter_shape(value) for value in parameters or ()) + ")"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.sql_seconds += elapsed
+        if cursor.description is not None and context is not None:
+            # Result rows are fetched after this event; count them as they are
+            context.cursor = _RowCountingCursor(cursor, stats)
+        elif cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+
+    if settings.slow_query_ms >= 0 and elapsed * 1000 >= settings.slow_query_ms:
+        logger.warning(
+            "Slow query (%.1f ms): %s | parameters: %s",
+            elapsed * 1000,
+            re.sub(r"\s+", " ", statement).strip(),
+            parameter_shapes(parameters, executemany)
+        )
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't run for a failed statement; drop its start time
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement run on the engine, attribute it to the current request and log slow ones"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
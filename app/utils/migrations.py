@@ -0,0 +1,61 @@
+"""
+Alembic wiring - configuration for the migrations/ directory, upgrades, and the schema version
+check the API runs at startup instead of creating tables
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+class SchemaVersionError(RuntimeError):
+    """The database schema isn't at the revision this code expects"""
+
+
+def alembic_config(database_url: Optional[str] = None, **attributes) -> Config:
+    """Alembic config for the project's migrations; attributes reach env.py and migrations via config.attributes"""
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "migrations"))
+    # ConfigParser treats % as interpolation, and URLs may contain escaped characters
+    config.set_main_option("sqlalchemy.url", (database_url or settings.database_url).replace("%", "%%"))
+    config.attributes.update(attributes)
+    return config
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(engine: Engine) -> Optional[str]:
+    with engine.connect() as conn:
+        return MigrationContext.configure(conn).get_current_revision()
+
+
+def check_schema_version(engine: Engine) -> str:
+    """Raise SchemaVersionError unless the database is migrated to the latest revision"""
+    current, head = current_revision(engine), head_revision()
+    if current != head:
+        raise SchemaVersionError(
+            f"Database schema is at revision {current or '<none>'} but this code needs {head}; "
+            f"run `python -m app.cli db upgrade`"
+        )
+    return current
+
+
+def upgrade_database(database_url: Optional[str] = None, revision: str = "head", **attributes) -> None:
+    """Migrate the database to a revision
+
+    Attributes: configure_logging=False keeps alembic.ini's logging setup out of the caller's
+    process; defer_backfills, backfill_batch_size, backfill_pause_seconds and backfill_progress
+    control data backfills (see migrations/versions/0002_iso_week_start.py).
+    """
+    command.upgrade(alembic_config(database_url, **attributes), revision)
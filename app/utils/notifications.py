@@ -0,0 +1,105 @@
+"""
+Outgoing notifications - a transport delivers batches of messages (to an SMTP server, or to a
+JSON-lines file for development and tests), paced by a rate limiter shared by the process
+"""
+
+import json
+import smtplib
+import threading
+import time
+from dataclasses import asdict, dataclass
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Optional
+
+from app.config import Settings, settings
+
+
+@dataclass(frozen=True)
+class Message:
+    recipient_id: int
+    to: str
+    subject: str
+    body: str
+
+
+class RateLimiter:
+    """Spaces calls to wait() at most rate per second apart, across threads; blocks the calling thread"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class NotificationTransport:
+    """Delivers messages; send_batch returns an error message per message, None for each one delivered"""
+
+    def send_batch(self, messages: list[Message], limiter: RateLimiter) -> list[Optional[str]]:
+        raise NotImplementedError
+
+
+class FileTransport(NotificationTransport):
+    """Appends each message to a JSON-lines file instead of sending it"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages: list[Message], limiter: RateLimiter) -> list[Optional[str]]:
+        with self._lock, self.path.open("a", encoding="utf-8") as sink:
+            for message in messages:
+                limiter.wait()
+                sink.write(json.dumps(asdict(message)) + "\n")
+        return [None] * len(messages)
+
+
+class SMTPTransport(NotificationTransport):
+    """Sends each batch over one SMTP connection (e.g. a local relay, or `python -m aiosmtpd -n` to try it out)"""
+
+    def __init__(self, host: str, port: int, sender: str, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.timeout = timeout
+
+    def _email(self, message: Message) -> EmailMessage:
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = message.to
+        email["Subject"] = message.subject
+        email.set_content(message.body)
+        return email
+
+    def send_batch(self, messages: list[Message], limiter: RateLimiter) -> list[Optional[str]]:
+        try:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        except OSError as e:
+            return [f"Could not connect to {self.host}:{self.port}: {e}"] * len(messages)
+        errors = []
+        with smtp:
+            for message in messages:
+                limiter.wait()
+                try:
+                    smtp.send_message(self._email(message))
+                    errors.append(None)
+                except (smtplib.SMTPException, OSError) as e:
+                    errors.append(str(e)[:500] or type(e).__name__)
+        return errors
+
+
+def build_transport(config: Settings = settings) -> NotificationTransport:
+    """Create the transport named by NOTIFICATION_TRANSPORT"""
+    if config.notification_transport == "file":
+        return FileTransport(config.notification_file)
+    if config.notification_transport == "smtp":
+        return SMTPTransport(config.smtp_host, config.smtp_port, config.smtp_sender)
+    raise ValueError(f"Unknown notification transport: {config.notification_transport}")
@@ -0,0 +1,75 @@
+"""
+In-process periodic jobs - an asyncio task wakes up every tick and runs each job in a worker
+thread, so blocking database and SMTP work never stalls the event loop. Jobs decide themselves
+whether anything is due, and must be safe to call from several processes at once.
+"""
+
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger("app.scheduler")
+
+
+@dataclass(frozen=True)
+class ScheduledJob:
+    name: str
+    # Called every tick with the time in UTC (naive) and an event set on shutdown, which long
+    # jobs check between units of work so they stop early and resume on the next start
+    run: Callable[[datetime, threading.Event], Any]
+
+
+class Scheduler:
+    """Runs jobs every tick_seconds; a job still running from an earlier tick is skipped, not doubled"""
+
+    def __init__(self, jobs: list[ScheduledJob], tick_seconds: float = 60):
+        self.jobs = jobs
+        self.tick_seconds = tick_seconds
+        self._running: dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self._shutdown = threading.Event()
+
+    async def _run_job(self, job: ScheduledJob, now: datetime) -> None:
+        try:
+            await asyncio.to_thread(job.run, now, self._shutdown)
+        except Exception:
+            logger.exception("Scheduled job %s failed", job.name)
+
+    def tick(self, now: Optional[datetime] = None) -> list[asyncio.Task]:
+        """Start every job that isn't still running; returns their tasks"""
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        started = []
+        for job in self.jobs:
+            if job.name in self._running and not self._running[job.name].done():
+                continue
+            self._running[job.name] = task = asyncio.create_task(self._run_job(job, now), name=f"job:{job.name}")
+            started.append(task)
+        return started
+
+    async def run(self) -> None:
+        """Tick until stop() is called"""
+        while not self._stopping.is_set():
+            self.tick()
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.tick_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._shutdown.clear()
+        self._task = asyncio.create_task(self.run(), name="scheduler")
+
+    async def stop(self) -> None:
+        """Stop ticking and wait for running jobs to reach a point where they can stop"""
+        self._stopping.set()
+        self._shutdown.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await asyncio.gather(*self._running.values())
+        self._running.clear()
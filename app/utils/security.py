@@ -1,11 +1,244 @@
+import asyncio
+import base64
 import hashlib
+import hmac
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.config import settings
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+class PasswordHasher:
+    """Base class for password hashers; stored hashes look like '<algorithm>$<params...>$<salt>$<hash>'"""
+
+    algorithm = ""
+
+    def hash(self, password: str) -> str:
+        raise NotImplementedError
+
+    def verify(self, password: str, hashed: str) -> bool:
+        raise NotImplementedError
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Whether a stored hash was made with a different algorithm or cost than this hasher uses"""
+        raise NotImplementedError
+
+    def identify(self, hashed: str) -> bool:
+        return hashed.startswith(self.algorithm + "$")
+
+
+class ScryptHasher(PasswordHasher):
+    """scrypt with a random 16-byte salt; cost is tuned with n (CPU/memory), r (block size) and p (parallelism)"""
+
+    algorithm = "scrypt"
+
+    def __init__(self, n: int = 16384, r: int = 8, p: int = 1):
+        self.n, self.r, self.p = n, r, p
+
+    def _derive(self, password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=n, r=r, p=p, dklen=32,
+            maxmem=256 * n * r * p  # twice the 128*n*r*p bytes scrypt needs
+        )
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(16)
+        derived = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{self.algorithm}${self.n}${self.r}${self.p}${_b64encode(salt)}${_b64encode(derived)}"
+
+    def verify(self, password: str, hashed: str) -> bool:
+        try:
+            _, n, r, p, salt, expected = hashed.split("$")
+            derived = self._derive(password, _b64decode(salt), int(n), int(r), int(p))
+            expected = _b64decode(expected)
+        except ValueError:
+            # Malformed or corrupted hash (binascii.Error is a ValueError too)
+            return False
+        return hmac.compare_digest(derived, expected)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        if not self.identify(hashed):
+            return True
+        _, n, r, p, _, _ = hashed.split("$")
+        return (int(n), int(r), int(p)) != (self.n, self.r, self.p)
+
+
+class PBKDF2Hasher(PasswordHasher):
+    """PBKDF2-HMAC-SHA256 with a random 16-byte salt; cost is the iteration count"""
+
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations: int = 600000):
+        self.iterations = iterations
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(16)
+        derived = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.iterations)
+        return f"{self.algorithm}${self.iterations}${_b64encode(salt)}${_b64encode(derived)}"
+
+    def verify(self, password: str, hashed: str) -> bool:
+        try:
+            _, iterations, salt, expected = hashed.split("$")
+            derived = hashlib.pbkdf2_hmac("sha256", password.encode(), _b64decode(salt), int(iterations))
+            expected = _b64decode(expected)
+        except ValueError:
+            # Malformed or corrupted hash (binascii.Error is a ValueError too)
+            return False
+        return hmac.compare_digest(derived, expected)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        if not self.identify(hashed):
+            return True
+        return int(hashed.split("$")[1]) != self.iterations
+
+
+class LegacySHA256Hasher(PasswordHasher):
+    """Unsalted SHA-256 hex digests from before the KDF migration - verify only, never used for new hashes"""
+
+    algorithm = "sha256"
+
+    def hash(self, password: str) -> str:
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return hmac.compare_digest(self.hash(password), hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return True
+
+    def identify(self, hashed: str) -> bool:
+        return len(hashed) == 64 and all(c in "0123456789abcdef" for c in hashed)
+
+
+def build_hasher(name: str) -> PasswordHasher:
+    """Create the hasher named in settings with the configured cost"""
+    if name == ScryptHasher.algorithm:
+        return ScryptHasher(n=settings.scrypt_n, r=settings.scrypt_r, p=settings.scrypt_p)
+    if name == PBKDF2Hasher.algorithm:
+        return PBKDF2Hasher(iterations=settings.pbkdf2_iterations)
+    raise ValueError(f"Unknown password hasher: {name}")
+
+
+_hasher: PasswordHasher = build_hasher(settings.password_hasher)
+_known_hashers = [ScryptHasher(), PBKDF2Hasher(), LegacySHA256Hasher()]
+
+# hashlib's KDFs release the GIL, so a small thread pool keeps them off the event loop
+# and caps how many run at once
+_executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="password-hash")
+
+
+def _new_executor_after_fork():
+    # A forked child doesn't inherit the parent's pool threads; a pool that had started some would hang
+    global _executor
+    _executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="password-hash")
+
+
+os.register_at_fork(after_in_child=_new_executor_after_fork)
+
+
+def set_password_hasher(hasher: PasswordHasher) -> None:
+    """Replace the hasher used for new hashes (e.g. to change the cost at runtime)"""
+    global _hasher
+    _hasher = hasher
+
+
+def _hasher_for(hashed: str) -> Optional[PasswordHasher]:
+    if _hasher.identify(hashed):
+        return _hasher
+    return next((hasher for hasher in _known_hashers if hasher.identify(hashed)), None)
 
 
 def hash_password(password: str) -> str:
-    """Hash a password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash a password with the configured KDF"""
+    return _hasher.hash(password)
 
 
 def verify_password(password: str, hashed: str) -> bool:
-    """Verify a password against its hash"""
-    return hash_password(password) == hashed 
\ No newline at end of file
+    """Verify a password against a stored hash of any supported algorithm"""
+    hasher = _hasher_for(hashed)
+    return hasher is not None and hasher.verify(password, hashed)
+
+
+def needs_rehash(hashed: str) -> bool:
+    """Whether a stored hash should be replaced with one from the configured hasher"""
+    return _hasher.needs_rehash(hashed)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password in the bounded hashing pool"""
+    return await asyncio.get_running_loop().run_in_executor(_executor, hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    """verify_password in the bounded hashing pool"""
+    return await asyncio.get_running_loop().run_in_executor(_executor, verify_password, password, hashed)
+
+
+# Access/refresh tokens: compact JWTs signed with HMAC-SHA256
+
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+
+class TokenError(ValueError):
+    """Raised when a token is malformed, has a bad signature, is expired or has the wrong type"""
+
+
+def _sign(signing_input: bytes) -> str:
+    return _b64encode_url(hmac.new(settings.secret_key.encode(), signing_input, hashlib.sha256).digest())
+
+
+def _b64encode_url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64decode_url(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def create_token(user_id: int, token_type: str = ACCESS_TOKEN, ttl_seconds: Optional[int] = None) -> str:
+    """Create a signed token for a user that expires after ttl_seconds"""
+    if ttl_seconds is None:
+        ttl_seconds = settings.access_token_ttl_seconds if token_type == ACCESS_TOKEN else settings.refresh_token_ttl_seconds
+    now = int(time.time())
+    header = {"alg": "HS256", "typ": "JWT"}
+    payload = {"sub": str(user_id), "type": token_type, "iat": now, "exp": now + ttl_seconds,
+               "jti": _b64encode_url(os.urandom(9))}
+    signing_input = ".".join(
+        _b64encode_url(json.dumps(part, separators=(",", ":")).encode()) for part in (header, payload)
+    )
+    return f"{signing_input}.{_sign(signing_input.encode())}"
+
+
+def decode_token(token: str, token_type: str = ACCESS_TOKEN) -> int:
+    """Verify a token's signature, expiry and type and return its user ID"""
+    try:
+        header, payload, signature = token.split(".")
+    except ValueError:
+        raise TokenError("Malformed token")
+    # Compared as bytes: compare_digest raises TypeError for str with non-ASCII characters
+    if not hmac.compare_digest(_sign(f"{header}.{payload}".encode()).encode(), signature.encode()):
+        raise TokenError("Invalid token signature")
+
+    try:
+        claims = json.loads(_b64decode_url(payload))
+        user_id = int(claims["sub"])
+        expires_at = int(claims["exp"])
+    except (ValueError, KeyError, TypeError):
+        raise TokenError("Malformed token")
+    if claims.get("type") != token_type:
+        raise TokenError("Wrong token type")
+    if expires_at < time.time():
+        raise TokenError("Token expired")
+    return user_id
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Load benchmark - API throughput vs. number of concurrent clients, comparing the old
+pattern (async routes calling the sync Session, which blocks the event loop) with the
+AsyncSession path the API now uses.
+
+SQLite runs in-process, so by default there is almost no I/O wait for the async path to
+overlap. --latency-ms adds a simulated network round trip to every statement, the way a
+PostgreSQL server would: a blocking sleep for the sync driver, an awaited one for the
+async driver.
+
+Usage:
+    python -m benchmarks.bench_async_db --mentees 50 --years 10 --concurrency 1 4 16 64 --latency-ms 2
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util import await_only
+
+from models import Base, User, WeeklyReport, get_async_db, register_sqlite_functions
+from app.main import app
+from app.services.report_service import query_reports_for_mentor
+
+
+def seed(engine, mentees: int, years: int) -> tuple[int, list[int]]:
+    """Insert one mentor with `mentees` mentees, each with `years` years of weekly reports"""
+    with Session(engine) as db:
+        mentor = User(name="Mentor", email="mentor@bench.local", password_hash="x", user_type="mentor",
+                      team_name="Bench", current_position="Manager", office_location="Remote")
+        db.add(mentor)
+        db.flush()
+        mentee_ids = []
+        for i in range(mentees):
+            mentee = User(name=f"Mentee {i}", email=f"mentee{i}@bench.local", password_hash="x",
+                          user_type="mentee", mentor_id=mentor.id, team_name="Bench",
+                          current_position="Engineer", office_location="Remote")
+            db.add(mentee)
+            db.flush()
+            mentee_ids.append(mentee.id)
+        db.execute(insert(WeeklyReport), [
+            {
+                "mentee_id": mentee_id, "mentor_id": mentor.id, "week_number": week, "year": 2000 + year,
+                "accomplishments": "Shipped things " * 20, "blockers_concerns_comments": "None",
+                "aspirations": "Ship more things " * 10,
+            }
+            for mentee_id in mentee_ids for year in range(years) for week in range(1, 53)
+        ])
+        db.commit()
+        return mentor.id, mentee_ids
+
+
+def add_latency(engine, latency_ms: float, is_async: bool):
+    """Delay every statement by a simulated server round trip"""
+    delay = latency_ms / 1000
+
+    @event.listens_for(engine, "do_execute")
+    @event.listens_for(engine, "do_executemany")
+    def simulate_round_trip(cursor, statement, parameters, context):
+        if is_async:
+            await_only(asyncio.sleep(delay))
+        else:
+            time.sleep(delay)
+
+
+def build_legacy_app(engine) -> FastAPI:
+    """The pre-async pattern: an `async def` route doing synchronous Session work on the event loop"""
+    SyncSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    legacy = FastAPI()
+
+    def get_db():
+        db = SyncSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @legacy.get("/reports/mentors/{mentor_id}/query")
+    async def query_mentor_reports(mentor_id: int, mentee_id: int, limit: int = 5, db: Session = Depends(get_db)):
+        return query_reports_for_mentor(db, mentor_id, mentee_id=mentee_id, limit=limit)
+
+    return legacy
+
+
+async def drive(asgi_app, mentor_id: int, mentee_ids: list[int], concurrency: int, total: int) -> float:
+    """Fire `total` requests from `concurrency` concurrent clients; return requests/second"""
+    remaining = iter(range(total))
+    rng = random.Random(42)
+
+    async def worker(client: httpx.AsyncClient):
+        for _ in remaining:
+            response = await client.get(
+                f"/reports/mentors/{mentor_id}/query",
+                params={"mentee_id": rng.choice(mentee_ids), "limit": 5}
+            )
+            response.raise_for_status()
+
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        return total / (time.perf_counter() - start)
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+        register_sqlite_functions(engine)
+        Base.metadata.create_all(bind=engine)
+        mentor_id, mentee_ids = seed(engine, args.mentees, args.years)
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=AsyncAdaptedQueuePool, pool_size=max(args.concurrency))
+        register_sqlite_functions(async_engine.sync_engine)
+        BenchSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with BenchSessionLocal() as session:
+                yield session
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        # Sized so the legacy app never waits on the pool: a blocking checkout on the event loop
+        # would deadlock it, because connections are only returned when the loop gets to run again
+        legacy_engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False},
+                                      pool_size=max(args.concurrency))
+        legacy = build_legacy_app(legacy_engine)
+
+        if args.latency_ms:
+            add_latency(legacy_engine, args.latency_ms, is_async=False)
+            add_latency(async_engine.sync_engine, args.latency_ms, is_async=True)
+
+        print(f"{len(mentee_ids) * args.years * 52} reports, {args.requests} requests per run, "
+              f"{args.latency_ms} ms simulated latency per statement")
+        print(f"{'clients':>8} {'sync req/s':>12} {'async req/s':>12} {'speedup':>8}")
+        try:
+            for concurrency in args.concurrency:
+                sync_rps = await drive(legacy, mentor_id, mentee_ids, concurrency, args.requests)
+                async_rps = await drive(app, mentor_id, mentee_ids, concurrency, args.requests)
+                print(f"{concurrency:>8} {sync_rps:>12.1f} {async_rps:>12.1f} {async_rps / sync_rps:>7.2f}x")
+        finally:
+            app.dependency_overrides.clear()
+            await async_engine.dispose()
+            legacy_engine.dispose()
+            engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mentees", type=int, default=50)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
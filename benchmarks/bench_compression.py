@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Report body compression - generates a dataset, then for each storage mode (plain, zlib, and
+zstd when the zstandard package is installed) converts the bodies with the
+compress_report_bodies backfill and reports the database size after VACUUM, how long the
+conversion took, and the latency of reading a page of recent reports with their bodies and of
+exporting every body.
+
+Usage:
+    python -m benchmarks.bench_compression --mentors 50 --years 3 --accomplishments-words 80:30
+"""
+
+import argparse
+import logging
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services.export_service import export_statement
+from app.services.report_service import query_reports_for_mentor
+from app.utils import compression
+from app.utils.backfill import BACKFILLS, run_backfill
+from app.utils.migrations import upgrade_database
+from benchmarks.datagen import add_spec_arguments, generate, spec_from_args
+from models import create_db_engine
+
+
+def vacuum(engine) -> int:
+    with engine.connect() as conn:
+        conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        conn.execute(text("VACUUM"))
+    return Path(engine.url.database).stat().st_size
+
+
+def time_ms(function, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_spec_arguments(parser)
+    parser.add_argument("--min-bytes", type=int, default=64, help="REPORT_COMPRESSION_MIN_BYTES")
+    parser.add_argument("--runs", type=int, default=200, help="Page reads per mode")
+    args = parser.parse_args()
+    # Bulk loading trips the slow-query log on every batch
+    logging.getLogger("app.sql.slow").setLevel(logging.ERROR)
+
+    modes = ["off", "zlib"] + (["zstd"] if compression.zstandard is not None else [])
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "plain.db"
+        upgrade_database(f"sqlite:///{source}", configure_logging=False)
+        engine = create_db_engine(f"sqlite:///{source}")
+        dataset = generate(engine, spec_from_args(args))
+        vacuum(engine)
+        engine.dispose()
+        print(f"{dataset.reports} reports for {len(dataset.mentor_ids)} mentors")
+
+        print(f"{'storage':>8} {'size MB':>8} {'ratio':>6} {'convert s':>10} {'page p50 ms':>12} {'export s':>9}")
+        plain_size = None
+        for mode in modes:
+            path = Path(tmp) / f"{mode}.db"
+            shutil.copy(source, path)
+            engine = create_db_engine(f"sqlite:///{path}")
+            convert_seconds = 0.0
+            if mode != "off":
+                compression.text_codec = compression.TextCodec(mode, args.min_bytes)
+                result = run_backfill(engine, BACKFILLS["compress_report_bodies"], batch_size=2000, pause_seconds=0)
+                convert_seconds = result.elapsed_seconds
+            size = vacuum(engine)
+            plain_size = plain_size or size
+
+            rng = random.Random(args.seed)
+            with Session(engine) as db:
+                pages = time_ms(lambda: query_reports_for_mentor(db, rng.choice(dataset.mentor_ids), limit=20), args.runs)
+                export = time_ms(lambda: db.execute(export_statement()).all(), 1)[0] / 1000
+            engine.dispose()
+            print(f"{mode:>8} {size / 1e6:>8.1f} {size / plain_size:>6.2f} {convert_seconds:>10.1f} "
+                  f"{statistics.median(pages):>12.2f} {export:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Weekly mentor digests - generates a dataset, builds the newest week's digests with 1..N
+rendering processes, then compares reading one mentor's digest (a single primary-key read)
+with what the dashboard does today: get_mentor_dashboard() for every mentee's latest reports,
+filtered down to that week.
+
+Usage:
+    python -m benchmarks.bench_digests --mentors 200 --mentees-per-mentor 20 --years 1 --workers 1 2 4
+"""
+
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.services.dashboard_service import get_mentor_dashboard
+from app.services.digest_service import build_mentor_digests, get_mentor_digest
+from app.utils.migrations import upgrade_database
+from benchmarks.datagen import add_spec_arguments, generate, spec_from_args
+from models import MentorDigest, create_db_engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_spec_arguments(parser)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Rendering processes to compare")
+    parser.add_argument("--reads", type=int, default=200, help="Mentors read in the serving comparison")
+    args = parser.parse_args()
+    spec = spec_from_args(args)
+    logging.getLogger("app.sql.slow").setLevel(logging.ERROR)
+    week = spec.end.isocalendar()[:2]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        upgrade_database(url, configure_logging=False)
+        engine = create_db_engine(url)
+        dataset = generate(engine, spec)
+        print(f"{dataset.reports} reports, {len(dataset.mentor_ids)} mentors "
+              f"(generated in {dataset.elapsed_seconds:.0f}s)")
+
+        with Session(engine) as db:
+            print(f"{'workers':>8} {'digests':>8} {'build s':>8}")
+            for workers in args.workers:
+                db.execute(delete(MentorDigest))
+                db.commit()
+                # Every requested process, however few mentors there are
+                result = build_mentor_digests(db, week, workers=workers, mentors_per_worker=0)
+                print(f"{result.workers:>8} {result.built:>8} {result.elapsed_seconds:>8.2f}")
+
+            mentor_ids = dataset.mentor_ids[:args.reads]
+            timings = {"digest": [], "dashboard": []}
+            for mentor_id in mentor_ids:
+                start = time.perf_counter()
+                get_mentor_digest(db, mentor_id, week, fmt="html")
+                timings["digest"].append((time.perf_counter() - start) * 1000)
+                start = time.perf_counter()
+                dashboard = get_mentor_dashboard(db, mentor_id, reports_per_mentee=1)
+                [report for mentee in dashboard.mentees for report in mentee.latest_reports
+                 if (report.year, report.week_number) == week]
+                timings["dashboard"].append((time.perf_counter() - start) * 1000)
+        engine.dispose()
+
+    print(f"\n{'read':>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, values in timings.items():
+        values.sort()
+        print(f"{name:>10} {statistics.median(values):>8.2f} {values[int(len(values) * 0.95) - 1]:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Login throughput at different KDF cost settings. While concurrent clients log in, a probe
+requests GET / every few milliseconds; its latency shows whether hashing is stalling the
+event loop (it should stay flat because verification runs in the hashing thread pool).
+
+Usage:
+    python -m benchmarks.bench_login --scrypt-n 4096 16384 32768 --concurrency 16 --requests 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from models import Base, User, create_db_engine, create_async_db_engine, get_async_db
+from app.main import app
+from app.utils.security import ScryptHasher, set_password_hasher
+
+PASSWORD = "correct horse battery staple"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    return statistics.quantiles(samples, n=100)[int(pct) - 1] if len(samples) > 1 else samples[0]
+
+
+async def run_cost(client: httpx.AsyncClient, email: str, concurrency: int, total: int) -> dict:
+    remaining = iter(range(total))
+    login_times, probe_times = [], []
+    done = asyncio.Event()
+
+    async def login_worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+            response.raise_for_status()
+            login_times.append(time.perf_counter() - start)
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/")
+            probe_times.append(time.perf_counter() - start)
+            await asyncio.sleep(0.005)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+
+    return {
+        "logins_per_sec": total / elapsed,
+        "login_p95_ms": percentile(login_times, 95) * 1000,
+        "probe_p95_ms": percentile(probe_times, 95) * 1000,
+    }
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = create_db_engine(db_url)
+        Base.metadata.create_all(bind=engine)
+        async_engine = create_async_db_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        BenchSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with BenchSessionLocal() as session:
+                yield session
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        print(f"{args.concurrency} concurrent clients, {args.requests} logins per cost")
+        print(f"{'scrypt n':>9} {'hash ms':>8} {'logins/s':>9} {'login p95 ms':>13} {'probe p95 ms':>13}")
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for n in args.scrypt_n:
+                    hasher = ScryptHasher(n=n)
+                    set_password_hasher(hasher)
+                    start = time.perf_counter()
+                    password_hash = hasher.hash(PASSWORD)
+                    hash_ms = (time.perf_counter() - start) * 1000
+
+                    email = f"user-n{n}@example.com"
+                    with Session(engine) as db:
+                        db.add(User(name="Bench", email=email, password_hash=password_hash, user_type="mentor",
+                                    team_name="Bench", current_position="Engineer", office_location="Remote"))
+                        db.commit()
+
+                    result = await run_cost(client, email, args.concurrency, args.requests)
+                    print(f"{n:>9} {hash_ms:>8.1f} {result['logins_per_sec']:>9.1f} "
+                          f"{result['login_p95_ms']:>13.1f} {result['probe_p95_ms']:>13.1f}")
+        finally:
+            app.dependency_overrides.clear()
+            await async_engine.dispose()
+            engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scrypt-n", type=int, nargs="+", default=[4096, 16384, 32768])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
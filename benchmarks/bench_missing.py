@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Missing-report detection - generates a dataset, then times find_missing_reports() (one
+anti-join against a calendar of ISO weeks) over the last 1, 13 and 52 weeks of history,
+against what it replaces: fetching every mentor's reports with get_reports_for_mentor()
+and diffing weeks per mentee in Python.
+
+Usage:
+    python -m benchmarks.bench_missing --mentors 500 --mentees-per-mentor 20 --years 1
+"""
+
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.services.missing_reports_service import find_missing_reports, iso_weeks
+from app.services.report_service import get_reports_for_mentor
+from app.utils.migrations import upgrade_database
+from benchmarks.datagen import add_spec_arguments, generate, spec_from_args
+from models import User, create_db_engine
+
+
+def per_mentor_loop(db: Session, mentor_ids: list[int], weeks: list[tuple[int, int]]) -> int:
+    """The old way: every mentor's reports, then each active mentee's weeks without one"""
+    missing = 0
+    for mentor_id in mentor_ids:
+        submitted = {(r.mentee_id, r.year, r.week_number) for r in get_reports_for_mentor(db, mentor_id)}
+        mentees = db.execute(select(User.id).where(User.mentor_id == mentor_id, User.is_active == True)).scalars()
+        missing += sum((mentee_id, *week) not in submitted for mentee_id in mentees for week in weeks)
+    return missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_spec_arguments(parser)
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per range")
+    parser.add_argument("--skip-loop", action="store_true", help="Don't time the per-mentor loop")
+    args = parser.parse_args()
+    spec = spec_from_args(args)
+    # Bulk loading trips the slow-query log on every batch
+    logging.getLogger("app.sql.slow").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        upgrade_database(url, configure_logging=False)
+        engine = create_db_engine(url)
+        dataset = generate(engine, spec)
+        print(f"{dataset.reports} reports, {len(dataset.active_mentee_ids)} active mentees "
+              f"(generated in {dataset.elapsed_seconds:.0f}s)")
+
+        print(f"{'weeks':>6} {'mentee-weeks':>13} {'missing':>9} {'anti-join ms':>13} {'per-mentor loop ms':>19}")
+        with Session(engine) as db:
+            for span in (1, 13, 52):
+                last = spec.end.isocalendar()[:2]
+                first = (spec.end - timedelta(weeks=span - 1)).isocalendar()[:2]
+                timings, result = [], None
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    result = find_missing_reports(db, first, week_to=last)
+                    timings.append((time.perf_counter() - start) * 1000)
+                loop = "-"
+                if not args.skip_loop and span == 52:
+                    weeks = [week[:2] for week in iso_weeks(first, last)]
+                    start = time.perf_counter()
+                    assert per_mentor_loop(db, dataset.mentor_ids, weeks) >= result.missing_reports
+                    loop = f"{(time.perf_counter() - start) * 1000:.0f}"
+                print(f"{span:>6} {result.mentees * span:>13} {result.missing_reports:>9} "
+                      f"{statistics.median(timings):>13.1f} {loop:>19}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Route benchmark suite - generates a dataset (see datagen.py), then drives every route in
+app/api in-process through httpx.AsyncClient at a fixed concurrency and reports p50/p95/p99
+latency and throughput per route, compared against a stored baseline.
+
+Usage:
+    python -m benchmarks.bench_routes                      # compare with benchmarks/baseline.json
+    python -m benchmarks.bench_routes --save-baseline      # record a new baseline
+    python -m benchmarks.bench_routes --routes /reports/mentors --requests 500 --concurrency 32
+
+Exits with status 1 if a route's p95 regressed beyond --tolerance (plus --slack-ms, which keeps
+sub-millisecond noise on fast routes from counting) or if any request failed. Baselines are only
+comparable on the same machine with the same options; the options are stored with the baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+import httpx
+from fastapi.routing import APIRoute
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.config import async_url_for, settings
+from app.main import app
+from app.services.digest_service import build_mentor_digests
+from app.utils.cache import clear_caches
+from app.utils.migrations import upgrade_database
+from benchmarks.datagen import WORDS, Dataset, DatasetSpec, add_spec_arguments, generate, spec_from_args
+from models import WeeklyReport, create_async_db_engine, create_db_engine, get_async_db
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+
+# Writes go to years far from the generated history so they never collide with it or each other
+CREATE_YEAR, IMPORT_YEAR, DELETE_YEAR = 2200, 2400, 2600
+IMPORT_ROWS = 20
+
+
+@dataclass
+class BenchContext:
+    """What scenarios need to build requests: the dataset plus IDs and tokens prepared up front"""
+
+    dataset: Dataset
+    # A mentee's tokens for the auth scenarios; every other request is sent as an admin
+    access_token: str = ""
+    refresh_token: str = ""
+    # (report id, mentee id, year, week) of existing reports, in random order
+    reports: list[tuple[int, int, int, int]] = field(default_factory=list)
+    deletable_ids: list[int] = field(default_factory=list)
+
+    def mentor(self, i: int) -> int:
+        return self.dataset.mentor_ids[i % len(self.dataset.mentor_ids)]
+
+    def mentee(self, i: int) -> int:
+        """An active mentee, so logins succeed"""
+        mentee_ids = self.dataset.active_mentee_ids
+        return mentee_ids[i % len(mentee_ids)]
+
+    def report(self, i: int) -> tuple[int, int, int, int]:
+        return self.reports[i % len(self.reports)]
+
+
+def report_body(year: int, week: int, i: int) -> dict:
+    return {
+        "week_number": week,
+        "year": year,
+        "accomplishments": f"Benchmark report {i}: {' '.join(WORDS[i % 10:i % 10 + 30])}",
+        "blockers_concerns_comments": "None",
+        "aspirations": "Keep the p95 down",
+    }
+
+
+def import_body(ctx: BenchContext, i: int) -> str:
+    lines = ["mentee_id,week_number,year,accomplishments,blockers_concerns_comments,aspirations"]
+    lines += [f"{ctx.mentee(i)},{week},{IMPORT_YEAR + i},Imported week {week},None,More imports"
+              for week in range(1, IMPORT_ROWS + 1)]
+    return "\n".join(lines) + "\n"
+
+
+# "METHOD /route/template" -> builds the httpx request arguments for the i-th request
+SCENARIOS: dict[str, Callable[[BenchContext, int], dict]] = {
+    "POST /auth/register": lambda ctx, i: {"json": {
+        "name": f"New Hire {i}", "email": f"new-hire-{i}@bench.example.com", "password": "benchmark-password",
+        "team_name": "Platform", "current_position": "Engineer", "office_location": "Remote",
+        "mentor_email": Dataset.mentor_email(ctx.mentor(i)),
+    }},
+    "POST /auth/login": lambda ctx, i: {"json": {
+        "email": Dataset.mentee_email(ctx.mentee(i)), "password": ctx.dataset.spec.password,
+    }},
+    "POST /auth/refresh": lambda ctx, i: {"json": {"refresh_token": ctx.refresh_token}},
+    "GET /auth/me": lambda ctx, i: {"headers": {"Authorization": f"Bearer {ctx.access_token}"}},
+    "GET /users/{user_id}": lambda ctx, i: {"url": f"/users/{ctx.mentee(i)}"},
+    "GET /users/mentors/{mentor_id}/mentees": lambda ctx, i: {"url": f"/users/mentors/{ctx.mentor(i)}/mentees"},
+    "POST /reports/": lambda ctx, i: {
+        "params": {"mentee_id": ctx.mentee(i)},
+        "json": report_body(CREATE_YEAR + i // 52, i % 52 + 1, i),
+    },
+    "POST /reports/import": lambda ctx, i: {
+        "content": import_body(ctx, i), "headers": {"Content-Type": "text/csv"},
+    },
+    "GET /reports/export": lambda ctx, i: {"params": {"mentor_id": ctx.mentor(i), "format": "csv"}},
+    "GET /reports/mentees/{mentee_id}/latest": lambda ctx, i: {"url": f"/reports/mentees/{ctx.mentee(i)}/latest"},
+    "GET /reports/mentees/{mentee_id}/weeks/{year}/{week_number}": lambda ctx, i: {
+        "url": "/reports/mentees/{1}/weeks/{2}/{3}".format(*ctx.report(i)),
+    },
+    "GET /reports/mentors/{mentor_id}": lambda ctx, i: {"url": f"/reports/mentors/{ctx.mentor(i)}"},
+    "GET /reports/mentors/{mentor_id}/query": lambda ctx, i: {
+        "url": f"/reports/mentors/{ctx.mentor(i)}/query",
+        # Alternate the unfiltered first page with one mentee's page
+        "params": {"limit": 20} if i % 2 else {"limit": 20, "mentee_id": ctx.report(i)[1]},
+    },
+    "GET /reports/mentors/{mentor_id}/summaries": lambda ctx, i: {
+        "url": f"/reports/mentors/{ctx.mentor(i)}/summaries",
+        "params": {"limit": 20, "preview": "true"} if i % 2 else {"limit": 20, "mentee_id": ctx.report(i)[1]},
+    },
+    "GET /reports/mentors/{mentor_id}/search": lambda ctx, i: {
+        "url": f"/reports/mentors/{ctx.mentor(i)}/search",
+        "params": {"q": " ".join(WORDS[i % len(WORDS):i % len(WORDS) + 1 + i % 2])},
+    },
+    "GET /reports/batch": lambda ctx, i: {
+        "params": {"ids": [ctx.report(i + n)[0] for n in range(5)]},
+    },
+    "GET /reports/{report_id}": lambda ctx, i: {"url": f"/reports/{ctx.report(i)[0]}"},
+    "PUT /reports/{report_id}": lambda ctx, i: {
+        "url": f"/reports/{ctx.report(i)[0]}",
+        "json": report_body(ctx.report(i)[2], ctx.report(i)[3], i),
+    },
+    # One body field, without If-Match
+    "PATCH /reports/{report_id}": lambda ctx, i: {
+        "url": f"/reports/{ctx.report(i)[0]}",
+        "json": {"accomplishments": report_body(ctx.report(i)[2], ctx.report(i)[3], i)["accomplishments"]},
+    },
+    "DELETE /reports/{report_id}": lambda ctx, i: {"url": f"/reports/{ctx.deletable_ids[i]}"},
+    "GET /dashboard/mentor/{mentor_id}": lambda ctx, i: {"url": f"/dashboard/mentor/{ctx.mentor(i)}"},
+    # Reads the digests prepare() built, as the scheduler would have
+    "GET /dashboard/mentor/{mentor_id}/digest": lambda ctx, i: {
+        "url": f"/dashboard/mentor/{ctx.mentor(i)}/digest",
+        "params": {"week": ctx.dataset.spec.end.strftime("%G-W%V"), "format": ("markdown", "html")[i % 2]}
+    },
+    "GET /analytics/mentors/{mentor_id}": lambda ctx, i: {"url": f"/analytics/mentors/{ctx.mentor(i)}"},
+    "GET /analytics/submissions": lambda ctx, i: {"params": {"group_by": ("team", "office")[i % 2]}},
+    # Alternates the newest week with the quarter up to it
+    "GET /analytics/missing-reports": lambda ctx, i: {"params": {
+        "week_from": (ctx.dataset.spec.end - timedelta(weeks=12 * (i % 2))).strftime("%G-W%V"),
+        "week_to": ctx.dataset.spec.end.strftime("%G-W%V")
+    }},
+}
+
+
+def api_routes() -> list[str]:
+    """Every route defined in app/api, as "METHOD /template" """
+    keys = []
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.endpoint.__module__.startswith("app.api."):
+            keys += [f"{method} {route.path}" for method in sorted(route.methods)]
+    return keys
+
+
+def missing_scenarios() -> list[str]:
+    return [key for key in api_routes() if key not in SCENARIOS]
+
+
+def prepare(engine, ctx: BenchContext, deletable: int, seed: int) -> None:
+    """Pick existing reports for reads/updates, insert the reports the DELETE scenario removes and
+    build the newest week's digests"""
+    rng = random.Random(seed)
+    mentor_of = {mentee_id: mentor_id for mentor_id, mentee_ids in ctx.dataset.mentees_by_mentor.items()
+                 for mentee_id in mentee_ids}
+    with Session(engine) as db:
+        ctx.reports = [tuple(row) for row in db.execute(
+            select(WeeklyReport.id, WeeklyReport.mentee_id, WeeklyReport.year, WeeklyReport.week_number)
+        )]
+        rng.shuffle(ctx.reports)
+        ctx.deletable_ids = list(db.execute(insert(WeeklyReport).returning(WeeklyReport.id), [
+            {"mentee_id": ctx.mentee(i), "mentor_id": mentor_of[ctx.mentee(i)],
+             **report_body(DELETE_YEAR + i // 52, i % 52 + 1, i)}
+            for i in range(deletable)
+        ]).scalars())
+        db.commit()
+        build_mentor_digests(db, ctx.dataset.spec.end.isocalendar()[:2], workers=1)
+
+
+@dataclass
+class RouteResult:
+    requests: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    rps: float
+    first_error: Optional[str] = None
+
+
+async def drive(client: httpx.AsyncClient, key: str, ctx: BenchContext, indices: range, concurrency: int) -> RouteResult:
+    method, template = key.split(" ", 1)
+    build = SCENARIOS[key]
+    latencies: list[float] = []
+    errors: list[str] = []
+    pending = iter(indices)
+
+    async def worker():
+        for i in pending:
+            arguments = {"url": template, **build(ctx, i)}
+            start = time.perf_counter()
+            response = await client.request(method, **arguments)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors.append(f"{response.status_code} {response.text[:200]}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return RouteResult(
+        requests=len(latencies),
+        errors=len(errors),
+        p50_ms=round(cuts[49] * 1000, 3),
+        p95_ms=round(cuts[94] * 1000, 3),
+        p99_ms=round(cuts[98] * 1000, 3),
+        rps=round(len(latencies) / wall, 1),
+        first_error=errors[0] if errors else None
+    )
+
+
+async def run_suite(
+    spec: DatasetSpec,
+    routes: list[str],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    progress: Callable[[str, RouteResult], None] = lambda key, result: None
+) -> dict[str, RouteResult]:
+    """Benchmark the given routes against a freshly generated database in a temporary directory"""
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        upgrade_database(url, configure_logging=False)
+        engine = create_db_engine(url)
+        async_engine = create_async_db_engine(async_url_for(url))
+        BenchSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+        async def override_get_async_db():
+            async with BenchSessionLocal() as session:
+                yield session
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        clear_caches()
+        admin_emails = settings.admin_emails
+        results = {}
+        try:
+            ctx = BenchContext(dataset=generate(engine, spec))
+            prepare(engine, ctx, warmup + requests, spec.seed)
+
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                login = await client.post("/auth/login", json={
+                    "email": Dataset.mentee_email(ctx.mentee(0)), "password": spec.password
+                })
+                login.raise_for_status()
+                ctx.access_token = login.json()["access_token"]
+                ctx.refresh_token = login.json()["refresh_token"]
+
+                # The data routes check access, so the suite reads and writes everyone's data as an admin
+                settings.admin_emails = Dataset.mentor_email(ctx.mentor(0))
+                admin = await client.post("/auth/login", json={
+                    "email": settings.admin_emails, "password": spec.password
+                })
+                admin.raise_for_status()
+                client.headers["Authorization"] = f"Bearer {admin.json()['access_token']}"
+
+                for key in routes:
+                    await drive(client, key, ctx, range(warmup), min(concurrency, max(warmup, 1)))
+                    results[key] = await drive(client, key, ctx, range(warmup, warmup + requests), concurrency)
+                    progress(key, results[key])
+        finally:
+            app.dependency_overrides.clear()
+            settings.admin_emails = admin_emails
+            clear_caches()
+            await async_engine.dispose()
+            engine.dispose()
+    return results
+
+
+def compare(key: str, result: RouteResult, baseline: dict, tolerance: float, slack_ms: float) -> tuple[Optional[float], bool]:
+    """(relative p95 change against the baseline or None if the route has none, whether it's a regression)"""
+    base = baseline.get("routes", {}).get(key)
+    if base is None:
+        return None, False
+    change = result.p95_ms / base["p95_ms"] - 1
+    # The slack keeps tiny absolute differences on sub-millisecond routes from counting
+    return change, change > tolerance and result.p95_ms - base["p95_ms"] > slack_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_spec_arguments(parser)
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per route")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed requests per route first")
+    parser.add_argument("--routes", nargs="*", default=[], help="Only routes containing one of these strings")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 increase, e.g. 0.25 = 25%%")
+    parser.add_argument("--slack-ms", type=float, default=1.0, help="p95 increases below this are never regressions")
+    parser.add_argument("--output", type=Path, help="Also write this run's results as JSON")
+    parser.add_argument("--slow-query-log", action="store_true", help="Keep the app's slow-query warnings")
+    args = parser.parse_args()
+
+    # Lock waits under concurrent writes would flood the output with slow-query warnings
+    if not args.slow_query_log:
+        logging.getLogger("app.sql.slow").setLevel(logging.ERROR)
+
+    missing = missing_scenarios()
+    if missing:
+        sys.exit(f"No benchmark scenario for: {', '.join(missing)} - add one to SCENARIOS")
+    routes = [key for key in api_routes() if not args.routes or any(part in key for part in args.routes)]
+    spec = spec_from_args(args)
+    config = {"mentors": spec.mentors, "mentees_per_mentor": spec.mentees_per_mentor, "years": spec.years,
+              "seed": spec.seed, "requests": args.requests, "concurrency": args.concurrency, "warmup": args.warmup}
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() and not args.save_baseline else {}
+    if baseline and baseline.get("config") != config:
+        print(f"warning: baseline was recorded with {baseline.get('config')}; this run uses {config}")
+
+    print(f"{config}")
+    print(f"{'route':<64} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'p95 vs base':>12}")
+
+    def show(key: str, result: RouteResult):
+        change, regressed = compare(key, result, baseline, args.tolerance, args.slack_ms)
+        marker = "" if change is None else f"{change:+.0%}" + (" !" if regressed else "")
+        print(f"{key:<64} {result.p50_ms:>8.2f} {result.p95_ms:>8.2f} {result.p99_ms:>8.2f} {result.rps:>8.1f} {marker:>12}")
+        if result.errors:
+            print(f"    {result.errors} failed requests, e.g. {result.first_error}")
+
+    results = asyncio.run(run_suite(spec, routes, args.requests, args.concurrency, args.warmup, show))
+    report = {"config": config, "routes": {key: {k: v for k, v in vars(result).items() if k != "first_error"}
+                                            for key, result in results.items()}}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    regressions = [key for key, result in results.items()
+                   if compare(key, result, baseline, args.tolerance, args.slack_ms)[1]]
+    failures = [key for key, result in results.items() if result.errors]
+    if regressions:
+        print(f"p95 regressed more than {args.tolerance:.0%} on: {', '.join(regressions)}")
+    if regressions or failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Full-text search latency - fills a database with generated reports spread over many mentors,
+then times mentor-scoped searches (single words, phrases, prefixes, one field) through
+search_reports_for_mentor and reports p50/p95/max per query.
+
+Usage:
+    python -m benchmarks.bench_search --reports 1000000 --mentors 500
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.config import Settings
+from app.services.search_service import search_reports_for_mentor
+from benchmarks.datagen import sentence
+from models import Base, User, WeeklyReport, create_db_engine
+
+QUERIES = [
+    ("word", {"q": "kubernetes"}),
+    ("two words", {"q": "deploy pipeline"}),
+    ("phrase", {"q": '"deploy pipeline"'}),
+    ("prefix", {"q": "migrat*"}),
+    ("blockers only", {"q": "flaky build", "fields": ["blockers_concerns_comments"]}),
+    ("no match", {"q": "zeppelin"}),
+]
+
+
+def populate(engine, reports: int, mentors: int, mentees_per_mentor: int, filler: float, seed: int) -> list[int]:
+    rng = random.Random(seed)
+    with Session(engine) as db:
+        db.execute(insert(User), [
+            {"id": m + 1, "name": f"Mentor {m}", "email": f"mentor{m}@example.com", "password_hash": "x",
+             "user_type": "mentor", "team_name": "Bench", "current_position": "Manager", "office_location": "Remote"}
+            for m in range(mentors)
+        ])
+        mentee_ids = []
+        rows = []
+        for m in range(mentors):
+            for i in range(mentees_per_mentor):
+                mentee_id = mentors + m * mentees_per_mentor + i + 1
+                mentee_ids.append((mentee_id, m + 1))
+                rows.append({"id": mentee_id, "name": f"Mentee {mentee_id}", "email": f"mentee{mentee_id}@example.com",
+                             "password_hash": "x", "user_type": "mentee", "mentor_id": m + 1, "team_name": "Bench",
+                             "current_position": "Engineer", "office_location": "Remote"})
+        db.execute(insert(User), rows)
+
+        batch = []
+        for n in range(reports):
+            mentee_id, mentor_id = mentee_ids[n % len(mentee_ids)]
+            week = n // len(mentee_ids)
+            batch.append({
+                "mentee_id": mentee_id, "mentor_id": mentor_id,
+                "week_number": week % 52 + 1, "year": 2000 + week // 52,
+                "accomplishments": sentence(rng, 25, filler),
+                "blockers_concerns_comments": sentence(rng, 12, filler),
+                "aspirations": sentence(rng, 15, filler),
+            })
+            if len(batch) == 10000:
+                db.execute(insert(WeeklyReport), batch)
+                batch.clear()
+        if batch:
+            db.execute(insert(WeeklyReport), batch)
+        db.commit()
+    return list(range(1, mentors + 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=200000)
+    parser.add_argument("--mentors", type=int, default=500)
+    parser.add_argument("--mentees-per-mentor", type=int, default=5)
+    parser.add_argument("--filler", type=float, default=0.9, help="share of words that never match a query")
+    parser.add_argument("--runs", type=int, default=50, help="searches per query, each for a random mentor")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(config=Settings(database_url=f"sqlite:///{Path(tmp) / 'bench.db'}"))
+        Base.metadata.create_all(bind=engine)
+
+        start = time.perf_counter()
+        mentor_ids = populate(engine, args.reports, args.mentors, args.mentees_per_mentor, args.filler, args.seed)
+        print(f"Loaded {args.reports} reports for {args.mentors} mentors in {time.perf_counter() - start:.1f}s")
+
+        rng = random.Random(args.seed)
+        print(f"{'query':>14} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'hits':>6}")
+        with Session(engine) as db:
+            for name, params in QUERIES:
+                timings, hits = [], 0
+                for _ in range(args.runs):
+                    started = time.perf_counter()
+                    page = search_reports_for_mentor(db, rng.choice(mentor_ids), limit=args.limit, **params)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    hits += len(page.items)
+                timings.sort()
+                p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+                print(f"{name:>14} {statistics.median(timings):>8.1f} {p95:>8.1f} {timings[-1]:>8.1f} "
+                      f"{hits / args.runs:>6.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+SQLite pragma profiles under concurrent writers - several processes (like uvicorn workers)
+each interleave report inserts with mentor report reads against one database file, and we
+count throughput and "database is locked" failures per profile.
+
+Usage:
+    python -m benchmarks.bench_sqlite_pragmas --workers 4 --ops 300
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.config import Settings
+from models import Base, User, WeeklyReport, create_db_engine
+
+PROFILES = {
+    # What the app used before: rollback journal, FULL sync, pysqlite's default 5 s busy wait
+    "legacy": {"sqlite_journal_mode": "DELETE", "sqlite_synchronous": "FULL",
+               "sqlite_busy_timeout_ms": 5000, "sqlite_mmap_size": 0},
+    "wal-full": {"sqlite_journal_mode": "WAL", "sqlite_synchronous": "FULL",
+                 "sqlite_busy_timeout_ms": 5000, "sqlite_mmap_size": 0},
+    # The application default
+    "wal-normal-mmap": {"sqlite_journal_mode": "WAL", "sqlite_synchronous": "NORMAL",
+                        "sqlite_busy_timeout_ms": 5000, "sqlite_mmap_size": 268435456},
+}
+
+
+def worker(db_url: str, profile: dict, worker_id: int, ops: int, mentee_ids: list[int], mentor_id: int) -> tuple[int, int]:
+    """Alternate one insert and one read per op; return (completed ops, lock errors)"""
+    config = Settings(database_url=db_url, db_pool_size=1, **profile)
+    engine = create_db_engine(config=config)
+    done = errors = 0
+    for op in range(ops):
+        try:
+            with Session(engine) as db:
+                mentee_id = mentee_ids[(worker_id + op) % len(mentee_ids)]
+                db.add(WeeklyReport(
+                    mentee_id=mentee_id, mentor_id=mentor_id,
+                    week_number=op % 52 + 1, year=3000 + worker_id * 1000 + op // 52,
+                    accomplishments="Shipped things " * 20, blockers_concerns_comments="None",
+                    aspirations="Ship more things " * 10
+                ))
+                db.commit()
+                db.execute(
+                    select(WeeklyReport.id).where(WeeklyReport.mentor_id == mentor_id)
+                    .order_by(WeeklyReport.submission_date.desc()).limit(20)
+                ).all()
+            done += 1
+        except OperationalError as exc:
+            if "locked" not in str(exc):
+                raise
+            errors += 1
+    engine.dispose()
+    return done, errors
+
+
+def run_profile(name: str, profile: dict, args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = create_db_engine(config=Settings(database_url=db_url, **profile))
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as db:
+            mentor = User(name="Mentor", email="mentor@bench.local", password_hash="x", user_type="mentor",
+                          team_name="Bench", current_position="Manager", office_location="Remote")
+            db.add(mentor)
+            db.flush()
+            mentees = [
+                User(name=f"Mentee {i}", email=f"mentee{i}@bench.local", password_hash="x", user_type="mentee",
+                     mentor_id=mentor.id, team_name="Bench", current_position="Engineer", office_location="Remote")
+                for i in range(args.workers)
+            ]
+            db.add_all(mentees)
+            db.commit()
+            mentor_id, mentee_ids = mentor.id, [m.id for m in mentees]
+        engine.dispose()
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(args.workers) as pool:
+            results = pool.starmap(worker, [
+                (db_url, profile, worker_id, args.ops, mentee_ids, mentor_id)
+                for worker_id in range(args.workers)
+            ])
+        elapsed = time.perf_counter() - start
+
+        done = sum(r[0] for r in results)
+        errors = sum(r[1] for r in results)
+        print(f"{name:>16} {done / elapsed:>10.1f} {errors:>8} {elapsed:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=300, help="insert+read operations per worker")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(PROFILES), default=list(PROFILES))
+    args = parser.parse_args()
+
+    print(f"{args.workers} worker processes x {args.ops} ops")
+    print(f"{'profile':>16} {'ops/s':>10} {'locked':>8} {'seconds':>9}")
+    for name in args.profiles:
+        run_profile(name, PROFILES[name], args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Worker scaling - generates a dataset, then for each worker count starts the API with
+`python -m app.cli serve --workers N` and drives it over HTTP from several client processes
+for a fixed time with a read-mostly route mix, reporting req/s, p50/p95 and speedup over
+one worker. Expect scaling up to about the number of CPU cores, minus what the clients use.
+
+Usage:
+    python -m benchmarks.bench_workers --workers 1 2 4 8 --clients 4 --concurrency 16 --duration 15
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from app.utils.migrations import upgrade_database
+from benchmarks.datagen import DatasetSpec, add_spec_arguments, generate, spec_from_args
+from models import create_db_engine
+
+
+def request_mix(rng: random.Random, mentor_ids: list[int], mentee_ids: list[int]) -> tuple[str, str, dict]:
+    """Mostly reads, like the app's traffic, with an occasional write"""
+    roll = rng.random()
+    mentor_id, mentee_id = rng.choice(mentor_ids), rng.choice(mentee_ids)
+    if roll < 0.3:
+        return "GET", f"/reports/mentees/{mentee_id}/latest", {}
+    if roll < 0.55:
+        return "GET", f"/reports/mentors/{mentor_id}/query", {"params": {"limit": 20}}
+    if roll < 0.7:
+        return "GET", f"/dashboard/mentor/{mentor_id}", {}
+    if roll < 0.85:
+        return "GET", f"/users/{mentee_id}", {}
+    if roll < 0.95:
+        return "GET", f"/users/mentors/{mentor_id}/mentees", {}
+    week = rng.randrange(1, 53)
+    return "POST", "/reports/import", {
+        "content": f"mentee_id,week_number,year,accomplishments,blockers_concerns_comments,aspirations\n"
+                   f"{mentee_id},{week},2300,Load test,None,More\n",
+        "headers": {"Content-Type": "text/csv"},
+        "params": {"on_conflict": "update"},
+    }
+
+
+async def _client_loop(base_url: str, mentor_ids, mentee_ids, concurrency: int, duration: float, seed: int):
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                method, url, options = request_mix(rng, mentor_ids, mentee_ids)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, url, **options)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def client_process(arguments) -> tuple[list[float], int]:
+    return asyncio.run(_client_loop(*arguments))
+
+
+def wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+def run_workers(workers: int, args, env: dict, mentor_ids, mentee_ids) -> tuple[float, float, float, int]:
+    port = args.port
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.cli", "serve", "--workers", str(workers), "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env=env, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(base_url, server)
+        # Each worker starts separately; give the rest a moment after the first answers
+        time.sleep(1 + 0.2 * workers)
+        jobs = [(base_url, mentor_ids, mentee_ids, args.concurrency, args.duration, args.seed + n)
+                for n in range(args.clients)]
+        start = time.perf_counter()
+        with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+            results = pool.map(client_process, jobs)
+        elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies = [latency for client_latencies, _ in results for latency in client_latencies]
+    errors = sum(client_errors for _, client_errors in results)
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    # Clients stop at their deadline; measure over the load window, not process startup
+    return len(latencies) / min(elapsed, args.duration + 1), cuts[49] * 1000, cuts[94] * 1000, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_spec_arguments(parser)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=2, help="Load-generating processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight per client process")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of load per worker count")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-backend", default="memory", help="CACHE_BACKEND for the server, e.g. redis")
+    parser.add_argument("--cache-url", help="CACHE_URL for the server")
+    args = parser.parse_args()
+    spec: DatasetSpec = spec_from_args(args)
+    # Bulk loading trips the slow-query log on every batch
+    logging.getLogger("app.sql.slow").setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        upgrade_database(url, configure_logging=False)
+        engine = create_db_engine(url)
+        dataset = generate(engine, spec)
+        engine.dispose()
+
+        env = {**os.environ, "DATABASE_URL": url, "SECRET_KEY": "bench-workers-secret",
+               "CACHE_BACKEND": args.cache_backend}
+        env.pop("ASYNC_DATABASE_URL", None)
+        if args.cache_url:
+            env["CACHE_URL"] = args.cache_url
+
+        print(f"{dataset.reports} reports, {len(dataset.mentee_ids)} mentees; {os.cpu_count()} CPUs; "
+              f"{args.clients} client processes x {args.concurrency} in flight, {args.duration:g}s per run")
+        print(f"{'workers':>8} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7} {'speedup':>8}")
+        single = None
+        for workers in args.workers:
+            rps, p50, p95, errors = run_workers(workers, args, env, dataset.mentor_ids, dataset.mentee_ids)
+            single = single or rps
+            print(f"{workers:>8} {rps:>10.1f} {p50:>8.1f} {p95:>8.1f} {errors:>7} {rps / single:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
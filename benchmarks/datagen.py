@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator - mentors, their mentees and years of weekly reports with realistic
+gaps and text lengths, bulk-loaded through the ORM models. The same spec and seed always
+produce the same data.
+
+Usage:
+    python -m benchmarks.datagen --database-url sqlite:///./bench.db --mentors 200 \\
+        --mentees-per-mentor 8 --years 5 --accomplishments-words 40:15
+"""
+
+import argparse
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.utils.security import hash_password
+from models import User, WeeklyReport
+
+WORDS = (
+    "deploy pipeline release review migration database schema index query cache latency outage "
+    "incident oncall customer feature design prototype roadmap planning estimate sprint demo test "
+    "coverage flaky build ci staging production rollout rollback monitoring alert dashboard metrics "
+    "hiring interview onboarding mentoring documentation refactor cleanup debt performance memory "
+    "kubernetes terraform network security audit compliance budget vendor contract meeting offsite"
+).split()
+
+# Filler words dilute the domain vocabulary so query terms hit a few percent of reports, as in real
+# text; a filler share of 0 makes every term common, the worst case for the search index
+FILLER = [a + b for a in ("ba", "ko", "mi", "su", "te", "ra", "lo", "ne", "pi", "du") for b in (
+    "lan", "rek", "tos", "mir", "vad", "quo", "zel", "pim", "tur", "gox", "ham", "sev", "lid", "nuf", "wac"
+)]
+
+TEAMS = ("Platform", "Payments", "Growth", "Data", "Mobile", "Security")
+OFFICES = ("New York", "London", "Berlin", "Remote")
+
+
+def sentence(rng: random.Random, words: int, filler: float) -> str:
+    if words <= 0:
+        return ""
+    return " ".join(
+        rng.choice(FILLER) if rng.random() < filler else rng.choice(WORDS) for _ in range(words)
+    ).capitalize() + "."
+
+
+@dataclass(frozen=True)
+class TextLength:
+    """Words per text field: normally distributed, clamped to [minimum, maximum]"""
+
+    mean: float
+    stddev: float
+    minimum: int = 1
+    maximum: int = 400
+
+    def sample(self, rng: random.Random) -> int:
+        return max(self.minimum, min(self.maximum, round(rng.gauss(self.mean, self.stddev))))
+
+    @classmethod
+    def parse(cls, value: str) -> "TextLength":
+        """MEAN:STDDEV[:MIN[:MAX]], e.g. 40:15 or 10:8:0"""
+        parts = value.split(":")
+        if not 2 <= len(parts) <= 4:
+            raise argparse.ArgumentTypeError(f"Expected MEAN:STDDEV[:MIN[:MAX]], got {value!r}")
+        mean, stddev = float(parts[0]), float(parts[1])
+        bounds = [int(part) for part in parts[2:]]
+        return cls(mean, stddev, *bounds)
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    mentors: int = 20
+    mentees_per_mentor: int = 8
+    years: int = 2
+    # The newest week of history; fixed so generated data doesn't change with the calendar
+    end: date = date(2026, 1, 5)
+    submission_rate: float = 0.9  # chance a mentee filed a report in any given week
+    inactive_rate: float = 0.05  # share of mentees who have left
+    filler: float = 0.9
+    accomplishments: TextLength = TextLength(40, 15)
+    blockers_concerns_comments: TextLength = TextLength(12, 10, minimum=0)
+    aspirations: TextLength = TextLength(20, 8)
+    password: str = "benchmark-password"
+    seed: int = 42
+
+
+@dataclass
+class Dataset:
+    """IDs and credentials of what generate() wrote"""
+
+    spec: DatasetSpec
+    mentor_ids: list[int] = field(default_factory=list)
+    mentees_by_mentor: dict[int, list[int]] = field(default_factory=dict)
+    inactive_ids: set[int] = field(default_factory=set)
+    reports: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def mentee_ids(self) -> list[int]:
+        return [mentee_id for mentees in self.mentees_by_mentor.values() for mentee_id in mentees]
+
+    @property
+    def active_mentee_ids(self) -> list[int]:
+        return [mentee_id for mentee_id in self.mentee_ids if mentee_id not in self.inactive_ids]
+
+    @staticmethod
+    def mentor_email(mentor_id: int) -> str:
+        return f"mentor{mentor_id}@bench.example.com"
+
+    @staticmethod
+    def mentee_email(mentee_id: int) -> str:
+        return f"mentee{mentee_id}@bench.example.com"
+
+
+def history_weeks(spec: DatasetSpec) -> list[tuple[int, int]]:
+    """(year, week) of every ISO week of history, oldest first"""
+    return [(spec.end - timedelta(weeks=n)).isocalendar()[:2] for n in reversed(range(spec.years * 52))]
+
+
+def generate(engine, spec: DatasetSpec = DatasetSpec(), batch_size: int = 5000) -> Dataset:
+    """Bulk-insert the spec's users and reports into a migrated, empty database"""
+    rng = random.Random(spec.seed)
+    start = time.perf_counter()
+    dataset = Dataset(spec=spec)
+    # One hash for everyone: hashing is deliberately slow and the data is synthetic
+    password_hash = hash_password(spec.password)
+
+    mentors, mentees = [], []
+    for m in range(1, spec.mentors + 1):
+        dataset.mentor_ids.append(m)
+        mentors.append({
+            "id": m, "name": f"Mentor {m}", "email": Dataset.mentor_email(m), "password_hash": password_hash,
+            "user_type": "mentor", "team_name": rng.choice(TEAMS), "current_position": "Engineering Manager",
+            "office_location": rng.choice(OFFICES),
+        })
+    next_id = spec.mentors + 1
+    for mentor in mentors:
+        dataset.mentees_by_mentor[mentor["id"]] = []
+        for _ in range(spec.mentees_per_mentor):
+            dataset.mentees_by_mentor[mentor["id"]].append(next_id)
+            is_active = rng.random() >= spec.inactive_rate
+            if not is_active:
+                dataset.inactive_ids.add(next_id)
+            mentees.append({
+                "id": next_id, "name": f"Mentee {next_id}", "email": Dataset.mentee_email(next_id),
+                "password_hash": password_hash, "user_type": "mentee", "mentor_id": mentor["id"],
+                "team_name": mentor["team_name"], "current_position": "Software Engineer",
+                "office_location": rng.choice(OFFICES), "is_active": is_active,
+            })
+            next_id += 1
+
+    weeks = history_weeks(spec)
+    with Session(engine) as db:
+        db.execute(insert(User), mentors)
+        db.execute(insert(User), mentees)
+
+        batch = []
+        for mentee in mentees:
+            for year, week in weeks:
+                if rng.random() >= spec.submission_rate:
+                    continue
+                submitted = datetime.combine(date.fromisocalendar(year, week, 1), dt_time(9)) + timedelta(
+                    minutes=rng.randrange(5 * 24 * 60)
+                )
+                batch.append({
+                    "mentee_id": mentee["id"], "mentor_id": mentee["mentor_id"], "week_number": week, "year": year,
+                    "accomplishments": sentence(rng, spec.accomplishments.sample(rng), spec.filler),
+                    "blockers_concerns_comments": sentence(rng, spec.blockers_concerns_comments.sample(rng), spec.filler),
+                    "aspirations": sentence(rng, spec.aspirations.sample(rng), spec.filler),
+                    "submission_date": submitted, "created_at": submitted, "updated_at": submitted,
+                })
+                if len(batch) >= batch_size:
+                    db.execute(insert(WeeklyReport), batch)
+                    dataset.reports += len(batch)
+                    batch.clear()
+        if batch:
+            db.execute(insert(WeeklyReport), batch)
+            dataset.reports += len(batch)
+        db.commit()
+
+    dataset.elapsed_seconds = round(time.perf_counter() - start, 3)
+    return dataset
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    """The DatasetSpec options, shared by the benchmarks that generate their data"""
+    defaults = DatasetSpec()
+    parser.add_argument("--mentors", type=int, default=defaults.mentors)
+    parser.add_argument("--mentees-per-mentor", type=int, default=defaults.mentees_per_mentor)
+    parser.add_argument("--years", type=int, default=defaults.years, help="Years of weekly history")
+    parser.add_argument("--submission-rate", type=float, default=defaults.submission_rate)
+    parser.add_argument("--inactive-rate", type=float, default=defaults.inactive_rate)
+    parser.add_argument("--filler", type=float, default=defaults.filler,
+                        help="Share of words that are not domain vocabulary")
+    for name in ("accomplishments", "blockers_concerns_comments", "aspirations"):
+        length = getattr(defaults, name)
+        parser.add_argument(
+            f"--{name.split('_')[0]}-words", dest=name, type=TextLength.parse,
+            default=length, metavar="MEAN:STDDEV[:MIN[:MAX]]",
+            help=f"Words in {name} (default {length.mean:g}:{length.stddev:g}:{length.minimum}:{length.maximum})"
+        )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def spec_from_args(args) -> DatasetSpec:
+    return DatasetSpec(
+        mentors=args.mentors,
+        mentees_per_mentor=args.mentees_per_mentor,
+        years=args.years,
+        submission_rate=args.submission_rate,
+        inactive_rate=args.inactive_rate,
+        filler=args.filler,
+        accomplishments=args.accomplishments,
+        blockers_concerns_comments=args.blockers_concerns_comments,
+        aspirations=args.aspirations,
+        seed=args.seed
+    )
+
+
+def main():
+    from models import create_db_engine
+    from app.utils.migrations import upgrade_database
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Must point at a new or empty database")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    upgrade_database(args.database_url)
+    engine = create_db_engine(args.database_url)
+    try:
+        dataset = generate(engine, spec_from_args(args))
+    finally:
+        engine.dispose()
+    print(f"{len(dataset.mentor_ids)} mentors, {len(dataset.mentee_ids)} mentees, {dataset.reports} reports "
+          f"in {dataset.elapsed_seconds}s; every user's password is {dataset.spec.password!r}")
+
+
+if __name__ == "__main__":
+    main()
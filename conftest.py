@@ -0,0 +1,155 @@
+"""
+Shared pytest fixtures - each test gets a fresh SQLite database and an API client bound to it
+"""
+
+import os
+import tempfile
+
+# Point the app's own engines at a throwaway database before anything imports models
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/weekly_reports.db")
+# Cheap KDF cost so tests that register or log in stay fast
+os.environ.setdefault("SCRYPT_N", "1024")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from models import Base, User, WeeklyReport, create_db_engine, get_async_db, register_sqlite_functions
+from app.config import settings
+from app.main import app
+from app.schemas.users import UserResponse
+from app.utils.cache import clear_caches, current_user_cache
+from app.utils.metrics import instrument_engine
+from app.utils.migrations import upgrade_database
+from app.utils.security import create_token
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_app_database():
+    """Migrate the app's own database once, so the startup schema check passes"""
+    upgrade_database()
+
+
+@pytest.fixture
+def engine(tmp_path):
+    test_engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=test_engine)
+    # IDs restart in every test database, so cached entries must not carry over
+    clear_caches()
+    yield test_engine
+    test_engine.dispose()
+    clear_caches()
+
+
+@pytest.fixture
+def db_session(engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def async_engine(engine):
+    # NullPool: TestClient runs the app on its own event loop, so don't keep connections across loops
+    test_async_engine = create_async_engine(engine.url.set(drivername="sqlite+aiosqlite"), poolclass=NullPool)
+    register_sqlite_functions(test_async_engine.sync_engine)
+    instrument_engine(test_async_engine.sync_engine)
+    return test_async_engine
+
+
+@pytest.fixture
+def client(async_engine):
+    TestingSessionLocal = async_sessionmaker(
+        async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+    async def override_get_async_db():
+        async with TestingSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def login_as(client, monkeypatch):
+    """Send the client's requests with a user's access token (admin=True adds them to ADMIN_EMAILS)
+
+    The user is cached as after an earlier request, so statement counts only see the route's own queries.
+    """
+
+    def _login_as(user, admin=False):
+        if admin:
+            monkeypatch.setattr(settings, "admin_emails", user.email)
+        current_user_cache.set(user.id, UserResponse.model_validate(user))
+        client.headers["Authorization"] = f"Bearer {create_token(user.id)}"
+        return user
+
+    return _login_as
+
+
+@pytest.fixture
+def sql_statements(async_engine):
+    """SQL statements the API sends to the database while the test runs; clear() it between steps"""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def make_user(db_session):
+    """Factory that inserts a mentor (no mentor given) or a mentee"""
+    counter = {"n": 0}
+
+    def _make_user(name=None, mentor=None, **fields):
+        counter["n"] += 1
+        user = User(
+            name=name or f"User {counter['n']}",
+            email=fields.pop("email", f"user{counter['n']}@company.com"),
+            password_hash=fields.pop("password_hash", "not-a-real-hash"),
+            user_type="mentee" if mentor else "mentor",
+            mentor_id=mentor.id if mentor else None,
+            team_name=fields.pop("team_name", "Engineering"),
+            current_position=fields.pop("current_position", "Engineer"),
+            office_location=fields.pop("office_location", "New York"),
+            **fields
+        )
+        db_session.add(user)
+        db_session.commit()
+        return user
+
+    return _make_user
+
+
+@pytest.fixture
+def make_report(db_session):
+    """Factory that inserts a weekly report for a mentee"""
+
+    def _make_report(mentee, week_number, year, **fields):
+        report = WeeklyReport(
+            mentee_id=mentee.id,
+            mentor_id=mentee.mentor_id,
+            week_number=week_number,
+            year=year,
+            accomplishments=fields.pop("accomplishments", f"Work done in week {week_number}"),
+            blockers_concerns_comments=fields.pop("blockers_concerns_comments", "None"),
+            aspirations=fields.pop("aspirations", "Keep going"),
+            **fields
+        )
+        db_session.add(report)
+        db_session.commit()
+        return report
+
+    return _make_report
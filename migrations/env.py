@@ -0,0 +1,65 @@
+"""
+Alembic environment - runs migrations against DATABASE_URL (or the URL/connection passed in
+by app.utils.migrations) with the models' metadata as the autogenerate target
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+
+from models import Base, create_db_engine
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logging", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # The FTS5 table, its shadow tables and content view are raw DDL in the migrations
+    return not (type_ == "table" and name.startswith("weekly_reports_fts"))
+
+
+def configure_options(dialect_name: str) -> dict:
+    return {
+        "target_metadata": target_metadata,
+        "include_object": include_object,
+        # SQLite can't ALTER most things in place; batch mode copies the table instead
+        "render_as_batch": dialect_name == "sqlite",
+        # Keep each migration's transaction short; backfills commit in their own batches anyway
+        "transaction_per_migration": True,
+    }
+
+
+def run_migrations_offline() -> None:
+    url = config.get_main_option("sqlalchemy.url")
+    context.configure(url=url, literal_binds=True, **configure_options(url.split(":", 1)[0].split("+")[0]))
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_with_connection(connection) -> None:
+    context.configure(connection=connection, **configure_options(connection.dialect.name))
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_with_connection(connection)
+        return
+
+    engine = create_db_engine(config.get_main_option("sqlalchemy.url"))
+    try:
+        with engine.connect() as connection:
+            run_with_connection(connection)
+    finally:
+        engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
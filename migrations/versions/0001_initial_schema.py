@@ -0,0 +1,128 @@
+"""Initial schema: users, weekly reports, their indexes and full-text search
+
+Every step is conditional so databases created before migrations existed (by the app's
+old create_all at startup) are adopted as they are, gaining whatever they lack.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# A copy of models.SQLITE_SEARCH_DDL / POSTGRESQL_SEARCH_DDL as of this revision
+SQLITE_SEARCH_DDL = [
+    """CREATE VIEW IF NOT EXISTS weekly_reports_fts_content AS
+    SELECT id, 'm' || mentor_id AS mentor_key, accomplishments, blockers_concerns_comments, aspirations
+    FROM weekly_reports""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS weekly_reports_fts USING fts5(
+        mentor_key, accomplishments, blockers_concerns_comments, aspirations,
+        content='weekly_reports_fts_content', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS weekly_reports_fts_insert AFTER INSERT ON weekly_reports BEGIN
+        INSERT INTO weekly_reports_fts(rowid, mentor_key, accomplishments, blockers_concerns_comments, aspirations)
+        VALUES (new.id, 'm' || new.mentor_id, new.accomplishments, new.blockers_concerns_comments, new.aspirations);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS weekly_reports_fts_delete AFTER DELETE ON weekly_reports BEGIN
+        INSERT INTO weekly_reports_fts(weekly_reports_fts, rowid, mentor_key, accomplishments, blockers_concerns_comments, aspirations)
+        VALUES ('delete', old.id, 'm' || old.mentor_id, old.accomplishments, old.blockers_concerns_comments, old.aspirations);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS weekly_reports_fts_update
+    AFTER UPDATE OF mentor_id, accomplishments, blockers_concerns_comments, aspirations ON weekly_reports BEGIN
+        INSERT INTO weekly_reports_fts(weekly_reports_fts, rowid, mentor_key, accomplishments, blockers_concerns_comments, aspirations)
+        VALUES ('delete', old.id, 'm' || old.mentor_id, old.accomplishments, old.blockers_concerns_comments, old.aspirations);
+        INSERT INTO weekly_reports_fts(rowid, mentor_key, accomplishments, blockers_concerns_comments, aspirations)
+        VALUES (new.id, 'm' || new.mentor_id, new.accomplishments, new.blockers_concerns_comments, new.aspirations);
+    END""",
+]
+
+POSTGRESQL_SEARCH_DDL = [
+    """CREATE INDEX IF NOT EXISTS ix_weekly_reports_search ON weekly_reports USING gin (
+        to_tsvector('english', accomplishments || ' ' || blockers_concerns_comments || ' ' || aspirations)
+    )""",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('user_type', sa.String(length=10), nullable=False),
+        sa.Column('mentor_id', sa.Integer(), nullable=True),
+        sa.Column('team_name', sa.String(length=100), nullable=False),
+        sa.Column('current_position', sa.String(length=100), nullable=False),
+        sa.Column('office_location', sa.String(length=100), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['mentor_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('ix_users_id', 'users', ['id'], if_not_exists=True)
+    op.create_index('ix_users_email', 'users', ['email'], unique=True, if_not_exists=True)
+    op.create_index('ix_users_mentor_id_is_active', 'users', ['mentor_id', 'is_active'], if_not_exists=True)
+
+    op.create_table(
+        'weekly_reports',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('mentee_id', sa.Integer(), nullable=False),
+        sa.Column('mentor_id', sa.Integer(), nullable=False),
+        sa.Column('week_number', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('accomplishments', sa.Text(), nullable=False),
+        sa.Column('blockers_concerns_comments', sa.Text(), nullable=False),
+        sa.Column('aspirations', sa.Text(), nullable=False),
+        sa.Column('submission_date', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['mentee_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['mentor_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('mentee_id', 'week_number', 'year', name='unique_mentee_week_year'),
+        if_not_exists=True
+    )
+    op.create_index('ix_weekly_reports_id', 'weekly_reports', ['id'], if_not_exists=True)
+    op.create_index('ix_weekly_reports_mentee_year_week', 'weekly_reports',
+                    ['mentee_id', 'year', 'week_number'], if_not_exists=True)
+    op.create_index('ix_weekly_reports_mentor_year_week_id', 'weekly_reports',
+                    ['mentor_id', 'year', 'week_number', 'id'], if_not_exists=True)
+    op.create_index('ix_weekly_reports_mentor_submission_date', 'weekly_reports',
+                    ['mentor_id', 'submission_date'], if_not_exists=True)
+
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        had_index = sa.inspect(bind).has_table("weekly_reports_fts")
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        if not had_index:
+            # Index the reports that were written before search existed
+            op.execute("INSERT INTO weekly_reports_fts(weekly_reports_fts) VALUES ('rebuild')")
+    elif bind.dialect.name == "postgresql":
+        for statement in POSTGRESQL_SEARCH_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        for name in ("weekly_reports_fts_insert", "weekly_reports_fts_delete", "weekly_reports_fts_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS weekly_reports_fts")
+        op.execute("DROP VIEW IF EXISTS weekly_reports_fts_content")
+    op.drop_table('weekly_reports')
+    op.drop_table('users')
@@ -0,0 +1,49 @@
+"""Add weekly_reports.iso_week_start, backfilled in batches
+
+The column is added as nullable, which is instant, and filled for existing reports by the
+iso_week_start backfill in short batches after this revision's transaction has committed.
+Pass defer_backfills=True to upgrade_database() (or --defer-backfills to `db upgrade`) to
+skip it and run `python -m app.cli db backfill iso_week_start` later; new and updated
+reports get the column from the application either way.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.utils.backfill import BACKFILLS, run_backfill
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('weekly_reports', sa.Column('iso_week_start', sa.Date(), nullable=True))
+
+    options = context.config.attributes
+    if context.is_offline_mode() or options.get("defer_backfills"):
+        return
+    # Commit the new column first; each batch then commits on its own
+    with op.get_context().autocommit_block():
+        run_backfill(
+            op.get_bind().engine,
+            BACKFILLS["iso_week_start"],
+            batch_size=options.get("backfill_batch_size", 1000),
+            pause_seconds=options.get("backfill_pause_seconds", 0.05),
+            progress=options.get("backfill_progress")
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('weekly_reports', 'iso_week_start')
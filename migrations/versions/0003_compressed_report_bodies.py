@@ -0,0 +1,94 @@
+"""Read report bodies through wr_decompress() in the full-text index
+
+Report bodies may now be stored compressed on SQLite (REPORT_COMPRESSION), so the search
+index's content view and sync triggers decompress them. No data changes: existing rows stay
+plain text until `python -m app.cli db backfill compress_report_bodies` runs. Downgrading
+decompresses every body first, as older code can't read compressed ones.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+
+from app.utils.backfill import BACKFILLS, run_backfill
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FIELDS = ("accomplishments", "blockers_concerns_comments", "aspirations")
+
+
+def _values(row: str, decompress: bool) -> str:
+    return ", ".join(f"wr_decompress({row}.{field})" if decompress else f"{row}.{field}" for field in FIELDS)
+
+
+def _search_ddl(decompress: bool) -> list[str]:
+    """The search view and triggers of models.SQLITE_SEARCH_DDL, with or without wr_decompress()"""
+    columns = ", ".join(
+        f"wr_decompress({field}) AS {field}" if decompress else field for field in FIELDS
+    )
+    new, old = _values("new", decompress), _values("old", decompress)
+    # Rewriting a body in another storage format doesn't change what's indexed
+    changed = " OR ".join(
+        ["old.mentor_id IS NOT new.mentor_id"]
+        + [f"wr_decompress(old.{field}) IS NOT wr_decompress(new.{field})" for field in FIELDS]
+    )
+    return [
+        f"""CREATE VIEW weekly_reports_fts_content AS
+        SELECT id, 'm' || mentor_id AS mentor_key, {columns} FROM weekly_reports""",
+        f"""CREATE TRIGGER weekly_reports_fts_insert AFTER INSERT ON weekly_reports BEGIN
+            INSERT INTO weekly_reports_fts(rowid, mentor_key, {", ".join(FIELDS)})
+            VALUES (new.id, 'm' || new.mentor_id, {new});
+        END""",
+        f"""CREATE TRIGGER weekly_reports_fts_delete AFTER DELETE ON weekly_reports BEGIN
+            INSERT INTO weekly_reports_fts(weekly_reports_fts, rowid, mentor_key, {", ".join(FIELDS)})
+            VALUES ('delete', old.id, 'm' || old.mentor_id, {old});
+        END""",
+        f"""CREATE TRIGGER weekly_reports_fts_update
+        AFTER UPDATE OF mentor_id, {", ".join(FIELDS)} ON weekly_reports
+        {f"WHEN {changed} " if decompress else ""}BEGIN
+            INSERT INTO weekly_reports_fts(weekly_reports_fts, rowid, mentor_key, {", ".join(FIELDS)})
+            VALUES ('delete', old.id, 'm' || old.mentor_id, {old});
+            INSERT INTO weekly_reports_fts(rowid, mentor_key, {", ".join(FIELDS)})
+            VALUES (new.id, 'm' || new.mentor_id, {new});
+        END""",
+    ]
+
+
+def _replace_search_ddl(decompress: bool) -> None:
+    for name in ("insert", "delete", "update"):
+        op.execute(f"DROP TRIGGER IF EXISTS weekly_reports_fts_{name}")
+    op.execute("DROP VIEW IF EXISTS weekly_reports_fts_content")
+    for statement in _search_ddl(decompress):
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        _replace_search_ddl(decompress=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    if not context.is_offline_mode():
+        options = context.config.attributes
+        with op.get_context().autocommit_block():
+            run_backfill(
+                op.get_bind().engine,
+                BACKFILLS["decompress_report_bodies"],
+                batch_size=options.get("backfill_batch_size", 1000),
+                pause_seconds=options.get("backfill_pause_seconds", 0.05),
+                progress=options.get("backfill_progress")
+            )
+    _replace_search_ddl(decompress=False)
@@ -0,0 +1,187 @@
+"""Submission analytics rollups: per-mentee quarterly counts and streaks, kept by triggers
+
+Adds submission_rollups and mentee_submission_stats, and triggers on weekly_reports that keep
+them up to date on every insert, delete and week/date change. The tables are then filled from
+the existing reports with the pandas rebuild, in this revision's transaction; pass
+defer_backfills=True (--defer-backfills) to skip that and run
+`python -m app.cli analytics rebuild` later, after any other deferred backfills.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# A copy of models.SQLITE_ROLLUP_DDL / POSTGRESQL_ROLLUP_DDL as of this revision
+def _mentee_stats_upsert(mentee: str, week_ordinal: str, condition: str = "true") -> str:
+    """Recompute one mentee's row of mentee_submission_stats (gaps and islands over their ISO weeks)"""
+    return f"""INSERT INTO mentee_submission_stats (mentee_id, reports, first_week_start, last_week_start, longest_streak, latest_streak)
+        SELECT {mentee}, (SELECT count(*) FROM weekly_reports WHERE mentee_id = {mentee}),
+            min(first_week), max(last_week), coalesce(max(weeks), 0), coalesce(max(latest), 0)
+        FROM (
+            SELECT first_week, last_week, weeks, first_value(weeks) OVER (ORDER BY last_week DESC) AS latest
+            FROM (
+                SELECT min(iso_week_start) AS first_week, max(iso_week_start) AS last_week, count(*) AS weeks
+                FROM (
+                    SELECT iso_week_start, {week_ordinal} - row_number() OVER (ORDER BY iso_week_start) AS run
+                    FROM weekly_reports WHERE mentee_id = {mentee} AND iso_week_start IS NOT NULL
+                ) AS weeks GROUP BY run
+            ) AS runs
+        ) AS ranked WHERE {condition}
+        ON CONFLICT (mentee_id) DO UPDATE SET reports = excluded.reports, first_week_start = excluded.first_week_start,
+            last_week_start = excluded.last_week_start, longest_streak = excluded.longest_streak,
+            latest_streak = excluded.latest_streak;
+        DELETE FROM mentee_submission_stats WHERE mentee_id = {mentee} AND reports = 0;"""
+
+
+def _sqlite_rollup_change(row: str, sign: str) -> str:
+    quarter = f"min(({row}.week_number - 1) / 13 + 1, 4)"
+    days_late = (f"max(0, coalesce(CAST(julianday(date({row}.submission_date)) "
+                 f"- julianday({row}.iso_week_start, '+6 days') AS INTEGER), 0))")
+    if sign == "+":
+        return f"""INSERT INTO submission_rollups (mentee_id, year, quarter, reports, late_reports, days_late)
+        VALUES ({row}.mentee_id, {row}.year, {quarter}, 1, {days_late} > 0, {days_late})
+        ON CONFLICT (mentee_id, year, quarter) DO UPDATE SET reports = reports + 1,
+            late_reports = late_reports + excluded.late_reports, days_late = days_late + excluded.days_late;"""
+    return f"""UPDATE submission_rollups SET reports = reports - 1,
+            late_reports = late_reports - ({days_late} > 0), days_late = days_late - {days_late}
+        WHERE mentee_id = {row}.mentee_id AND year = {row}.year AND quarter = {quarter};
+        DELETE FROM submission_rollups
+        WHERE mentee_id = {row}.mentee_id AND year = {row}.year AND quarter = {quarter} AND reports <= 0;"""
+
+
+_SQLITE_WEEK_ORDINAL = "CAST(julianday(iso_week_start) AS INTEGER) / 7"
+_ROLLUP_COLUMNS = "mentee_id, year, week_number, iso_week_start, submission_date"
+
+SQLITE_ROLLUP_DDL = [
+    f"""CREATE TRIGGER IF NOT EXISTS weekly_reports_rollup_insert AFTER INSERT ON weekly_reports BEGIN
+        {_sqlite_rollup_change("new", "+")}
+        {_mentee_stats_upsert("new.mentee_id", _SQLITE_WEEK_ORDINAL)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS weekly_reports_rollup_delete AFTER DELETE ON weekly_reports BEGIN
+        {_sqlite_rollup_change("old", "-")}
+        {_mentee_stats_upsert("old.mentee_id", _SQLITE_WEEK_ORDINAL)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS weekly_reports_rollup_update AFTER UPDATE OF {_ROLLUP_COLUMNS} ON weekly_reports
+    WHEN {" OR ".join(f"old.{column} IS NOT new.{column}" for column in _ROLLUP_COLUMNS.split(", "))} BEGIN
+        {_sqlite_rollup_change("old", "-")}
+        {_sqlite_rollup_change("new", "+")}
+        {_mentee_stats_upsert("old.mentee_id", _SQLITE_WEEK_ORDINAL, "old.mentee_id IS NOT new.mentee_id")}
+        {_mentee_stats_upsert("new.mentee_id", _SQLITE_WEEK_ORDINAL)}
+    END""",
+]
+
+
+def _postgresql_rollup_change(row: str, sign: str) -> str:
+    quarter = f"LEAST(({row}.week_number - 1) / 13 + 1, 4)"
+    days_late = f"GREATEST(0, COALESCE(CAST({row}.submission_date AS date) - ({row}.iso_week_start + 6), 0))"
+    if sign == "+":
+        return f"""INSERT INTO submission_rollups (mentee_id, year, quarter, reports, late_reports, days_late)
+            VALUES ({row}.mentee_id, {row}.year, {quarter}, 1, CASE WHEN {days_late} > 0 THEN 1 ELSE 0 END, {days_late})
+            ON CONFLICT (mentee_id, year, quarter) DO UPDATE SET reports = submission_rollups.reports + 1,
+                late_reports = submission_rollups.late_reports + excluded.late_reports,
+                days_late = submission_rollups.days_late + excluded.days_late;"""
+    return f"""UPDATE submission_rollups SET reports = reports - 1,
+                late_reports = late_reports - CASE WHEN {days_late} > 0 THEN 1 ELSE 0 END, days_late = days_late - {days_late}
+            WHERE mentee_id = {row}.mentee_id AND year = {row}.year AND quarter = {quarter};
+            DELETE FROM submission_rollups
+            WHERE mentee_id = {row}.mentee_id AND year = {row}.year AND quarter = {quarter} AND reports <= 0;"""
+
+
+POSTGRESQL_ROLLUP_DDL = [
+    f"""CREATE OR REPLACE FUNCTION refresh_mentee_submission_stats(target integer) RETURNS void AS $$
+    BEGIN
+        {_mentee_stats_upsert("target", "(iso_week_start - DATE '2000-01-03') / 7")}
+    END $$ LANGUAGE plpgsql""",
+    f"""CREATE OR REPLACE FUNCTION weekly_reports_rollup() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND ROW(OLD.{", OLD.".join(_ROLLUP_COLUMNS.split(", "))})
+                IS NOT DISTINCT FROM ROW(NEW.{", NEW.".join(_ROLLUP_COLUMNS.split(", "))}) THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            {_postgresql_rollup_change("OLD", "-")}
+            PERFORM refresh_mentee_submission_stats(OLD.mentee_id);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            {_postgresql_rollup_change("NEW", "+")}
+            IF TG_OP = 'INSERT' OR OLD.mentee_id <> NEW.mentee_id THEN
+                PERFORM refresh_mentee_submission_stats(NEW.mentee_id);
+            END IF;
+        END IF;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    """DROP TRIGGER IF EXISTS weekly_reports_rollup ON weekly_reports""",
+    f"""CREATE TRIGGER weekly_reports_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF {_ROLLUP_COLUMNS} ON weekly_reports
+    FOR EACH ROW EXECUTE FUNCTION weekly_reports_rollup()""",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('submission_rollups',
+        sa.Column('mentee_id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('quarter', sa.Integer(), nullable=False),
+        sa.Column('reports', sa.Integer(), nullable=False),
+        sa.Column('late_reports', sa.Integer(), nullable=False),
+        sa.Column('days_late', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['mentee_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('mentee_id', 'year', 'quarter')
+    )
+    op.create_index('ix_submission_rollups_year_quarter', 'submission_rollups', ['year', 'quarter'])
+    op.create_table('mentee_submission_stats',
+        sa.Column('mentee_id', sa.Integer(), nullable=False),
+        sa.Column('reports', sa.Integer(), nullable=False),
+        sa.Column('first_week_start', sa.Date(), nullable=True),
+        sa.Column('last_week_start', sa.Date(), nullable=True),
+        sa.Column('longest_streak', sa.Integer(), nullable=False),
+        sa.Column('latest_streak', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['mentee_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('mentee_id')
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for statement in SQLITE_ROLLUP_DDL:
+            op.execute(statement)
+    elif bind.dialect.name == "postgresql":
+        for statement in POSTGRESQL_ROLLUP_DDL:
+            op.execute(statement)
+
+    if context.is_offline_mode() or context.config.attributes.get("defer_backfills"):
+        return
+    from app.services.analytics_service import rebuild_submission_rollups
+
+    # Joins this revision's transaction, so the triggers and the data land together
+    with Session(bind=bind) as db:
+        rebuild_submission_rollups(db)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for name in ("insert", "delete", "update"):
+            op.execute(f"DROP TRIGGER IF EXISTS weekly_reports_rollup_{name}")
+    elif bind.dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS weekly_reports_rollup ON weekly_reports")
+        op.execute("DROP FUNCTION IF EXISTS weekly_reports_rollup()")
+        op.execute("DROP FUNCTION IF EXISTS refresh_mentee_submission_stats(integer)")
+    op.drop_table('mentee_submission_stats')
+    op.drop_index('ix_submission_rollups_year_quarter', table_name='submission_rollups')
+    op.drop_table('submission_rollups')
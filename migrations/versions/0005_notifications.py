@@ -0,0 +1,54 @@
+"""Notification job runs and deliveries, so reminders and digests go out once per week
+
+Adds notification_job_runs (which process is running a job for a period, and whether it
+finished) and notification_deliveries (per-recipient outcome). No data to backfill.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_job_runs',
+        sa.Column('job', sa.String(length=50), nullable=False),
+        sa.Column('period', sa.String(length=10), nullable=False),
+        sa.Column('claimed_by', sa.String(length=100), nullable=False),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('recipients', sa.Integer(), nullable=False),
+        sa.Column('sent', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('job', 'period')
+    )
+    op.create_table('notification_deliveries',
+        sa.Column('job', sa.String(length=50), nullable=False),
+        sa.Column('period', sa.String(length=10), nullable=False),
+        sa.Column('recipient_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.Column('error', sa.String(length=500), nullable=True),
+        sa.ForeignKeyConstraint(['recipient_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('job', 'period', 'recipient_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notification_deliveries')
+    op.drop_table('notification_job_runs')
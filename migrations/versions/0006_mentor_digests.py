@@ -0,0 +1,43 @@
+"""Mentor digests: each mentor's mentees' reports for a week, rendered once as Markdown and HTML
+
+Adds mentor_digests. Digests are built for closed weeks by the scheduler or
+`python -m app.cli digests build`, so nothing is backfilled here; past weeks are built on
+first request.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('mentor_digests',
+        sa.Column('mentor_id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('week_number', sa.Integer(), nullable=False),
+        sa.Column('mentees', sa.Integer(), nullable=False),
+        sa.Column('reports', sa.Integer(), nullable=False),
+        sa.Column('markdown', sa.Text(), nullable=False),
+        sa.Column('html', sa.Text(), nullable=False),
+        sa.Column('generated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['mentor_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('mentor_id', 'year', 'week_number')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('mentor_digests')
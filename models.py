@@ -1,10 +1,30 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, UniqueConstraint, create_engine
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean, ForeignKey, UniqueConstraint, Index, DDL, create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
-from datetime import datetime, timezone
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+import os
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from app.config import Settings, settings, async_url_for
+from app.utils.compression import CompressedText, decode_text
+from app.utils.metrics import instrument_engine
 
 Base = declarative_base()
 
+def iso_week_start(year: int, week_number: int) -> Optional[date]:
+    """Monday of an ISO week, or None if the year has no such week"""
+    try:
+        return date.fromisocalendar(year, week_number, 1)
+    except ValueError:
+        return None
+
+def _default_iso_week_start(context):
+    parameters = context.get_current_parameters()
+    return iso_week_start(parameters["year"], parameters["week_number"])
+
 class User(Base):
     __tablename__ = "users"
     
@@ -25,6 +45,9 @@ class User(Base):
     mentor = relationship("User", remote_side=[id], backref="mentees")
     weekly_reports_as_mentee = relationship("WeeklyReport", foreign_keys="WeeklyReport.mentee_id", back_populates="mentee")
     weekly_reports_as_mentor = relationship("WeeklyReport", foreign_keys="WeeklyReport.mentor_id", back_populates="mentor")
+    
+    # A mentor's active mentees
+    __table_args__ = (Index('ix_users_mentor_id_is_active', 'mentor_id', 'is_active'),)
 
 class WeeklyReport(Base):
     __tablename__ = "weekly_reports"
@@ -34,27 +57,349 @@ class WeeklyReport(Base):
     mentor_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     week_number = Column(Integer, nullable=False)
     year = Column(Integer, nullable=False)
-    accomplishments = Column(Text, nullable=False)
-    blockers_concerns_comments = Column(Text, nullable=False)
-    aspirations = Column(Text, nullable=False)
+    # Monday of the report's ISO week; writes that change year/week_number must set it too
+    iso_week_start = Column(Date, nullable=True, default=_default_iso_week_start)
+    # Long text, compressed on SQLite when REPORT_COMPRESSION is on
+    accomplishments = Column(CompressedText, nullable=False)
+    blockers_concerns_comments = Column(CompressedText, nullable=False)
+    aspirations = Column(CompressedText, nullable=False)
     submission_date = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    # Bumped by every write; clients send it back (as the ETag) to update only what they read
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Relationships
     mentee = relationship("User", foreign_keys=[mentee_id], back_populates="weekly_reports_as_mentee")
     mentor = relationship("User", foreign_keys=[mentor_id], back_populates="weekly_reports_as_mentor")
     
-    # Ensure one report per mentee per week per year
-    __table_args__ = (UniqueConstraint('mentee_id', 'week_number', 'year', name='unique_mentee_week_year'),)
+    __table_args__ = (
+        # Ensure one report per mentee per week per year
+        UniqueConstraint('mentee_id', 'week_number', 'year', name='unique_mentee_week_year'),
+        # A mentee's reports newest week first (latest reports); the unique index above has
+        # week before year, so it can't serve that order
+        Index('ix_weekly_reports_mentee_year_week', 'mentee_id', 'year', 'week_number'),
+        # A mentor's reports newest week first, id breaking ties for keyset pagination (query, dashboard)
+        Index('ix_weekly_reports_mentor_year_week_id', 'mentor_id', 'year', 'week_number', 'id'),
+        # A mentor's reports by submission date (all reports, date-filtered exports)
+        Index('ix_weekly_reports_mentor_submission_date', 'mentor_id', 'submission_date'),
+    )
+    # ORM flushes check and bump version; the services' Core UPDATEs do the same explicitly
+    __mapper_args__ = {"version_id_col": version}
+
+class SubmissionRollup(Base):
+    """A mentee's report counts for one quarter of an ISO year, kept up to date by triggers on weekly_reports"""
+    __tablename__ = "submission_rollups"
+
+    mentee_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    quarter = Column(Integer, primary_key=True)  # weeks 1-13, 14-26, 27-39, 40-53
+    reports = Column(Integer, nullable=False, default=0)
+    late_reports = Column(Integer, nullable=False, default=0)
+    days_late = Column(Integer, nullable=False, default=0)  # total over the late reports
+
+    # Org-wide analytics read one year (or quarter) across all mentees
+    __table_args__ = (Index('ix_submission_rollups_year_quarter', 'year', 'quarter'),)
+
+class MenteeSubmissionStats(Base):
+    """A mentee's report count and runs of consecutive ISO weeks, kept up to date by triggers on weekly_reports"""
+    __tablename__ = "mentee_submission_stats"
+
+    mentee_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    reports = Column(Integer, nullable=False, default=0)
+    first_week_start = Column(Date, nullable=True)
+    last_week_start = Column(Date, nullable=True)
+    longest_streak = Column(Integer, nullable=False, default=0)
+    latest_streak = Column(Integer, nullable=False, default=0)  # the run ending at last_week_start
+
+class MentorDigest(Base):
+    """One mentor's mentees' reports for a closed ISO week, rendered once and never rewritten"""
+    __tablename__ = "mentor_digests"
+
+    mentor_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    week_number = Column(Integer, primary_key=True)
+    mentees = Column(Integer, nullable=False)
+    reports = Column(Integer, nullable=False)
+    markdown = Column(CompressedText, nullable=False)
+    html = Column(CompressedText, nullable=False)
+    generated_at = Column(DateTime, nullable=False)
+
+class NotificationJobRun(Base):
+    """One run of a notification job for one period (an ISO week), claimed by one process at a time"""
+    __tablename__ = "notification_job_runs"
+
+    job = Column(String(50), primary_key=True)
+    period = Column(String(10), primary_key=True)  # e.g. 2024-W09
+    claimed_by = Column(String(100), nullable=False)
+    lease_expires_at = Column(DateTime, nullable=False)  # after this another process may take the run over
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    recipients = Column(Integer, nullable=False, default=0)
+    sent = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+
+class NotificationDelivery(Base):
+    """Whether a job's message for a period reached a recipient; sent ones are never sent again"""
+    __tablename__ = "notification_deliveries"
+
+    job = Column(String(50), primary_key=True)
+    period = Column(String(10), primary_key=True)
+    recipient_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    status = Column(String(10), nullable=False)  # 'sent' or 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    sent_at = Column(DateTime, nullable=True)
+    error = Column(String(500), nullable=True)
+
+# Full-text search over report bodies. On SQLite an FTS5 index (external content, read
+# through a view that adds a per-mentor token so mentor scoping happens inside the index)
+# is kept in sync by triggers; on PostgreSQL a GIN index over the combined tsvector.
+# SQLite reads bodies through wr_decompress(), as they may be stored compressed.
+SQLITE_SEARCH_DDL = [
+    """CREATE VIEW IF NOT EXISTS weekly_reports_fts_content AS
+    SELECT id, 'm' || mentor_id AS mentor_key, wr_decompress(accomplishments) AS accomplishments,
+        wr_decompress(blockers_concerns_comments) AS blockers_concerns_comments, wr_decompress(aspirations) AS aspirations
+    FROM weekly_reports""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS weekly_reports_fts USING fts5(
+        mentor_key, accomplishments, blockers_concerns_comments, aspirations,
+        content='weekly_reports_fts_content', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS weekly_reports_fts_insert AFTER INSERT ON weekly_reports BEGIN
+        INSERT INTO weekly_reports_fts(rowid, mentor_key, accomplishments, blockers_concerns_comments, aspirations)
+        VALUES (new.id, 'm' || new.mentor_id, wr_decompress(new.accomplishments), wr_decompress(new.blockers_concerns_comments), wr_decompress(new.aspirations));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS weekly_reports_fts_delete AFTER DELETE ON weekly_reports BEGIN
+        INSERT INTO weekly_reports_fts(weekly_reports_fts, rowid, mentor_key, accomplishments, blockers_concerns_comments, aspirations)
+        VALUES ('delete', old.id, 'm' || old.mentor_id, wr_decompress(old.accomplishments), wr_decompress(old.blockers_concerns_comments), wr_decompress(old.aspirations));
+    END""",
+    # Only when the indexed text changes, so (de)compressing a body leaves the index alone
+    """CREATE TRIGGER IF NOT EXISTS weekly_reports_fts_update
+    AFTER UPDATE OF mentor_id, accomplishments, blockers_concerns_comments, aspirations ON weekly_reports
+    WHEN old.mentor_id IS NOT new.mentor_id
+        OR wr_decompress(old.accomplishments) IS NOT wr_decompress(new.accomplishments)
+        OR wr_decompress(old.blockers_concerns_comments) IS NOT wr_decompress(new.blockers_concerns_comments)
+        OR wr_decompress(old.aspirations) IS NOT wr_decompress(new.aspirations) BEGIN
+        INSERT INTO weekly_reports_fts(weekly_reports_fts, rowid, mentor_key, accomplishments, blockers_concerns_comments, aspirations)
+        VALUES ('delete', old.id, 'm' || old.mentor_id, wr_decompress(old.accomplishments), wr_decompress(old.blockers_concerns_comments), wr_decompress(old.aspirations));
+        INSERT INTO weekly_reports_fts(rowid, mentor_key, accomplishments, blockers_concerns_comments, aspirations)
+        VALUES (new.id, 'm' || new.mentor_id, wr_decompress(new.accomplishments), wr_decompress(new.blockers_concerns_comments), wr_decompress(new.aspirations));
+    END""",
+]
+
+POSTGRESQL_SEARCH_DDL = [
+    """CREATE INDEX IF NOT EXISTS ix_weekly_reports_search ON weekly_reports USING gin (
+        to_tsvector('english', accomplishments || ' ' || blockers_concerns_comments || ' ' || aspirations)
+    )""",
+]
+
+# Submission analytics rollups, maintained by triggers so every writer (API, bulk import,
+# backfills) keeps them exact and report writes stay a single statement. A report counts
+# towards the quarter of its ISO week and is due by the end of that week (Sunday); days late
+# are whole days after that. Changing a report moves it between rollup rows by delta; the
+# mentee's streaks are recomputed from their own reports (a few hundred rows at most).
+def _mentee_stats_upsert(mentee: str, week_ordinal: str, condition: str = "true") -> str:
+    """Recompute one mentee's row of mentee_submission_stats (gaps and islands over their ISO weeks)"""
+    return f"""INSERT INTO mentee_submission_stats (mentee_id, reports, first_week_start, last_week_start, longest_streak, latest_streak)
+        SELECT {mentee}, (SELECT count(*) FROM weekly_reports WHERE mentee_id = {mentee}),
+            min(first_week), max(last_week), coalesce(max(weeks), 0), coalesce(max(latest), 0)
+        FROM (
+            SELECT first_week, last_week, weeks, first_value(weeks) OVER (ORDER BY last_week DESC) AS latest
+            FROM (
+                SELECT min(iso_week_start) AS first_week, max(iso_week_start) AS last_week, count(*) AS weeks
+                FROM (
+                    SELECT iso_week_start, {week_ordinal} - row_number() OVER (ORDER BY iso_week_start) AS run
+                    FROM weekly_reports WHERE mentee_id = {mentee} AND iso_week_start IS NOT NULL
+                ) AS weeks GROUP BY run
+            ) AS runs
+        ) AS ranked WHERE {condition}
+        ON CONFLICT (mentee_id) DO UPDATE SET reports = excluded.reports, first_week_start = excluded.first_week_start,
+            last_week_start = excluded.last_week_start, longest_streak = excluded.longest_streak,
+            latest_streak = excluded.latest_streak;
+        DELETE FROM mentee_submission_stats WHERE mentee_id = {mentee} AND reports = 0;"""
+
+
+def _sqlite_rollup_change(row: str, sign: str) -> str:
+    quarter = f"min(({row}.week_number - 1) / 13 + 1, 4)"
+    days_late = (f"max(0, coalesce(CAST(julianday(date({row}.submission_date)) "
+                 f"- julianday({row}.iso_week_start, '+6 days') AS INTEGER), 0))")
+    if sign == "+":
+        return f"""INSERT INTO submission_rollups (mentee_id, year, quarter, reports, late_reports, days_late)
+        VALUES ({row}.mentee_id, {row}.year, {quarter}, 1, {days_late} > 0, {days_late})
+        ON CONFLICT (mentee_id, year, quarter) DO UPDATE SET reports = reports + 1,
+            late_reports = late_reports + excluded.late_reports, days_late = days_late + excluded.days_late;"""
+    return f"""UPDATE submission_rollups SET reports = reports - 1,
+            late_reports = late_reports - ({days_late} > 0), days_late = days_late - {days_late}
+        WHERE mentee_id = {row}.mentee_id AND year = {row}.year AND quarter = {quarter};
+        DELETE FROM submission_rollups
+        WHERE mentee_id = {row}.mentee_id AND year = {row}.year AND quarter = {quarter} AND reports <= 0;"""
+
+
+_SQLITE_WEEK_ORDINAL = "CAST(julianday(iso_week_start) AS INTEGER) / 7"
+_ROLLUP_COLUMNS = "mentee_id, year, week_number, iso_week_start, submission_date"
+
+SQLITE_ROLLUP_DDL = [
+    f"""CREATE TRIGGER IF NOT EXISTS weekly_reports_rollup_insert AFTER INSERT ON weekly_reports BEGIN
+        {_sqlite_rollup_change("new", "+")}
+        {_mentee_stats_upsert("new.mentee_id", _SQLITE_WEEK_ORDINAL)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS weekly_reports_rollup_delete AFTER DELETE ON weekly_reports BEGIN
+        {_sqlite_rollup_change("old", "-")}
+        {_mentee_stats_upsert("old.mentee_id", _SQLITE_WEEK_ORDINAL)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS weekly_reports_rollup_update AFTER UPDATE OF {_ROLLUP_COLUMNS} ON weekly_reports
+    WHEN {" OR ".join(f"old.{column} IS NOT new.{column}" for column in _ROLLUP_COLUMNS.split(", "))} BEGIN
+        {_sqlite_rollup_change("old", "-")}
+        {_sqlite_rollup_change("new", "+")}
+        {_mentee_stats_upsert("old.mentee_id", _SQLITE_WEEK_ORDINAL, "old.mentee_id IS NOT new.mentee_id")}
+        {_mentee_stats_upsert("new.mentee_id", _SQLITE_WEEK_ORDINAL)}
+    END""",
+]
+
+
+def _postgresql_rollup_change(row: str, sign: str) -> str:
+    quarter = f"LEAST(({row}.week_number - 1) / 13 + 1, 4)"
+    days_late = f"GREATEST(0, COALESCE(CAST({row}.submission_date AS date) - ({row}.iso_week_start + 6), 0))"
+    if sign == "+":
+        return f"""INSERT INTO submission_rollups (mentee_id, year, quarter, reports, late_reports, days_late)
+            VALUES ({row}.mentee_id, {row}.year, {quarter}, 1, CASE WHEN {days_late} > 0 THEN 1 ELSE 0 END, {days_late})
+            ON CONFLICT (mentee_id, year, quarter) DO UPDATE SET reports = submission_rollups.reports + 1,
+                late_reports = submission_rollups.late_reports + excluded.late_reports,
+                days_late = submission_rollups.days_late + excluded.days_late;"""
+    return f"""UPDATE submission_rollups SET reports = reports - 1,
+                late_reports = late_reports - CASE WHEN {days_late} > 0 THEN 1 ELSE 0 END, days_late = days_late - {days_late}
+            WHERE mentee_id = {row}.mentee_id AND year = {row}.year AND quarter = {quarter};
+            DELETE FROM submission_rollups
+            WHERE mentee_id = {row}.mentee_id AND year = {row}.year AND quarter = {quarter} AND reports <= 0;"""
+
+
+POSTGRESQL_ROLLUP_DDL = [
+    f"""CREATE OR REPLACE FUNCTION refresh_mentee_submission_stats(target integer) RETURNS void AS $$
+    BEGIN
+        {_mentee_stats_upsert("target", "(iso_week_start - DATE '2000-01-03') / 7")}
+    END $$ LANGUAGE plpgsql""",
+    f"""CREATE OR REPLACE FUNCTION weekly_reports_rollup() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND ROW(OLD.{", OLD.".join(_ROLLUP_COLUMNS.split(", "))})
+                IS NOT DISTINCT FROM ROW(NEW.{", NEW.".join(_ROLLUP_COLUMNS.split(", "))}) THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            {_postgresql_rollup_change("OLD", "-")}
+            PERFORM refresh_mentee_submission_stats(OLD.mentee_id);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            {_postgresql_rollup_change("NEW", "+")}
+            IF TG_OP = 'INSERT' OR OLD.mentee_id <> NEW.mentee_id THEN
+                PERFORM refresh_mentee_submission_stats(NEW.mentee_id);
+            END IF;
+        END IF;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    """DROP TRIGGER IF EXISTS weekly_reports_rollup ON weekly_reports""",
+    f"""CREATE TRIGGER weekly_reports_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF {_ROLLUP_COLUMNS} ON weekly_reports
+    FOR EACH ROW EXECUTE FUNCTION weekly_reports_rollup()""",
+]
+
+for statement in SQLITE_SEARCH_DDL + SQLITE_ROLLUP_DDL:
+    event.listen(WeeklyReport.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRESQL_SEARCH_DDL + POSTGRESQL_ROLLUP_DDL:
+    event.listen(WeeklyReport.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
 
 # Database setup
-DATABASE_URL = "sqlite:///./weekly_reports.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _pool_options(url, config: Settings) -> dict:
+    """Connection pool arguments for a database URL (in-memory SQLite has a single connection, no pool)"""
+    if _is_memory_sqlite(url):
+        return {}
+    return {
+        "pool_size": config.db_pool_size,
+        "max_overflow": config.db_max_overflow,
+        "pool_timeout": config.db_pool_timeout,
+        "pool_pre_ping": config.db_pool_pre_ping,
+        "pool_recycle": config.db_pool_recycle,
+    }
+
+
+def apply_sqlite_pragmas(engine: Engine, config: Settings) -> None:
+    """Set WAL journaling, sync level, busy timeout and mmap on every new SQLite connection"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(config.sqlite_busy_timeout_ms)}",
+        f"PRAGMA synchronous = {config.sqlite_synchronous}",
+        f"PRAGMA mmap_size = {int(config.sqlite_mmap_size)}",
+    ]
+    if not _is_memory_sqlite(engine.url):
+        # busy_timeout goes first so switching the journal mode can wait for other writers
+        pragmas.insert(1, f"PRAGMA journal_mode = {config.sqlite_journal_mode}")
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def register_sqlite_functions(engine: Engine) -> None:
+    """Add the app's SQL functions (wr_decompress for report bodies) to every new SQLite connection"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def create_sqlite_functions(dbapi_connection, connection_record):
+        dbapi_connection.create_function("wr_decompress", 1, decode_text, deterministic=True)
+
+
+def create_db_engine(database_url: Optional[str] = None, config: Settings = settings) -> Engine:
+    """Create the sync engine from settings (connections are only opened on first use)"""
+    url = make_url(database_url or config.database_url)
+    options = _pool_options(url, config)
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    db_engine = create_engine(url, echo=config.db_echo, **options)
+    apply_sqlite_pragmas(db_engine, config)
+    register_sqlite_functions(db_engine)
+    instrument_engine(db_engine)
+    return db_engine
+
+
+def create_async_db_engine(database_url: Optional[str] = None, config: Settings = settings) -> AsyncEngine:
+    """Create the async engine from settings, deriving the async driver from the sync URL if needed"""
+    url = make_url(database_url or config.async_database_url or async_url_for(config.database_url))
+    options = _pool_options(url, config)
+    if options and url.get_backend_name() == "sqlite":
+        # aiosqlite defaults to opening a new connection per checkout; pool them like any other database
+        options["poolclass"] = AsyncAdaptedQueuePool
+    db_engine = create_async_engine(url, echo=config.db_echo, **options)
+    apply_sqlite_pragmas(db_engine.sync_engine, config)
+    register_sqlite_functions(db_engine.sync_engine)
+    instrument_engine(db_engine.sync_engine)
+    return db_engine
+
+
+DATABASE_URL = settings.database_url
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def create_tables():
-    Base.metadata.create_all(bind=engine)
+# Async database setup (used by the API so queries don't block the event loop)
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+def _reset_pools_after_fork():
+    """A forked worker (e.g. gunicorn --preload) gets fresh, empty pools instead of sharing its
+    parent's connections; close=False leaves the parent's connections for the parent to use"""
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
 
 def get_db():
     db = SessionLocal()
@@ -63,3 +408,6 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,8 +1,10 @@
 import streamlit as st
-import requests
 import json
 from datetime import datetime
 import pandas as pd
+from urllib.parse import urlencode
+
+from api_client import ApiClient, RequestStats
 
 # Configuration
 API_BASE_URL = "http://localhost:8000"
@@ -12,28 +14,46 @@ if 'user' not in st.session_state:
     st.session_state.user = None
 if 'page' not in st.session_state:
     st.session_state.page = 'login'
+if 'tokens' not in st.session_state:
+    st.session_state.tokens = None
+if 'api_stats' not in st.session_state:
+    st.session_state.api_stats = RequestStats()
+
+@st.cache_resource
+def get_api_client():
+    """One client per server process, so every session reuses the same keep-alive connections"""
+    return ApiClient(API_BASE_URL)
+
+def _user_key():
+    return st.session_state.user['id'] if st.session_state.user else None
+
+def _send(method, endpoint, data=None):
+    """Send one request, with the bearer access token if we're logged in"""
+    token = st.session_state.tokens['access_token'] if st.session_state.tokens else None
+    return get_api_client().request(
+        method, endpoint, data, token=token, user_key=_user_key(), stats=st.session_state.api_stats
+    )
+
+def _refresh_tokens():
+    """Swap the refresh token for a new token pair; returns False if the session has expired"""
+    tokens, error, status_code = get_api_client().request("POST", "/auth/refresh", {
+        "refresh_token": st.session_state.tokens['refresh_token']
+    }, stats=st.session_state.api_stats)
+    if status_code != 200:
+        st.session_state.tokens = None
+        return False
+    st.session_state.tokens = tokens
+    return True
 
 def make_api_call(endpoint, method='GET', data=None):
-    """Make API calls to the FastAPI backend"""
-    url = f"{API_BASE_URL}{endpoint}"
-    try:
-        if method == 'POST':
-            response = requests.post(url, json=data)
-        elif method == 'PUT':
-            response = requests.put(url, json=data)
-        elif method == 'DELETE':
-            response = requests.delete(url)
-        else:
-            response = requests.get(url)
-        
-        if response.status_code == 200:
-            return response.json(), None
-        else:
-            return None, response.json().get('detail', 'Unknown error')
-    except requests.exceptions.ConnectionError:
-        return None, "Cannot connect to API. Make sure the FastAPI server is running."
-    except Exception as e:
-        return None, str(e)
+    """Make API calls to the FastAPI backend; GETs are cached briefly per user until they write something"""
+    result, error, status_code = _send(method, endpoint, data)
+    
+    # Access tokens are short-lived; refresh once and retry
+    if status_code == 401 and st.session_state.tokens and _refresh_tokens():
+        result, error, status_code = _send(method, endpoint, data)
+    
+    return result, error
 
 def login_page():
     st.title("🤝 Weekly Sync App")
@@ -52,6 +72,9 @@ def login_page():
                 })
                 
                 if data:
+                    st.session_state.tokens = {
+                        key: data.pop(key) for key in ("access_token", "refresh_token", "token_type", "expires_in")
+                    }
                     st.session_state.user = data
                     st.session_state.page = 'dashboard'
                     # Clear login form
@@ -211,39 +234,26 @@ def mentee_dashboard():
             search_button = st.button("🔍 Search", key="search_report")
         
         if search_button:
-            # Check if mentee has a mentor assigned
-            mentor_id = st.session_state.user.get('mentor_id')
+            report, error = make_api_call(
+                f"/reports/mentees/{st.session_state.user['id']}/weeks/{int(search_year)}/{int(search_week)}"
+            )
             
-            if not mentor_id:
-                st.error("❌ No mentor assigned. Cannot search reports.")
-            else:
-                # Get all reports from mentor to find this mentee's specific report
-                all_reports, error = make_api_call(f"/reports/mentors/{mentor_id}")
+            if report:
+                st.success(f"✅ Found report for Week {search_week}, {search_year}")
                 
-                if all_reports:
-                    # Filter for this specific mentee and week
-                    specific_report = [r for r in all_reports 
-                                     if r['mentee_id'] == st.session_state.user['id'] 
-                                     and r['week_number'] == search_week 
-                                     and r['year'] == search_year]
-                    
-                    if specific_report:
-                        report = specific_report[0]
-                        st.success(f"✅ Found report for Week {search_week}, {search_year}")
-                        
-                        with st.container():
-                            st.write(f"**📅 Submitted:** {report['submission_date'][:10]}")
-                            st.write("**🎯 Accomplishments:**")
-                            st.write(report['accomplishments'])
-                            st.write("**🚧 Blockers/Concerns:**")
-                            st.write(report['blockers_concerns_comments'])
-                            st.write("**🌟 Aspirations:**")
-                            st.write(report['aspirations'])
-                    else:
-                        st.warning(f"❌ No report found for Week {search_week}, {search_year}")
-                        st.info("💡 Make sure you've submitted a report for this week.")
-                else:
-                    st.error(f"Failed to search reports: {error}")
+                with st.container():
+                    st.write(f"**📅 Submitted:** {report['submission_date'][:10]}")
+                    st.write("**🎯 Accomplishments:**")
+                    st.write(report['accomplishments'])
+                    st.write("**🚧 Blockers/Concerns:**")
+                    st.write(report['blockers_concerns_comments'])
+                    st.write("**🌟 Aspirations:**")
+                    st.write(report['aspirations'])
+            elif error == "Report not found":
+                st.warning(f"❌ No report found for Week {search_week}, {search_year}")
+                st.info("💡 Make sure you've submitted a report for this week.")
+            else:
+                st.error(f"Failed to search reports: {error}")
         
         # Show instruction when no search is performed
         if not search_button:
@@ -252,16 +262,23 @@ def mentee_dashboard():
 def mentor_dashboard():
     st.title(f"👨‍🏫 Mentor Dashboard - {st.session_state.user['name']}")
     
-    tab1, tab2 = st.tabs(["👥 My Mentees", "📊 All Reports"])
+    tab1, tab2, tab3 = st.tabs(["👥 My Mentees", "📊 All Reports", "🔎 Search Text"])
+    
+    # Mentees, their latest reports and this week's status in one request, shared by both tabs
+    dashboard, dashboard_error = make_api_call(f"/dashboard/mentor/{st.session_state.user['id']}")
+    mentees_data = [entry['mentee'] for entry in dashboard['mentees']] if dashboard else None
+    mentees_error = dashboard_error
     
     with tab1:
         st.subheader("My Mentees")
         
-        data, error = make_api_call(f"/users/mentors/{st.session_state.user['id']}/mentees")
-        
-        if data:
-            if data:
-                for mentee in data:
+        if dashboard:
+            if dashboard['mentees']:
+                if dashboard['missing_current_week']:
+                    st.warning(f"⏳ {dashboard['missing_current_week']} mentee(s) haven't submitted for week "
+                               f"{dashboard['week_number']}, {dashboard['year']} yet.")
+                for entry in dashboard['mentees']:
+                    mentee = entry['mentee']
                     with st.container():
                         col1, col2, col3 = st.columns([2, 2, 1])
                         with col1:
@@ -272,18 +289,21 @@ def mentor_dashboard():
                             st.write(f"🏢 {mentee['team_name']}")
                         with col3:
                             st.write(f"📍 {mentee['office_location']}")
+                            st.write("✅ This week" if entry['submitted_current_week'] else "⏳ Not yet this week")
+                            st.write(f"🔥 {entry['streak_weeks']} week streak")
+                        if entry['latest_reports']:
+                            latest = entry['latest_reports'][0]
+                            st.caption(f"Latest: week {latest['week_number']}, {latest['year']} - "
+                                       f"{latest['accomplishments'][:120]}")
                         st.divider()
             else:
                 st.info("No mentees assigned yet.")
         else:
-            st.error(f"Failed to load mentees: {error}")
+            st.error(f"Failed to load mentees: {dashboard_error}")
     
     with tab2:
         st.subheader("📊 Reports Search & Review")
         
-        # Get mentees for dropdown
-        mentees_data, mentees_error = make_api_call(f"/users/mentors/{st.session_state.user['id']}/mentees")
-        
         if mentees_data:
             if mentees_data:
                 # Search filters
@@ -320,25 +340,19 @@ def mentor_dashboard():
                         selected_mentee_data = next((m for m in mentees_data if m['name'] == selected_mentee), None)
                         
                         if selected_mentee_data:
-                            # Get all reports for this mentor
-                            all_reports, reports_error = make_api_call(f"/reports/mentors/{st.session_state.user['id']}")
+                            # Let the API filter by mentee/week/year; latest 5 reports if no specific week/year
+                            params = f"mentee_id={selected_mentee_data['id']}"
+                            if filter_week > 0:
+                                params += f"&week_number={filter_week}"
+                            if filter_year > 0:
+                                params += f"&year={filter_year}"
+                            params += "&limit=5" if filter_week == 0 and filter_year == 0 else "&limit=100"
                             
-                            if all_reports:
-                                # Filter reports for selected mentee
-                                mentee_reports = [r for r in all_reports if r['mentee_id'] == selected_mentee_data['id']]
-                                
-                                # Apply week/year filters if specified
-                                if filter_week > 0:
-                                    mentee_reports = [r for r in mentee_reports if r['week_number'] == filter_week]
-                                
-                                if filter_year > 0:
-                                    mentee_reports = [r for r in mentee_reports if r['year'] == filter_year]
-                                
-                                # Sort by submission date (newest first) and limit to 5 if no specific week/year
-                                mentee_reports.sort(key=lambda x: x['submission_date'], reverse=True)
-                                
-                                if filter_week == 0 and filter_year == 0:
-                                    mentee_reports = mentee_reports[:5]  # Latest 5 reports
+                            # Headers only; a report's text is fetched when it's opened
+                            reports_page, reports_error = make_api_call(f"/reports/mentors/{st.session_state.user['id']}/summaries?{params}&preview=true")
+                            
+                            if reports_page:
+                                mentee_reports = reports_page['items']
                                 
                                 if mentee_reports:
                                     # Show filter summary
@@ -356,20 +370,33 @@ def mentor_dashboard():
                                     st.success(f"✅ Found {len(mentee_reports)} report(s) for {filter_text}")
                                     
                                     # Display reports
+                                    opened = st.session_state.setdefault("opened_reports", set())
                                     for report in mentee_reports:
-                                        with st.expander(f"Week {report['week_number']}, {report['year']} - {report['submission_date'][:10]}"):
+                                        is_open = report['id'] in opened
+                                        with st.expander(f"Week {report['week_number']}, {report['year']} - {report['submission_date'][:10]}", expanded=is_open):
                                             col1, col2 = st.columns(2)
                                             with col1:
                                                 st.write(f"**📅 Submitted:** {report['submission_date'][:10]}")
                                             with col2:
                                                 st.write(f"**👤 Mentee:** {report['mentee_name']}")
                                             
+                                            if not is_open:
+                                                st.caption(report['preview'])
+                                                if st.button("📖 Read report", key=f"open_report_{report['id']}"):
+                                                    opened.add(report['id'])
+                                                    st.rerun()
+                                                continue
+                                            
+                                            full_report, report_error = make_api_call(f"/reports/{report['id']}")
+                                            if not full_report:
+                                                st.error(f"Failed to load report: {report_error}")
+                                                continue
                                             st.write("**🎯 Accomplishments:**")
-                                            st.write(report['accomplishments'])
+                                            st.write(full_report['accomplishments'])
                                             st.write("**🚧 Blockers/Concerns:**")
-                                            st.write(report['blockers_concerns_comments'])
+                                            st.write(full_report['blockers_concerns_comments'])
                                             st.write("**🌟 Aspirations:**")
-                                            st.write(report['aspirations'])
+                                            st.write(full_report['aspirations'])
                                 else:
                                     st.warning(f"❌ No reports found for {selected_mentee} with the specified filters.")
                                     st.info("💡 Try adjusting your search criteria or check if reports have been submitted.")
@@ -383,8 +410,47 @@ def mentor_dashboard():
                 st.info("No mentees assigned yet.")
         else:
             st.error(f"Failed to load mentees: {mentees_error}")
+    
+    with tab3:
+        st.subheader("🔎 Search Report Text")
+        
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            search_text = st.text_input("Search for", placeholder='e.g. "deploy pipeline" or migrat*', key="mentor_text_search")
+        with col2:
+            field_labels = {
+                "🎯 Accomplishments": "accomplishments",
+                "🚧 Blockers/Concerns": "blockers_concerns_comments",
+                "🌟 Aspirations": "aspirations"
+            }
+            search_fields = st.multiselect("In", list(field_labels), default=list(field_labels), key="mentor_text_fields")
+        
+        if search_text.strip():
+            params = urlencode([("q", search_text), ("limit", 50)] + [("fields", field_labels[f]) for f in search_fields])
+            results, search_error = make_api_call(f"/reports/mentors/{st.session_state.user['id']}/search?{params}")
+            
+            if results:
+                if results['items']:
+                    st.success(f"✅ {len(results['items'])}{'+' if results['next_offset'] else ''} matching report(s), best match first")
+                    for hit in results['items']:
+                        report = hit['report']
+                        with st.expander(f"{report['mentee_name']} - Week {report['week_number']}, {report['year']}"):
+                            for label, field in field_labels.items():
+                                if field in hit['highlights']:
+                                    st.write(f"**{label}:**")
+                                    # Matched terms come back wrapped in <mark>; show them in bold
+                                    st.markdown(hit['highlights'][field].replace("<mark>", "**").replace("</mark>", "**"))
+                else:
+                    st.warning("❌ No reports mention that.")
+            else:
+                st.error(f"Search failed: {search_error}")
+        else:
+            st.info("💡 Search every report from your mentees. Use quotes for a phrase and * for a prefix.")
 
 def main():
+    # Count this run's API traffic from scratch
+    st.session_state.api_stats = RequestStats()
+    
     # Sidebar
     with st.sidebar:
         if st.session_state.user:
@@ -393,7 +459,9 @@ def main():
             st.write(f"Team: **{st.session_state.user['team_name']}**")
             
             if st.button("🚪 Logout"):
+                get_api_client().invalidate(_user_key())
                 st.session_state.user = None
+                st.session_state.tokens = None
                 st.session_state.page = 'login'
                 st.rerun()
         else:
@@ -413,6 +481,8 @@ def main():
         else:
             st.session_state.page = 'login'
             st.rerun()
+    
+    st.sidebar.caption(f"📡 {st.session_state.api_stats}")
 
 if __name__ == "__main__":
     st.set_page_config(
@@ -0,0 +1,137 @@
+"""
+Tests for the submission analytics rollups: trigger maintenance, the pandas rebuild and check, and the endpoints
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import select, text
+
+from models import MenteeSubmissionStats, SubmissionRollup
+from app.services.analytics_service import (
+    check_submission_rollups,
+    get_mentor_submission_analytics,
+    get_submission_analytics,
+    rebuild_submission_rollups
+)
+
+TODAY = date(2024, 4, 10)  # ISO week 15 of 2024, the second week of Q2
+BODY = {"accomplishments": "Shipped", "blockers_concerns_comments": "None", "aspirations": "More"}
+
+
+def submitted(year, week, days_late=0):
+    """Friday of the ISO week, or days_late days after its Sunday deadline"""
+    if days_late:
+        return datetime.combine(date.fromisocalendar(year, week, 7) + timedelta(days=days_late), time(9))
+    return datetime.combine(date.fromisocalendar(year, week, 5), time(17))
+
+
+def rollup_tables(db_session):
+    db_session.expire_all()
+    return (
+        db_session.execute(select(SubmissionRollup.__table__).order_by(*SubmissionRollup.__table__.primary_key)).all(),
+        db_session.execute(select(MenteeSubmissionStats.__table__).order_by(MenteeSubmissionStats.mentee_id)).all()
+    )
+
+
+def seed_team(make_user, make_report):
+    mentor = make_user("Mentor")
+    alice = make_user("Alice", mentor=mentor, created_at=datetime(2024, 1, 1))
+    bob = make_user("Bob", mentor=mentor, created_at=datetime(2024, 3, 1), office_location="London")
+    make_user("Dan", mentor=mentor, is_active=False)
+    other = make_user("Other mentor")
+    make_user("Cara", mentor=other, created_at=datetime(2024, 4, 1), team_name="Design", office_location="Remote")
+
+    # Alice: weeks 1-10 on time, week 12 three days late, weeks 14-15 on time
+    for week in [*range(1, 11), 14, 15]:
+        make_report(alice, week, 2024, submission_date=submitted(2024, week))
+    make_report(alice, 12, 2024, submission_date=submitted(2024, 12, days_late=3))
+    # Bob joined in week 9 and only sent week 13, ten days late
+    make_report(bob, 13, 2024, submission_date=submitted(2024, 13, days_late=10))
+    return mentor
+
+
+def test_mentor_analytics_rates_lateness_and_streaks(db_session, make_user, make_report):
+    mentor = seed_team(make_user, make_report)
+
+    analytics = get_mentor_submission_analytics(db_session, mentor.id, year=2024, today=TODAY)
+    alice, bob = analytics.mentees
+    assert (alice.mentee_name, bob.mentee_name) == ("Alice", "Bob")
+
+    q1, q2, q3, q4 = alice.quarters
+    assert (q1.reports, q1.expected_reports, q1.submission_rate, q1.late_reports, q1.average_days_late) == \
+        (11, 13, 0.846, 1, 0.27)
+    assert (q2.reports, q2.expected_reports, q2.submission_rate) == (2, 2, 1.0)
+    assert (q3.expected_reports, q3.submission_rate, q3.average_days_late) == (0, None, None)
+    assert (alice.longest_streak, alice.current_streak) == (10, 2)
+
+    assert [(q.reports, q.expected_reports, q.submission_rate) for q in bob.quarters[:2]] == [(1, 5, 0.2), (0, 2, 0.0)]
+    assert (bob.quarters[0].average_days_late, bob.longest_streak, bob.current_streak) == (10.0, 1, 0)
+
+    total = analytics.quarters[0]
+    assert (total.reports, total.expected_reports, total.submission_rate, total.late_reports) == (12, 18, 0.667, 2)
+    assert total.average_days_late == 1.08
+
+
+def test_group_analytics_by_team_and_office(db_session, make_user, make_report):
+    seed_team(make_user, make_report)
+
+    teams = get_submission_analytics(db_session, "team", year=2024, today=TODAY)
+    design, engineering = teams.groups
+    assert (design.group, design.mentees, engineering.group, engineering.mentees) == ("Design", 1, "Engineering", 2)
+    assert [(q.reports, q.expected_reports) for q in engineering.quarters[:2]] == [(12, 18), (2, 4)]
+    assert [(q.expected_reports, q.submission_rate) for q in design.quarters[:2]] == [(0, None), (2, 0.0)]
+    assert engineering.longest_streak == 10
+
+    offices = get_submission_analytics(db_session, "office", year=2024, today=TODAY)
+    assert [(g.group, g.quarters[0].reports) for g in offices.groups] == [("London", 1), ("New York", 11), ("Remote", 0)]
+
+
+def test_api_writes_keep_the_rollups_exact(client, login_as, db_session, make_user):
+    login_as(make_user("Admin"), admin=True)
+    mentor = make_user("Mentor")
+    mentee = make_user("Mentee", mentor=mentor)
+    ids = [client.post("/reports/", params={"mentee_id": mentee.id}, json={"week_number": week, "year": 2024, **BODY}).json()["id"]
+           for week in (1, 2, 3, 14)]
+    client.post("/reports/import", content="mentee_id,week_number,year,accomplishments,blockers_concerns_comments,aspirations\n"
+                f"{mentee.id},4,2024,Imported,None,More\n{mentee.id},5,2024,Imported,None,More\n",
+                headers={"Content-Type": "text/csv"})
+    # Week 14 moves into Q1 next to the others; week 2 is deleted, splitting the run
+    client.put(f"/reports/{ids[3]}", json={"week_number": 6, "year": 2024, **BODY})
+    client.delete(f"/reports/{ids[1]}")
+
+    assert check_submission_rollups(db_session) == []
+    rollups, (stats,) = rollup_tables(db_session)
+    assert [(row.year, row.quarter, row.reports) for row in rollups] == [(2024, 1, 5)]
+    assert (stats.reports, stats.longest_streak, stats.latest_streak) == (5, 4, 4)
+
+    response = client.get(f"/analytics/mentors/{mentor.id}", params={"year": 2024})
+    assert response.status_code == 200
+    assert response.json()["mentees"][0]["quarters"][0]["reports"] == 5
+    assert client.get("/analytics/mentors/999").status_code == 404
+    assert client.get("/analytics/submissions", params={"group_by": "position"}).status_code == 422
+
+
+def test_analytics_endpoints_never_read_the_reports_table(client, login_as, sql_statements, make_user, make_report):
+    mentor = seed_team(make_user, make_report)
+    login_as(make_user("Admin"), admin=True)
+    sql_statements.clear()
+
+    assert client.get(f"/analytics/mentors/{mentor.id}", params={"year": 2024}).status_code == 200
+    assert client.get("/analytics/submissions", params={"group_by": "office", "year": 2024}).status_code == 200
+    assert sql_statements and not any("weekly_reports" in statement for statement in sql_statements)
+
+
+def test_rebuild_restores_what_the_triggers_maintain_and_check_reports_drift(db_session, engine, make_user, make_report):
+    seed_team(make_user, make_report)
+    maintained = rollup_tables(db_session)
+
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE submission_rollups SET days_late = 0"))
+        conn.execute(text("DELETE FROM mentee_submission_stats WHERE longest_streak = 10"))
+    drift = check_submission_rollups(db_session)
+    assert {(m.table, m.field) for m in drift} == {("submission_rollups", "days_late"), ("mentee_submission_stats", "*")}
+
+    result = rebuild_submission_rollups(db_session)
+    assert (result.reports, result.rollups, result.mentees) == (14, 3, 2)
+    assert check_submission_rollups(db_session) == []
+    assert rollup_tables(db_session) == maintained
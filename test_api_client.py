@@ -0,0 +1,87 @@
+"""
+Tests for the Streamlit front end's API client, against an in-memory transport
+"""
+
+import json
+
+import requests
+from requests.adapters import BaseAdapter
+
+from api_client import ApiClient, RequestStats
+
+
+class RecordingAdapter(BaseAdapter):
+    """Answers every request with a canned JSON body and remembers what was sent"""
+
+    def __init__(self, status_code=200, body=None):
+        super().__init__()
+        self.status_code = status_code
+        self.body = {"ok": True} if body is None else body
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append((request.method, request.url, request.headers.get("Authorization"), kwargs.get("timeout")))
+        response = requests.Response()
+        response.status_code = self.status_code
+        response._content = json.dumps(self.body).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def make_client(adapter, **options):
+    client = ApiClient("http://api.test", **options)
+    client.session.mount("http://", adapter)
+    return client
+
+
+def test_gets_are_cached_per_user_and_dropped_after_their_writes():
+    adapter = RecordingAdapter()
+    client = make_client(adapter)
+    stats = RequestStats()
+
+    for _ in range(3):
+        assert client.request("GET", "/users/1", token="t1", user_key=1, stats=stats) == ({"ok": True}, None, 200)
+    client.request("GET", "/users/1", token="t2", user_key=2, stats=stats)
+    assert (stats.requests, stats.cache_hits) == (2, 2)
+    assert adapter.sent[0][2] == "Bearer t1" and adapter.sent[0][3] == client.timeout
+
+    client.request("POST", "/reports/", {"week_number": 1}, user_key=1, stats=stats)
+    client.request("GET", "/users/1", user_key=1, stats=stats)
+    client.request("GET", "/users/1", user_key=2, stats=stats)
+    assert (stats.requests, stats.cache_hits) == (4, 3)
+
+
+def test_errors_are_not_cached_and_report_the_detail():
+    adapter = RecordingAdapter(status_code=404, body={"detail": "Report not found"})
+    client = make_client(adapter)
+    stats = RequestStats()
+
+    assert client.request("GET", "/reports/1", stats=stats) == (None, "Report not found", 404)
+    client.request("GET", "/reports/1", stats=stats)
+    assert (stats.requests, stats.errors, stats.cache_hits) == (2, 2, 0)
+
+
+def test_cache_expires_and_stays_bounded():
+    adapter = RecordingAdapter()
+    client = make_client(adapter, cache_ttl=0, cache_max_entries=2)
+    client.request("GET", "/a")
+    client.request("GET", "/a")
+    assert len(adapter.sent) == 2
+
+    client.cache_ttl = 60
+    for endpoint in ("/a", "/b", "/c"):
+        client.request("GET", endpoint)
+    assert len(client._cache) == 2
+
+
+def test_unreachable_api_returns_an_error_instead_of_raising():
+    client = ApiClient("http://127.0.0.1:9", retries=0, timeout=(0.5, 0.5))
+    stats = RequestStats()
+    data, error, status_code = client.request("GET", "/", stats=stats)
+    assert data is None and status_code == 0
+    assert "Cannot connect" in error
+    assert stats.errors == 1
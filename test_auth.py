@@ -0,0 +1,177 @@
+"""
+Tests for registration, login and password hashing
+"""
+
+import hashlib
+
+import pytest
+
+from app.services import auth_service, user_service
+from app.utils.cache import current_user_cache
+from app.utils.security import (
+    ACCESS_TOKEN,
+    PBKDF2Hasher,
+    ScryptHasher,
+    TokenError,
+    create_token,
+    decode_token,
+    verify_password
+)
+
+MENTOR = {
+    "name": "Sarah Wilson",
+    "email": "sarah@company.com",
+    "password": "password123",
+    "team_name": "Product",
+    "current_position": "Senior Manager",
+    "office_location": "San Francisco"
+}
+
+
+def test_register_mentor_and_mentee_then_login(client):
+    mentor = client.post("/auth/register", json=MENTOR)
+    assert mentor.status_code == 200
+    assert mentor.json()["user_type"] == "mentor"
+
+    mentee = client.post("/auth/register", json={
+        **MENTOR,
+        "name": "Mike Chen",
+        "email": "mike@company.com",
+        "mentor_email": "sarah@company.com"
+    })
+    assert mentee.status_code == 200
+    assert mentee.json()["user_type"] == "mentee"
+    assert mentee.json()["mentor_id"] == mentor.json()["id"]
+
+    login = client.post("/auth/login", json={"email": "mike@company.com", "password": "password123"})
+    assert login.status_code == 200
+    assert login.json()["id"] == mentee.json()["id"]
+
+    bad_login = client.post("/auth/login", json={"email": "mike@company.com", "password": "wrong"})
+    assert bad_login.status_code == 401
+
+
+def test_register_rejects_duplicate_email(client, monkeypatch):
+    assert client.post("/auth/register", json=MENTOR).status_code == 200
+
+    # The email is checked before the password is hashed
+    hashed = []
+    monkeypatch.setattr(user_service, "hash_password_async", lambda password: hashed.append(password))
+    duplicate = client.post("/auth/register", json=MENTOR)
+    assert duplicate.status_code == 400
+    assert duplicate.json()["detail"] == "Email already registered"
+    assert hashed == []
+
+
+def test_unknown_email_still_costs_a_password_verification(client, monkeypatch):
+    verified = []
+    real_verify = auth_service.verify_password_async
+
+    async def verify(password, hashed):
+        verified.append(hashed)
+        return await real_verify(password, hashed)
+
+    monkeypatch.setattr(auth_service, "verify_password_async", verify)
+    login = client.post("/auth/login", json={"email": "nobody@company.com", "password": "password123"})
+    assert login.status_code == 401 and login.json()["detail"] == "Invalid email or password"
+    assert client.post("/auth/login", json={"email": "nobody@company.com", "password": "x"}).status_code == 401
+    # Both against the same hash, made once
+    assert len(verified) == 2 and verified[0] == verified[1]
+
+
+def test_login_upgrades_legacy_sha256_hash(client, db_session, make_user):
+    user = make_user("Legacy", email="legacy@company.com",
+                     password_hash=hashlib.sha256(b"password123").hexdigest())
+
+    assert client.post("/auth/login", json={"email": "legacy@company.com", "password": "password123"}).status_code == 200
+
+    db_session.refresh(user)
+    assert user.password_hash.startswith("scrypt$")
+    assert verify_password("password123", user.password_hash)
+    assert client.post("/auth/login", json={"email": "legacy@company.com", "password": "password123"}).status_code == 200
+
+
+def test_hashers_salt_verify_and_flag_cost_changes():
+    hasher = ScryptHasher(n=1024)
+    first, second = hasher.hash("secret"), hasher.hash("secret")
+    assert first != second
+    assert hasher.verify("secret", first) and not hasher.verify("wrong", first)
+    assert not hasher.needs_rehash(first)
+    assert ScryptHasher(n=2048).needs_rehash(first)
+    assert PBKDF2Hasher(iterations=1000).needs_rehash(first)
+
+    pbkdf2 = PBKDF2Hasher(iterations=1000)
+    assert verify_password("secret", pbkdf2.hash("secret"))
+
+
+def test_corrupted_hashes_fail_verification(client, make_user):
+    for hasher in (ScryptHasher(n=1024), PBKDF2Hasher(iterations=1000)):
+        stored = hasher.hash("secret")
+        # One character short of a whole base64 group, non-base64 text, and a non-ASCII character
+        for corrupted in (stored[:-2], stored[:-8] + "!!!", stored[:-1] + "é"):
+            assert not hasher.verify("secret", corrupted)
+
+    make_user("Corrupt", email="corrupt@company.com", password_hash=ScryptHasher(n=1024).hash("password123")[:-2])
+    login = client.post("/auth/login", json={"email": "corrupt@company.com", "password": "password123"})
+    assert login.status_code == 401
+
+
+def test_login_issues_tokens_that_resolve_the_current_user(client):
+    registered = client.post("/auth/register", json=MENTOR).json()
+    login = client.post("/auth/login", json={"email": MENTOR["email"], "password": MENTOR["password"]}).json()
+    assert login["id"] == registered["id"]
+    assert login["token_type"] == "bearer"
+
+    me = client.get("/auth/me", headers={"Authorization": f"Bearer {login['access_token']}"})
+    assert me.status_code == 200
+    assert me.json()["email"] == MENTOR["email"]
+    assert current_user_cache.get(registered["id"]) is not None
+
+    assert client.get("/auth/me").status_code == 401
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {login['refresh_token']}"}).status_code == 401
+    tampered = login["access_token"][:-2] + ("AA" if not login["access_token"].endswith("AA") else "BB")
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {tampered}"}).status_code == 401
+
+    refreshed = client.post("/auth/refresh", json={"refresh_token": login["refresh_token"]})
+    assert refreshed.status_code == 200
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {refreshed.json()['access_token']}"}).status_code == 200
+    assert client.post("/auth/refresh", json={"refresh_token": login["access_token"]}).status_code == 401
+
+
+def test_non_ascii_signature_is_rejected(client):
+    token = create_token(1, ACCESS_TOKEN)
+    forged = token[:-1] + "é"
+    with pytest.raises(TokenError):
+        decode_token(forged, ACCESS_TOKEN)
+    # Headers must be latin-1, which é is
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {forged}".encode("latin-1")}).status_code == 401
+
+
+def test_expired_token_is_rejected():
+    token = create_token(1, ACCESS_TOKEN, ttl_seconds=-1)
+    with pytest.raises(TokenError):
+        decode_token(token, ACCESS_TOKEN)
+
+
+def test_data_routes_check_who_is_asking(client, login_as, make_user, make_report):
+    mentor, other_mentor = make_user("Mentor"), make_user("Other mentor")
+    mentee = make_user("Mentee", mentor=mentor)
+    report = make_report(mentee, 10, 2024)
+    latest = f"/reports/mentees/{mentee.id}/latest"
+    assert client.get(latest).status_code == 401
+
+    # Mentees see their own reports, mentors their mentees', admins everyone's
+    for user, admin, status in ((mentee, False, 200), (mentor, False, 200), (other_mentor, False, 403),
+                                (other_mentor, True, 200)):
+        login_as(user, admin=admin)
+        assert client.get(latest).status_code == status
+        assert client.get(f"/reports/{report.id}").status_code == (404 if status == 403 else 200)
+        assert client.get(f"/users/{mentee.id}").status_code == (404 if status == 403 else 200)
+
+    login_as(mentee)
+    assert client.get(f"/reports/mentors/{mentor.id}").status_code == 403
+    assert client.get(f"/users/{mentor.id}").status_code == 200
+    assert client.post("/reports/import", content="").status_code == 403
+    # Only the mentee (or an admin) changes a report; to anyone else it doesn't exist
+    login_as(mentor)
+    assert client.delete(f"/reports/{report.id}").status_code == 404
@@ -0,0 +1,20 @@
+"""
+Smoke test for the route benchmark suite: every app/api route has a scenario, and all of them succeed
+"""
+
+import asyncio
+
+from benchmarks.bench_routes import api_routes, missing_scenarios, run_suite
+from benchmarks.datagen import DatasetSpec
+
+
+def test_every_route_has_a_scenario_that_succeeds():
+    assert missing_scenarios() == []
+
+    spec = DatasetSpec(mentors=2, mentees_per_mentor=3, years=1)
+    results = asyncio.run(run_suite(spec, api_routes(), requests=3, concurrency=2, warmup=1))
+
+    assert set(results) == set(api_routes())
+    failed = {key: result.first_error for key, result in results.items() if result.errors}
+    assert failed == {}
+    assert all(result.requests == 3 and result.p50_ms <= result.p95_ms <= result.p99_ms for result in results.values())
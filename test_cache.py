@@ -0,0 +1,91 @@
+"""
+Tests for the read-through caches and their invalidation on writes
+"""
+
+import time
+
+from app.utils.cache import LRUCache, latest_reports_cache, mentee_list_cache, user_profile_cache
+
+REPORT = {
+    "week_number": 10,
+    "year": 2024,
+    "accomplishments": "Shipped",
+    "blockers_concerns_comments": "None",
+    "aspirations": "More"
+}
+
+
+def test_lru_cache_evicts_least_recently_used_and_expires():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    cache.set("short", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+
+
+def test_mentee_list_is_cached_until_a_mentee_registers(client, login_as, make_user):
+    mentor = login_as(make_user("Mentor", email="mentor@company.com"))
+    make_user("First", mentor=mentor)
+
+    for _ in range(3):
+        assert len(client.get(f"/users/mentors/{mentor.id}/mentees").json()) == 1
+    assert (mentee_list_cache.hits, mentee_list_cache.misses) == (2, 1)
+
+    client.post("/auth/register", json={
+        "name": "Second", "email": "second@company.com", "password": "pw", "team_name": "Eng",
+        "current_position": "Engineer", "office_location": "NYC", "mentor_email": "mentor@company.com"
+    })
+    assert mentee_list_cache.invalidations == 1
+    assert len(client.get(f"/users/mentors/{mentor.id}/mentees").json()) == 2
+
+    assert client.get("/users/mentors/999/mentees").status_code == 403
+    login_as(make_user("Admin"), admin=True)
+    assert client.get("/users/mentors/999/mentees").status_code == 404
+    assert mentee_list_cache.get(999) is None
+
+
+def test_latest_reports_are_invalidated_by_report_writes(client, login_as, make_user):
+    mentor = make_user("Mentor")
+    admin = make_user("Admin")
+    mentee = login_as(make_user("Mentee", mentor=mentor))
+    latest = lambda: client.get(f"/reports/mentees/{mentee.id}/latest").json()
+
+    assert latest() == []
+    created = client.post(f"/reports/?mentee_id={mentee.id}", json=REPORT).json()
+    assert [r["id"] for r in latest()] == [created["id"]]
+    assert latest_reports_cache.hits == 0
+
+    assert latest()[0]["accomplishments"] == "Shipped"
+    assert latest_reports_cache.hits == 1
+
+    client.put(f"/reports/{created['id']}", json={**REPORT, "accomplishments": "Shipped twice"})
+    assert latest()[0]["accomplishments"] == "Shipped twice"
+
+    login_as(admin, admin=True)
+    client.post("/reports/import?format=jsonl", content=(
+        f'{{"mentee_id": {mentee.id}, "week_number": 11, "year": 2024, "accomplishments": "Imported",'
+        f' "blockers_concerns_comments": "None", "aspirations": "More"}}\n'
+    ))
+    login_as(mentee)
+    assert [r["week_number"] for r in latest()] == [11, 10]
+
+    client.delete(f"/reports/{created['id']}")
+    assert [r["week_number"] for r in latest()] == [11]
+
+
+def test_user_profiles_and_stats_endpoint(client, login_as, make_user):
+    user = login_as(make_user("Mentor"))
+    assert client.get(f"/users/{user.id}").json()["name"] == "Mentor"
+    assert client.get(f"/users/{user.id}").json()["name"] == "Mentor"
+    assert client.get("/users/999").status_code == 404
+
+    stats = client.get("/cache/stats").json()
+    assert stats["user"]["hits"] == user_profile_cache.hits == 1
+    assert stats["user"]["misses"] == 2
+    assert stats["user"]["hit_ratio"] == round(1 / 3, 4)
@@ -0,0 +1,88 @@
+"""
+Tests for compressed storage of report bodies
+"""
+
+import pytest
+from sqlalchemy import text
+
+from app.utils import compression
+from app.utils.backfill import BACKFILLS, run_backfill
+from app.utils.compression import TextCodec, decode_text
+
+LONG_TEXT = "Worked on the deploy pipeline and reviewed pull requests for the migration. " * 8
+
+
+@pytest.fixture
+def zlib_storage(monkeypatch):
+    monkeypatch.setattr(compression, "text_codec", TextCodec("zlib", min_bytes=100))
+
+
+def stored_types(engine, report_id):
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT typeof(accomplishments), typeof(blockers_concerns_comments), typeof(aspirations) "
+            "FROM weekly_reports WHERE id = :id"
+        ), {"id": report_id}).one()
+
+
+@pytest.mark.parametrize("algorithm", ["zlib", "zstd"])
+def test_codec_round_trips_and_leaves_short_text_alone(algorithm):
+    if algorithm == "zstd":
+        pytest.importorskip("zstandard")
+    codec = TextCodec(algorithm, min_bytes=100)
+
+    stored = codec.encode(LONG_TEXT + "héllo")
+    assert isinstance(stored, bytes) and len(stored) < len(LONG_TEXT) / 4
+    assert decode_text(stored) == LONG_TEXT + "héllo"
+    assert codec.encode("No blockers") == "No blockers"
+    assert TextCodec().encode(LONG_TEXT) == LONG_TEXT
+
+
+def test_api_stores_compressed_bodies_and_reads_and_searches_them(zlib_storage, client, login_as, engine, make_user):
+    login_as(make_user("Admin"), admin=True)
+    mentor = make_user("Mentor")
+    mentee = make_user("Mentee", mentor=mentor)
+    body = {"week_number": 1, "year": 2024, "accomplishments": LONG_TEXT,
+            "blockers_concerns_comments": "None", "aspirations": "Kubernetes next " * 10}
+
+    created = client.post("/reports/", params={"mentee_id": mentee.id}, json=body).json()
+    assert created["accomplishments"] == LONG_TEXT
+    assert stored_types(engine, created["id"]) == ("blob", "text", "blob")
+    assert client.get(f"/reports/mentees/{mentee.id}/latest").json()[0]["aspirations"] == body["aspirations"]
+    summary, = client.get(f"/reports/mentors/{mentor.id}/summaries", params={"preview": True}).json()["items"]
+    assert (summary["preview"], summary["accomplishments_chars"]) == (LONG_TEXT[:120], len(LONG_TEXT))
+
+    search = lambda q: client.get(f"/reports/mentors/{mentor.id}/search", params={"q": q}).json()["items"]
+    hit, = search("kubernetes")
+    assert "<mark>Kubernetes</mark>" in hit["highlights"]["aspirations"]
+
+    client.put(f"/reports/{created['id']}", json={**body, "aspirations": "Terraform everything " * 10})
+    assert search("kubernetes") == []
+    assert len(search("terraform")) == 1
+    client.delete(f"/reports/{created['id']}")
+    assert search("terraform") == []
+
+
+def test_backfills_compress_and_restore_existing_reports(monkeypatch, client, login_as, engine, make_user, make_report):
+    mentor = login_as(make_user("Mentor"))
+    mentee = make_user("Mentee", mentor=mentor)
+    reports = [make_report(mentee, week, 2024, accomplishments=f"Week {week}: {LONG_TEXT}") for week in range(1, 6)]
+    assert stored_types(engine, reports[0].id) == ("text", "text", "text")
+
+    with pytest.raises(RuntimeError):
+        run_backfill(engine, BACKFILLS["compress_report_bodies"], pause_seconds=0)
+    monkeypatch.setattr(compression, "text_codec", TextCodec("zlib", min_bytes=100))
+    result = run_backfill(engine, BACKFILLS["compress_report_bodies"], batch_size=2, pause_seconds=0)
+
+    assert (result.rows, result.finished) == (5, True)
+    assert stored_types(engine, reports[0].id) == ("blob", "text", "text")
+    latest = client.get(f"/reports/mentees/{mentee.id}/latest").json()
+    assert [report["accomplishments"] for report in latest] == [f"Week {week}: {LONG_TEXT}" for week in (5, 4)]
+    hits = client.get(f"/reports/mentors/{mentor.id}/search", params={"q": "pipeline"}).json()["items"]
+    assert len(hits) == 5
+
+    run_backfill(engine, BACKFILLS["decompress_report_bodies"], pause_seconds=0)
+    assert stored_types(engine, reports[0].id) == ("text", "text", "text")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT accomplishments FROM weekly_reports WHERE id = :id"),
+                            {"id": reports[0].id}).scalar() == f"Week 1: {LONG_TEXT}"
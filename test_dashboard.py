@@ -0,0 +1,62 @@
+"""
+Tests for the one-request mentor dashboard
+"""
+
+from datetime import date, timedelta
+
+from app.services.dashboard_service import get_mentor_dashboard
+
+TODAY = date(2024, 1, 10)  # ISO week 2 of 2024
+
+
+def iso_weeks_back(weeks):
+    """(year, week) for each of the given number of weeks before TODAY's week"""
+    return [(TODAY - timedelta(weeks=n)).isocalendar()[:2] for n in weeks]
+
+
+def test_dashboard_streaks_latest_reports_and_missing_week(db_session, make_user, make_report):
+    mentor = make_user("Mentor")
+    steady = make_user("Alice", mentor=mentor)
+    lapsed = make_user("Bob", mentor=mentor)
+    fresh = make_user("Cara", mentor=mentor)
+    make_user("Dan", mentor=mentor, is_active=False)
+
+    # Alice: this week and the three before it (crossing into 2023 week 52), then a gap
+    for year, week in iso_weeks_back([0, 1, 2, 3, 5]):
+        make_report(steady, week, year)
+    # Bob: last week and the week before - still a live streak - but nothing this week
+    for year, week in iso_weeks_back([1, 2]):
+        make_report(lapsed, week, year)
+
+    dashboard = get_mentor_dashboard(db_session, mentor.id, reports_per_mentee=3, today=TODAY)
+    assert (dashboard.year, dashboard.week_number) == (2024, 2)
+    assert [entry.mentee.name for entry in dashboard.mentees] == ["Alice", "Bob", "Cara"]
+
+    alice, bob, cara = dashboard.mentees
+    assert [(r.year, r.week_number) for r in alice.latest_reports] == [(2024, 2), (2024, 1), (2023, 52)]
+    assert (alice.report_count, alice.streak_weeks, alice.submitted_current_week) == (5, 4, True)
+    assert (bob.report_count, bob.streak_weeks, bob.submitted_current_week) == (2, 2, False)
+    assert (cara.latest_reports, cara.streak_weeks, cara.submitted_current_week) == ([], 0, False)
+    assert dashboard.missing_current_week == 2
+
+    # Two weeks later Bob's streak has lapsed
+    later = get_mentor_dashboard(db_session, mentor.id, today=TODAY + timedelta(weeks=2))
+    assert [entry.streak_weeks for entry in later.mentees] == [0, 0, 0]
+
+
+def test_dashboard_costs_two_statements_regardless_of_mentee_count(client, login_as, sql_statements, make_user, make_report):
+    mentor = login_as(make_user("Mentor"))
+    for n in range(10):
+        mentee = make_user(f"Mentee {n}", mentor=mentor)
+        for week in range(1, 6):
+            make_report(mentee, week, 2024)
+
+    response = client.get(f"/dashboard/mentor/{mentor.id}?reports_per_mentee=2")
+
+    assert response.status_code == 200
+    assert len(response.json()["mentees"]) == 10
+    assert all(len(entry["latest_reports"]) == 2 for entry in response.json()["mentees"])
+    assert len(sql_statements) == 2
+    assert client.get("/dashboard/mentor/999").status_code == 403
+    login_as(make_user("Admin"), admin=True)
+    assert client.get("/dashboard/mentor/999").status_code == 404
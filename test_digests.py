@@ -0,0 +1,81 @@
+"""
+Tests for the weekly mentor digests: building them in a process pool, and serving them with one read
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from models import MentorDigest
+from app.services.digest_service import build_mentor_digests
+
+WEEK = (2024, 9)
+NOW = datetime(2024, 3, 4, 9)
+
+
+def seed_mentors(make_user, make_report):
+    mentors = [make_user(f"Mentor {n}", created_at=datetime(2024, 1, 1)) for n in range(3)]
+    alice = make_user("Alice", mentor=mentors[0], created_at=datetime(2024, 1, 1))
+    make_user("Bob", mentor=mentors[0], created_at=datetime(2024, 1, 1))
+    make_user("Joined later", mentor=mentors[0], created_at=datetime(2024, 3, 5))
+    for n, mentor in enumerate(mentors[1:]):
+        make_report(make_user(f"Mentee {n}", mentor=mentor, created_at=datetime(2024, 1, 1)), 9, 2024)
+    make_user("Mentor without mentees")
+    make_report(alice, 9, 2024, accomplishments="Shipped <script>alert(1)</script>\n\nAnd more",
+                submission_date=datetime(2024, 3, 5, 10))
+    return mentors, alice
+
+
+def test_digests_are_built_across_processes_once(db_session, make_user, make_report):
+    mentors, alice = seed_mentors(make_user, make_report)
+
+    result = build_mentor_digests(db_session, WEEK, workers=2, chunk_size=1, mentors_per_worker=1, now=NOW)
+    assert (result.built, result.existing, result.workers) == (3, 0, 2)
+
+    digest = db_session.get(MentorDigest, (mentors[0].id, 2024, 9))
+    assert (digest.mentees, digest.reports, digest.generated_at) == (2, 1, NOW)
+    assert digest.markdown.startswith("# Weekly reports for 2024-W09 (week of February 26, 2024)\n")
+    assert "## Alice\n\n_Submitted Tuesday, March 5 (2 days late)_" in digest.markdown
+    assert "## Bob\n\nNo report for this week." in digest.markdown and "Joined later" not in digest.markdown
+    assert "<p>Shipped &lt;script&gt;alert(1)&lt;/script&gt;</p><p>And more</p>" in digest.html
+
+    # Built once: a later run, or a report sent afterwards, leaves them as they are
+    make_report(make_user("Cara", mentor=mentors[0], created_at=datetime(2024, 1, 1)), 9, 2024)
+    again = build_mentor_digests(db_session, WEEK, workers=2, chunk_size=1)
+    assert (again.built, again.existing) == (0, 3)
+    db_session.expire_all()
+    assert db_session.get(MentorDigest, (mentors[0].id, 2024, 9)).reports == 1
+
+
+def test_digest_endpoint_serves_one_read_with_etags(client, db_session, login_as, sql_statements, make_user, make_report):
+    mentors, alice = seed_mentors(make_user, make_report)
+    login_as(mentors[0])
+    url = f"/dashboard/mentor/{mentors[0].id}/digest"
+
+    # Reads never build; a week nobody built yet is a 404 until the scheduler or CLI builds it
+    missing = client.get(url, params={"week": "2024-W09"})
+    assert missing.status_code == 404 and "hasn't been built yet" in missing.json()["detail"]
+    assert db_session.execute(select(MentorDigest.mentor_id)).scalars().all() == []
+    build_mentor_digests(db_session, WEEK, mentor_ids=[mentors[0].id], workers=1, now=NOW)
+
+    first = client.get(url, params={"week": "2024-W09", "format": "html"})
+    assert first.status_code == 200 and first.headers["content-type"].startswith("text/html")
+    assert "<h2>Alice</h2>" in first.text
+
+    sql_statements.clear()
+    markdown = client.get(url, params={"week": "2024-W09"})
+    assert markdown.text.startswith("# Weekly reports for 2024-W09")
+    assert len(sql_statements) == 1 and "mentor_digests" in sql_statements[0]
+    assert "immutable" in markdown.headers["cache-control"]
+    assert client.get(url, params={"week": "2024-W09"},
+                      headers={"If-None-Match": markdown.headers["etag"]}).status_code == 304
+
+    this_week = "{}-W{:02d}".format(*date.today().isocalendar()[:2])
+    assert client.get(url, params={"week": this_week}).status_code == 404
+    before_joining = client.get(url, params={"week": "2023-W40"})
+    assert before_joining.status_code == 404 and "before the mentor joined" in before_joining.json()["detail"]
+    before_first = client.get(url, params={"week": "2024-W05"})
+    assert before_first.status_code == 404 and "start at 2024-W09" in before_first.json()["detail"]
+    assert client.get("/dashboard/mentor/999/digest", params={"week": "2024-W09"}).status_code == 403
+    assert client.get(url, params={"week": "2024-W60"}).status_code == 400
+    assert client.get(url, params={"week": "2024-W09", "format": "pdf"}).status_code == 422
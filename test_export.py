@@ -0,0 +1,75 @@
+"""
+Tests for streaming report export
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+
+@pytest.fixture
+def reports(make_user, make_report, login_as):
+    """Three mentees' reports, with the client logged in as the mentor of two of them"""
+    mentor = login_as(make_user("Mentor"))
+    other_mentor = make_user("Other Mentor")
+    alice = make_user("Alice", mentor=mentor, team_name="Platform", office_location="Berlin")
+    bob = make_user("Bob", mentor=mentor, team_name="Mobile", office_location="Remote")
+    carol = make_user("Carol", mentor=other_mentor, team_name="Platform", office_location="Berlin")
+    for week in range(1, 4):
+        make_report(alice, week, 2024, accomplishments=f'Alice, week {week}, "quoted"')
+        make_report(bob, week, 2024)
+        make_report(carol, week, 2024)
+    return mentor
+
+
+def test_csv_export_streams_all_matching_rows(client, reports):
+    response = client.get(f"/reports/export?mentor_id={reports.id}&chunk_size=2")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 6
+    assert {row["mentee_name"] for row in rows} == {"Alice", "Bob"}
+    assert rows[0]["accomplishments"] == 'Alice, week 1, "quoted"'
+
+
+def test_export_is_limited_to_the_mentors_own_mentees(client, login_as, make_user, reports):
+    rows = list(csv.DictReader(io.StringIO(client.get("/reports/export?team_name=Platform").text)))
+    assert {row["mentee_name"] for row in rows} == {"Alice"}
+    assert client.get(f"/reports/export?mentor_id={reports.id + 1}").status_code == 403
+
+    login_as(make_user("Mentee", mentor=reports))
+    assert client.get(f"/reports/export?mentor_id={reports.id}").status_code == 403
+    del client.headers["Authorization"]
+    assert client.get("/reports/export").status_code == 401
+
+
+def test_jsonl_export_filters_by_team_and_office(client, login_as, make_user, reports):
+    login_as(make_user("Admin"), admin=True)
+    response = client.get("/reports/export?format=jsonl&team_name=Platform&office_location=Berlin")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted({row["mentee_name"] for row in rows}) == ["Alice", "Carol"]
+    assert len(rows) == 6
+
+
+def test_export_with_no_rows_and_unknown_mentor(client, login_as, make_user, reports):
+    login_as(make_user("Admin"), admin=True)
+    response = client.get("/reports/export?team_name=Nobody")
+    assert response.text.strip() == ",".join([
+        "id", "mentee_id", "mentor_id", "mentee_name", "team_name", "office_location", "week_number", "year",
+        "submission_date", "accomplishments", "blockers_concerns_comments", "aspirations"
+    ])
+    assert client.get("/reports/export?mentor_id=999").status_code == 404
+
+
+def test_parquet_export_writes_one_row_group_per_chunk(client, reports):
+    pq = pytest.importorskip("pyarrow.parquet")
+    response = client.get(f"/reports/export?format=parquet&mentor_id={reports.id}&chunk_size=4")
+    assert response.status_code == 200
+
+    parquet_file = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet_file.metadata.num_rows == 6
+    assert parquet_file.metadata.num_row_groups == 2
+    assert sorted(set(parquet_file.read().column("mentee_name").to_pylist())) == ["Alice", "Bob"]
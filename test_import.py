@@ -0,0 +1,60 @@
+"""
+Tests for bulk report import
+"""
+
+import json
+
+CSV_HEADER = "mentee_email,week_number,year,accomplishments,blockers_concerns_comments,aspirations,submission_date\n"
+
+
+def test_csv_import_inserts_in_batches_and_reports_row_errors(client, db_session, login_as, make_user, make_report):
+    mentor = login_as(make_user("Mentor"), admin=True)
+    mentee = make_user("Mentee", mentor=mentor, email="mentee@company.com")
+    make_report(mentee, 1, 2023, accomplishments="Original")
+
+    body = CSV_HEADER + "".join([
+        "mentee@company.com,1,2023,Imported,None,Grow,2023-01-06T10:00:00\n",   # already exists -> skipped
+        "mentee@company.com,2,2023,Week two,None,Grow,2023-01-13T10:00:00\n",
+        "mentee@company.com,3,2023,Week three,,Grow,\n",                        # missing blockers
+        "nobody@company.com,4,2023,Lost,None,Grow,\n",
+        "mentee@company.com,54,2023,Bad week,None,Grow,\n",
+        "mentee@company.com,2,2023,Duplicate,None,Grow,\n",
+        "mentee@company.com,5,2023,Week five,None,Grow,\n",
+        "mentee@company.com,6,2023,Week six,None,Grow,\n",
+    ])
+    response = client.post("/reports/import?batch_size=2", content=body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200
+    result = response.json()
+
+    assert (result["rows"], result["written"], result["skipped"], result["failed"]) == (8, 3, 1, 4)
+    assert result["batches"] == 2
+    assert [e["row"] for e in result["errors"]] == [4, 5, 6, 7]
+    assert "blockers_concerns_comments" in result["errors"][0]["error"]
+    assert result["errors"][1]["error"] == "Mentee not found"
+    assert result["errors"][2]["error"].startswith("week_number: ")
+    assert result["errors"][3]["error"] == "Duplicate of row 3"
+
+    page = client.get(f"/reports/mentors/{mentor.id}/query?mentee_id={mentee.id}").json()
+    assert [r["week_number"] for r in page["items"]] == [6, 5, 2, 1]
+    assert page["items"][3]["accomplishments"] == "Original"
+    assert page["items"][2]["submission_date"].startswith("2023-01-13")
+
+
+def test_jsonl_import_can_update_existing_weeks(client, login_as, make_user, make_report):
+    mentor = login_as(make_user("Mentor"), admin=True)
+    mentee = make_user("Mentee", mentor=mentor)
+    make_report(mentee, 1, 2023, accomplishments="Original")
+
+    lines = [
+        json.dumps({"mentee_id": mentee.id, "week_number": 1, "year": 2023, "accomplishments": "Updated",
+                    "blockers_concerns_comments": "None", "aspirations": "Grow"}),
+        "{not json",
+    ]
+    response = client.post("/reports/import?on_conflict=update", content="\n".join(lines),
+                           headers={"Content-Type": "application/x-ndjson"})
+    result = response.json()
+    assert (result["written"], result["failed"]) == (1, 1)
+    assert result["errors"][0]["error"].startswith("Invalid JSON")
+
+    report = client.get(f"/reports/mentees/{mentee.id}/weeks/2023/1").json()
+    assert report["accomplishments"] == "Updated"
@@ -0,0 +1,83 @@
+"""
+Tests for per-route request and SQL metrics
+"""
+
+import logging
+import re
+
+import pytest
+
+from app.config import settings
+from app.utils.metrics import parameter_shapes, registry
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def metric(text, name, **labels):
+    """Value of one sample in Prometheus text output"""
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{re.escape(name)}\{{{re.escape(label_text)}\}} (\S+)$", text, re.MULTILINE)
+    assert match, f"{name}{{{label_text}}} not found"
+    return float(match.group(1))
+
+
+def test_metrics_are_recorded_per_route_template(client, login_as, make_user, make_report):
+    login_as(make_user("Admin"), admin=True)
+    mentor = make_user("Mentor")
+    mentee = make_user("Mentee", mentor=mentor)
+    for week in (1, 2, 3):
+        make_report(mentee, week, 2024)
+
+    for _ in range(2):
+        assert client.get(f"/reports/mentors/{mentor.id}/query?limit=2").status_code == 200
+    assert client.get("/reports/mentors/999/query").status_code == 404
+    assert client.get("/no/such/page").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    route = {"method": "GET", "route": "/reports/mentors/{mentor_id}/query"}
+    assert metric(text, "http_request_duration_seconds_count", **route) == 3
+    assert metric(text, "http_request_duration_seconds_bucket", **route, le="+Inf") == 3
+    assert metric(text, "http_requests_total", **route, status="200") == 2
+    assert metric(text, "http_requests_total", **route, status="404") == 1
+    # Each successful page: mentor check + page query; the 404 stops after the mentor check
+    assert metric(text, "db_statements_total", **route) == 5
+    # 1 mentor + 3 report rows (limit 2 fetches one extra) per page
+    assert metric(text, "db_rows_total", **route) == 8
+    assert metric(text, "db_statement_duration_seconds_total", **route) > 0
+    assert metric(text, "http_requests_total", method="GET", route="<unmatched>", status="404") == 1
+
+
+def test_writes_count_affected_rows(client, login_as, make_user, make_report):
+    mentee = login_as(make_user("Mentee", mentor=make_user("Mentor")))
+    report = make_report(mentee, 1, 2024)
+    assert client.delete(f"/reports/{report.id}").status_code == 200
+
+    text = client.get("/metrics").text
+    route = {"method": "DELETE", "route": "/reports/{report_id}"}
+    assert metric(text, "db_statements_total", **route) == 1
+    # DELETE ... RETURNING hands back the one deleted row
+    assert metric(text, "db_rows_total", **route) == 1
+
+
+def test_slow_queries_are_logged_with_parameter_shapes_not_values(client, login_as, make_user, monkeypatch, caplog):
+    mentor = login_as(make_user("Mentor", email="secret@company.com"))
+    monkeypatch.setattr(settings, "slow_query_ms", 0)
+
+    with caplog.at_level(logging.WARNING, logger="app.sql.slow"):
+        client.get(f"/users/{mentor.id}")
+
+    assert any("Slow query" in record.message and "FROM users" in record.message for record in caplog.records)
+    assert not any("secret@company.com" in record.message for record in caplog.records)
+
+    assert parameter_shapes((1, "abc", None)) == "(int, str[3], NoneType)"
+    assert parameter_shapes({"email": "a@b.co"}) == "{email: str[6]}"
+    assert parameter_shapes([(1, "x"), (2, "y")], executemany=True) == "2 x (int, str[1])"
@@ -0,0 +1,147 @@
+"""
+Tests for the migrations, the startup schema check and batched backfills
+"""
+
+from datetime import date
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from models import Base, User, WeeklyReport, create_db_engine
+from app.services.analytics_service import check_submission_rollups
+from app.utils import compression
+from app.utils.backfill import BACKFILLS, run_backfill
+from app.utils.compression import TextCodec
+from app.utils.migrations import SchemaVersionError, alembic_config, check_schema_version, head_revision, upgrade_database
+
+
+@pytest.fixture
+def database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    db_engine = create_db_engine(url)
+    yield url, db_engine
+    db_engine.dispose()
+
+
+def seed_legacy_reports(db_engine, weeks):
+    """A mentor, a mentee and their reports, written the way the app did before iso_week_start existed"""
+    with db_engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (id, name, email, password_hash, user_type, mentor_id, team_name, current_position, "
+            "office_location, is_active) VALUES "
+            "(1, 'Mentor', 'mentor@company.com', 'x', 'mentor', NULL, 'Eng', 'Lead', 'NYC', 1), "
+            "(2, 'Mentee', 'mentee@company.com', 'x', 'mentee', 1, 'Eng', 'Engineer', 'NYC', 1)"
+        ))
+        conn.execute(
+            text("INSERT INTO weekly_reports (mentee_id, mentor_id, week_number, year, accomplishments, "
+                 "blockers_concerns_comments, aspirations) VALUES (2, 1, :week, :year, 'Shipped the importer', '', '')"),
+            [{"week": week, "year": year} for year, week in weeks]
+        )
+
+
+def test_migrations_build_the_schema_the_models_describe(database):
+    url, db_engine = database
+    with pytest.raises(SchemaVersionError):
+        check_schema_version(db_engine)
+
+    upgrade_database(url)
+
+    assert check_schema_version(db_engine) == head_revision()
+    with db_engine.connect() as conn:
+        diff = compare_metadata(
+            MigrationContext.configure(conn, opts={"include_object": lambda obj, name, type_, *args: not (
+                type_ == "table" and name.startswith("weekly_reports_fts"))}),
+            Base.metadata
+        )
+    assert diff == []
+
+
+def test_pre_migration_database_is_adopted_and_backfilled_in_batches(database):
+    url, db_engine = database
+    # What create_all used to leave behind: the original tables, no version table, no search index
+    upgrade_database(url, "0001")
+    with db_engine.begin() as conn:
+        conn.execute(text("DROP TABLE alembic_version"))
+        for name in ("insert", "delete", "update"):
+            conn.execute(text(f"DROP TRIGGER weekly_reports_fts_{name}"))
+        conn.execute(text("DROP TABLE weekly_reports_fts"))
+        conn.execute(text("DROP VIEW weekly_reports_fts_content"))
+    seed_legacy_reports(db_engine, [(2024, week) for week in range(1, 24)])
+
+    progress = []
+    upgrade_database(url, backfill_batch_size=10, backfill_pause_seconds=0, backfill_progress=lambda result: progress.append(result.rows))
+
+    assert progress == [10, 20, 23]
+    with db_engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM weekly_reports WHERE iso_week_start IS NULL")).scalar() == 0
+        assert conn.execute(text("SELECT iso_week_start FROM weekly_reports WHERE week_number = 1")).scalar() == "2024-01-01"
+        # Reports written before search existed were indexed
+        assert conn.execute(text("SELECT count(*) FROM weekly_reports_fts WHERE weekly_reports_fts MATCH 'importer'")).scalar() == 23
+    assert check_schema_version(db_engine) == head_revision()
+
+
+def test_deferred_backfill_resumes_where_it_stopped(database):
+    url, db_engine = database
+    upgrade_database(url, "0001")
+    # Week 53 of 2023 doesn't exist: it stays NULL without stalling the backfill
+    seed_legacy_reports(db_engine, [(2023, 53)] + [(2024, week) for week in range(1, 10)])
+    upgrade_database(url, defer_backfills=True)
+
+    first = run_backfill(db_engine, BACKFILLS["iso_week_start"], batch_size=4, pause_seconds=0, max_batches=1)
+    assert (first.rows, first.finished) == (4, False)
+
+    rest = run_backfill(db_engine, BACKFILLS["iso_week_start"], batch_size=4, pause_seconds=0)
+    assert rest.finished
+    with db_engine.connect() as conn:
+        missing = conn.execute(text("SELECT year, week_number FROM weekly_reports WHERE iso_week_start IS NULL")).all()
+    assert missing == [(2023, 53)]
+
+
+def test_rollups_are_built_from_existing_reports(database):
+    url, db_engine = database
+    upgrade_database(url, "0003")
+    seed_legacy_reports(db_engine, [(2023, 52)] + [(2024, week) for week in range(1, 16)])
+    run_backfill(db_engine, BACKFILLS["iso_week_start"], pause_seconds=0)
+
+    upgrade_database(url)
+
+    with db_engine.connect() as conn:
+        assert conn.execute(text("SELECT quarter, reports FROM submission_rollups ORDER BY year, quarter")).all() == [
+            (4, 1), (1, 13), (2, 2)]
+        assert conn.execute(text("SELECT reports, longest_streak FROM mentee_submission_stats")).one() == (16, 16)
+    with Session(db_engine) as db:
+        assert check_submission_rollups(db) == []
+
+
+def test_reports_written_by_the_app_carry_iso_week_start(make_user, make_report, db_session):
+    mentee = make_user("Mentee", mentor=make_user("Mentor"))
+    report = make_report(mentee, 1, 2025)
+    db_session.refresh(report)
+    assert report.iso_week_start == date(2024, 12, 30)
+
+
+def test_downgrade_past_compression_restores_plain_text(monkeypatch, database):
+    url, db_engine = database
+    upgrade_database(url)
+    monkeypatch.setattr(compression, "text_codec", TextCodec("zlib", min_bytes=10))
+    with Session(db_engine) as db:
+        db.add_all([
+            User(id=1, name="Mentor", email="mentor@company.com", password_hash="x", user_type="mentor",
+                 team_name="Eng", current_position="Lead", office_location="NYC"),
+            User(id=2, name="Mentee", email="mentee@company.com", password_hash="x", user_type="mentee", mentor_id=1,
+                 team_name="Eng", current_position="Engineer", office_location="NYC"),
+            WeeklyReport(mentee_id=2, mentor_id=1, week_number=1, year=2024, aspirations="More",
+                         accomplishments="Shipped the importer and the exporter", blockers_concerns_comments="None"),
+        ])
+        db.commit()
+
+    command.downgrade(alembic_config(url, configure_logging=False, backfill_pause_seconds=0), "0002")
+
+    with db_engine.connect() as conn:
+        assert conn.execute(text("SELECT accomplishments, typeof(accomplishments) FROM weekly_reports")).one() == (
+            "Shipped the importer and the exporter", "text")
+        assert conn.execute(text("SELECT count(*) FROM weekly_reports_fts WHERE weekly_reports_fts MATCH 'exporter'")).scalar() == 1
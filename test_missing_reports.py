@@ -0,0 +1,62 @@
+"""
+Tests for org-wide missing-report detection
+"""
+
+from datetime import datetime
+
+from app.services.missing_reports_service import find_missing_reports
+
+
+def seed_org(make_user, make_report):
+    engineering = make_user("Erin", team_name="Engineering")
+    design = make_user("Dora", team_name="Design")
+    alice = make_user("Alice", mentor=engineering, created_at=datetime(2024, 1, 1))
+    # Bob signed up on the Wednesday of week 2: nothing is owed for week 1
+    make_user("Bob", mentor=engineering, created_at=datetime(2024, 1, 10))
+    make_user("Dan", mentor=engineering, created_at=datetime(2023, 1, 1), is_active=False)
+    cara = make_user("Cara", mentor=design, created_at=datetime(2024, 6, 1), team_name="Design")
+
+    for week in (1, 2, 4):
+        make_report(alice, week, 2024)
+    # Cara's first report predates her account, so she owes every week from then on
+    make_report(cara, 52, 2023)
+    for week in (1, 2, 3, 4):
+        make_report(cara, week, 2024)
+    return engineering, design
+
+
+def test_missing_reports_across_mentors_grouped_by_mentor_and_team(db_session, make_user, make_report):
+    engineering, design = seed_org(make_user, make_report)
+
+    result = find_missing_reports(db_session, (2024, 1), week_to=(2024, 4))
+
+    assert (result.weeks, result.mentees, result.expected_reports, result.missing_reports) == (4, 3, 11, 4)
+    mentor, = result.mentors
+    assert (mentor.mentor_id, mentor.mentor_name, mentor.team_name, mentor.missing_reports) == (
+        engineering.id, "Erin", "Engineering", 4)
+    assert [(m.mentee_name, [(w.year, w.week_number) for w in m.missing_weeks]) for m in mentor.mentees] == [
+        ("Alice", [(2024, 3)]), ("Bob", [(2024, 2), (2024, 3), (2024, 4)])]
+    assert [(t.team_name, t.mentees, t.expected_reports, t.missing_reports, t.mentees_missing) for t in result.teams] == [
+        ("Design", 1, 4, 0, 0), ("Engineering", 2, 7, 4, 2)]
+
+    # Across the year boundary, and scoped to one mentor or team
+    boundary = find_missing_reports(db_session, (2023, 51), week_to=(2024, 2), mentor_id=design.id)
+    assert (boundary.weeks, boundary.expected_reports, boundary.missing_reports) == (4, 3, 0)
+    assert find_missing_reports(db_session, (2024, 1), team_name="Design").missing_reports == 0
+
+
+def test_missing_reports_endpoint_is_two_statements_and_validates_weeks(client, login_as, sql_statements, make_user, make_report):
+    seed_org(make_user, make_report)
+    login_as(make_user("Admin"), admin=True)
+    for n in range(20):
+        make_user(f"Mentee {n}", mentor=make_user(f"Mentor {n}"), created_at=datetime(2024, 1, 1))
+    sql_statements.clear()
+
+    response = client.get("/analytics/missing-reports", params={"week_from": "2024-W01", "week_to": "2024-W04"})
+
+    assert response.status_code == 200
+    assert (response.json()["missing_reports"], len(response.json()["mentors"])) == (84, 21)
+    assert len(sql_statements) == 2
+    for params in ({"week_from": "2024-01"}, {"week_from": "2024-W53"},
+                   {"week_from": "2024-W04", "week_to": "2024-W01"}, {"week_from": "2020-W01", "week_to": "2026-W01"}):
+        assert client.get("/analytics/missing-reports", params=params).status_code == 400
@@ -3,7 +3,8 @@
 Test script for models.py - Creates example tables and demonstrates model functionality
 """
 
-from models import User, WeeklyReport, create_tables, SessionLocal, engine
+from models import User, WeeklyReport, SessionLocal, engine
+from app.utils.migrations import upgrade_database
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
 import os
@@ -15,7 +16,7 @@ def reset_database():
         os.remove(db_file)
         print(f"Removed existing database: {db_file}")
     
-    create_tables()
+    upgrade_database()
     print("Created fresh database tables")
 
 def create_sample_users(db: Session):
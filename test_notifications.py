@@ -0,0 +1,137 @@
+"""
+Tests for the notification jobs: batched delivery, idempotent reruns, retries and the scheduler
+"""
+
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from models import NotificationDelivery, NotificationJobRun
+from app.config import Settings
+from app.services.notification_service import (
+    JOBS,
+    RETRY_SECONDS,
+    build_scheduler,
+    due_week,
+    run_notification_job
+)
+from app.utils.notifications import FileTransport, NotificationTransport, RateLimiter
+
+WEEK = (2024, 9)
+NOW = datetime(2024, 3, 4, 10)  # Monday of week 10, after the default notification hour
+CONFIG = Settings(notification_batch_size=2, notification_rate_per_second=0)
+
+
+class FlakyTransport(NotificationTransport):
+    """Records what it delivers; recipients in failing get an error instead"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.batches = []
+
+    def send_batch(self, messages, limiter):
+        self.batches.append([message.recipient_id for message in messages])
+        return [("Mailbox unavailable" if message.recipient_id in self.failing else None) for message in messages]
+
+
+def seed_org(make_user, make_report):
+    mentor = make_user("Mentor", created_at=datetime(2024, 1, 1))
+    mentees = [make_user(f"Mentee {n}", mentor=mentor, created_at=datetime(2024, 1, 1)) for n in range(5)]
+    make_user("Late joiner", mentor=mentor, created_at=datetime(2024, 3, 4))
+    make_report(mentees[0], 9, 2024, accomplishments="Shipped the\n  billing export", blockers_concerns_comments="None")
+    return mentor, mentees
+
+
+def test_reminders_go_out_in_batches_once_per_week(engine, make_user, make_report, tmp_path):
+    mentor, mentees = seed_org(make_user, make_report)
+    session_factory = sessionmaker(bind=engine)
+    transport = FileTransport(str(tmp_path / "outbox.jsonl"))
+
+    result = run_notification_job(JOBS["missing_report_reminders"], WEEK, transport, RateLimiter(0),
+                                  session_factory=session_factory, config=CONFIG, now=NOW)
+
+    assert (result.period, result.claimed, result.finished, result.recipients, result.sent) == ("2024-W09", True, True, 4, 4)
+    sent = [json.loads(line) for line in (tmp_path / "outbox.jsonl").read_text().splitlines()]
+    assert sorted(message["recipient_id"] for message in sent) == [mentee.id for mentee in mentees[1:]]
+    assert sent[0]["subject"] == "Your weekly report for 2024-W09 is missing"
+    assert "week of February 26" in sent[0]["body"]
+
+    # Finished runs are skipped, even by another process after a restart
+    again = run_notification_job(JOBS["missing_report_reminders"], WEEK, transport, RateLimiter(0),
+                                 session_factory=session_factory, config=CONFIG, worker="other:1", now=NOW)
+    assert not again.claimed
+    assert len((tmp_path / "outbox.jsonl").read_text().splitlines()) == 4
+
+
+def test_failures_are_retried_and_stopped_runs_resume(engine, db_session, make_user, make_report):
+    seed_org(make_user, make_report)
+    session_factory = sessionmaker(bind=engine)
+    job = JOBS["missing_report_reminders"]
+    stop = threading.Event()
+
+    class StoppingTransport(FlakyTransport):
+        def send_batch(self, messages, limiter):
+            stop.set()  # shutdown arrives while the first batch is being sent
+            return super().send_batch(messages, limiter)
+
+    first = StoppingTransport(failing=[4])
+    result = run_notification_job(job, WEEK, first, RateLimiter(0), session_factory=session_factory,
+                                  config=CONFIG, stop=stop, now=NOW)
+    assert (first.batches, result.finished, result.sent, result.failed) == ([[3, 4]], False, 1, 1)
+
+    # A stopped run is free to resume at once, from anywhere; only the failure remains open afterwards
+    second = FlakyTransport(failing=[4])
+    result = run_notification_job(job, WEEK, second, RateLimiter(0), session_factory=session_factory,
+                                  config=CONFIG, worker="other:1", now=NOW)
+    assert (second.batches, result.finished, result.total_sent) == ([[4, 5], [6]], False, 3)
+    assert not run_notification_job(job, WEEK, second, RateLimiter(0), session_factory=session_factory,
+                                    config=CONFIG, now=NOW + timedelta(minutes=1)).claimed
+
+    third = FlakyTransport()
+    result = run_notification_job(job, WEEK, third, RateLimiter(0), session_factory=session_factory,
+                                  config=CONFIG, now=NOW + timedelta(seconds=RETRY_SECONDS + 1))
+    assert (third.batches, result.finished, result.total_sent) == ([[4]], True, 4)
+
+    deliveries = db_session.execute(select(NotificationDelivery.recipient_id, NotificationDelivery.attempts)
+                                    .order_by(NotificationDelivery.recipient_id)).all()
+    assert deliveries == [(3, 1), (4, 3), (5, 1), (6, 1)]
+    run = db_session.get(NotificationJobRun, ("missing_report_reminders", "2024-W09"))
+    assert (run.recipients, run.sent, run.failed, run.finished_at is not None) == (4, 4, 0, True)
+
+
+def test_digest_summarises_each_mentees_week(engine, make_user, make_report):
+    mentor, mentees = seed_org(make_user, make_report)
+    other = make_user("Other mentor")
+    make_user("Other mentee", mentor=other, created_at=datetime(2024, 1, 1))
+    make_user("Mentor without mentees")
+    transport = FlakyTransport()
+    messages = []
+    transport.send_batch = lambda batch, limiter: messages.extend(batch) or [None] * len(batch)
+
+    result = run_notification_job(JOBS["mentor_digests"], WEEK, transport, RateLimiter(0),
+                                  session_factory=sessionmaker(bind=engine), config=CONFIG, now=NOW)
+
+    assert (result.recipients, result.sent) == (2, 2)
+    digest = next(message for message in messages if message.recipient_id == mentor.id)
+    assert digest.subject == "Weekly reports for 2024-W09: 1 of 5 submitted"
+    assert "Mentee 0\n  Accomplishments: Shipped the billing export" in digest.body
+    assert "Mentee 1: no report" in digest.body and "Late joiner" not in digest.body
+
+
+def test_scheduler_sends_the_due_week_from_monday_morning(engine, make_user, make_report, tmp_path):
+    seed_org(make_user, make_report)
+    assert due_week(datetime(2024, 3, 4, 8), 9) == (2024, 8)
+    assert due_week(NOW, 9) == WEEK
+    transport = FlakyTransport()
+    scheduler = build_scheduler(sessionmaker(bind=engine), CONFIG, transport)
+
+    async def tick_twice():
+        await asyncio.gather(*scheduler.tick(NOW))
+        await asyncio.gather(*scheduler.tick(NOW))
+
+    asyncio.run(tick_twice())
+    assert sorted(len(batch) for batch in transport.batches) == [1, 2, 2]  # 4 reminders, 1 digest
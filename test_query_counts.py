@@ -0,0 +1,86 @@
+"""
+Query-count regression tests - how many SQL statements each report endpoint sends
+"""
+
+import pytest
+
+REPORT = {
+    "week_number": 10,
+    "year": 2024,
+    "accomplishments": "Shipped",
+    "blockers_concerns_comments": "None",
+    "aspirations": "More"
+}
+
+
+@pytest.fixture
+def mentee(make_user):
+    return make_user("Mentee", mentor=make_user("Mentor"))
+
+
+def test_create_report_is_one_statement(client, login_as, sql_statements, make_user, mentee):
+    login_as(mentee)
+    created = client.post(f"/reports/?mentee_id={mentee.id}", json=REPORT)
+    assert created.status_code == 200
+    assert created.json()["mentee_name"] == "Mentee"
+    assert len(sql_statements) == 1
+
+    sql_statements.clear()
+    duplicate = client.post(f"/reports/?mentee_id={mentee.id}", json=REPORT)
+    assert duplicate.status_code == 400
+    assert duplicate.json()["detail"] == "Report already exists for week 10, 2024"
+    assert len(sql_statements) == 1
+
+    assert client.post(f"/reports/?mentee_id={mentee.mentor_id}", json=REPORT).status_code == 403
+    login_as(make_user("Admin"), admin=True)
+    sql_statements.clear()
+    assert client.post(f"/reports/?mentee_id={mentee.mentor_id}", json=REPORT).status_code == 404
+    assert len(sql_statements) == 1
+
+
+def test_update_and_delete_are_one_statement_each(client, login_as, sql_statements, make_user, mentee, make_report):
+    report = make_report(mentee, 10, 2024)
+    make_report(mentee, 11, 2024)
+    login_as(mentee)
+
+    updated = client.put(f"/reports/{report.id}", json={**REPORT, "week_number": 12, "accomplishments": "Edited"})
+    assert updated.status_code == 200
+    assert (updated.json()["week_number"], updated.json()["mentee_name"]) == (12, "Mentee")
+    assert len(sql_statements) == 1
+
+    sql_statements.clear()
+    collision = client.put(f"/reports/{report.id}", json={**REPORT, "week_number": 11})
+    assert collision.status_code == 400
+    assert len(sql_statements) == 1
+
+    sql_statements.clear()
+    assert client.put("/reports/999", json=REPORT).status_code == 404
+    # Someone else's report is checked in the same statement
+    login_as(make_user("Other mentee", mentor=make_user("Other mentor")))
+    assert client.delete(f"/reports/{report.id}").status_code == 404
+    login_as(mentee)
+    assert client.delete(f"/reports/{report.id}").status_code == 200
+    assert client.delete(f"/reports/{report.id}").status_code == 404
+    assert len(sql_statements) == 4
+
+
+def test_reads_are_one_statement(client, login_as, sql_statements, make_user, mentee, make_report):
+    for week in (1, 2, 3):
+        make_report(mentee, week, 2024)
+    login_as(mentee)
+
+    latest = client.get(f"/reports/mentees/{mentee.id}/latest").json()
+    assert [(r["week_number"], r["mentee_name"]) for r in latest] == [(3, "Mentee"), (2, "Mentee")]
+    assert len(sql_statements) == 1
+
+    # Served from the cache
+    sql_statements.clear()
+    client.get(f"/reports/mentees/{mentee.id}/latest")
+    assert sql_statements == []
+
+    assert client.get(f"/reports/mentees/{mentee.id}/weeks/2024/2").status_code == 200
+    assert client.get(f"/reports/mentees/{mentee.mentor_id}/latest").status_code == 403
+    login_as(make_user("Admin"), admin=True)
+    assert client.get(f"/reports/mentees/{mentee.mentor_id}/latest").json() == []
+    assert client.get("/reports/mentees/999/latest").status_code == 404
+    assert len(sql_statements) == 3
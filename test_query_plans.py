@@ -0,0 +1,131 @@
+"""
+EXPLAIN QUERY PLAN checks - every query the services send must use an index, never scan a whole table
+"""
+
+import re
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, insert, text
+
+from models import Base, User, WeeklyReport
+from app.schemas.reports import WeeklyReportCreate
+from app.services.analytics_service import get_mentor_submission_analytics
+from app.services.dashboard_service import get_mentor_dashboard
+from app.services.export_service import export_statement
+from app.services.report_service import (
+    create_weekly_report,
+    delete_weekly_report,
+    get_latest_reports_for_mentee,
+    get_report_for_mentee_week,
+    get_reports_by_ids,
+    get_reports_for_mentor,
+    query_report_summaries_for_mentor,
+    query_reports_for_mentor,
+    update_weekly_report,
+)
+from app.services.search_service import search_reports_for_mentor
+from app.services.user_service import get_mentees_for_mentor, get_user_by_email, get_user_profile
+
+MENTORS = 10
+MENTEES_PER_MENTOR = 20
+WEEKS = 30
+
+TABLES = set(Base.metadata.tables)
+# "SCAN weekly_reports" or "SCAN users AS u" without "USING ... INDEX" reads every row of the table
+_FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+@pytest.fixture
+def seeded(engine, db_session):
+    """A few thousand reports, with statistics gathered so the planner sees a realistic table"""
+    db_session.execute(insert(User), [
+        {"id": m, "name": f"Mentor {m}", "email": f"mentor{m}@company.com", "password_hash": "x",
+         "user_type": "mentor", "team_name": "Engineering", "current_position": "Manager", "office_location": "New York"}
+        for m in range(1, MENTORS + 1)
+    ])
+    mentees = [
+        {"id": MENTORS + n + 1, "name": f"Mentee {n}", "email": f"mentee{n}@company.com", "password_hash": "x",
+         "user_type": "mentee", "mentor_id": n % MENTORS + 1, "is_active": n % 7 != 0,
+         "team_name": "Engineering", "current_position": "Engineer", "office_location": "New York"}
+        for n in range(MENTORS * MENTEES_PER_MENTOR)
+    ]
+    db_session.execute(insert(User), mentees)
+    start = datetime(2024, 1, 1)
+    db_session.execute(insert(WeeklyReport), [
+        {"mentee_id": mentee["id"], "mentor_id": mentee["mentor_id"], "week_number": week, "year": 2024,
+         "submission_date": start + timedelta(weeks=week - 1, hours=mentee["id"]),
+         "accomplishments": f"Shipped the deploy pipeline, step {week}",
+         "blockers_concerns_comments": "None", "aspirations": "Lead a project"}
+        for mentee in mentees
+        for week in range(1, WEEKS + 1)
+    ])
+    db_session.commit()
+    db_session.execute(text("ANALYZE"))
+    db_session.commit()
+    return {"mentor_id": 1, "mentee_id": MENTORS + 1, "email": "mentee0@company.com"}
+
+
+@pytest.fixture
+def captured(engine):
+    """(statement, parameters) of every statement that reads rows, run while the test does"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and re.match(r"\s*(SELECT|UPDATE|DELETE|WITH|INSERT\b.*\bSELECT\b)", statement, re.S):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def full_scans(engine, statements):
+    """Plan lines that scan a whole table, with the statement they came from"""
+    problems = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+                match = _FULL_SCAN.match(row[-1])
+                if match and match.group(1) in TABLES:
+                    problems.append(f"{row[-1]}\n    in: {' '.join(statement.split())}")
+    return problems
+
+
+def test_service_reads_use_indexes(engine, db_session, seeded, captured):
+    mentor_id, mentee_id = seeded["mentor_id"], seeded["mentee_id"]
+
+    get_user_by_email(db_session, seeded["email"])
+    get_user_profile(db_session, mentee_id)
+    get_mentees_for_mentor(db_session, mentor_id)
+    get_latest_reports_for_mentee(db_session, mentee_id)
+    get_report_for_mentee_week(db_session, mentee_id, 2024, 3)
+    get_reports_for_mentor(db_session, mentor_id)
+    page = query_reports_for_mentor(db_session, mentor_id, limit=5)
+    query_reports_for_mentor(db_session, mentor_id, limit=5, cursor=page.next_cursor)
+    query_reports_for_mentor(db_session, mentor_id, mentee_id=mentee_id)
+    query_reports_for_mentor(db_session, mentor_id, year=2024, week_number=4)
+    query_reports_for_mentor(db_session, mentor_id, date_from=date(2024, 2, 1), date_to=date(2024, 2, 29))
+    summaries = query_report_summaries_for_mentor(db_session, mentor_id, preview=True, mentee_id=mentee_id, limit=5)
+    get_reports_by_ids(db_session, [summary.id for summary in summaries.items])
+    get_mentor_dashboard(db_session, mentor_id, today=date(2024, 7, 1))
+    get_mentor_submission_analytics(db_session, mentor_id, year=2024, today=date(2024, 7, 1))
+    search_reports_for_mentor(db_session, mentor_id, "deploy pipeline")
+
+    export = export_statement(mentor_id=mentor_id, date_from=date(2024, 2, 1)).compile(engine)
+    captured.append((str(export), tuple(export.params[name] for name in export.positiontup)))
+
+    assert len(captured) >= 18
+    assert full_scans(engine, captured) == []
+
+
+def test_service_writes_use_indexes(engine, db_session, seeded, captured):
+    report_data = WeeklyReportCreate(
+        week_number=WEEKS + 1, year=2024, accomplishments="More", blockers_concerns_comments="None", aspirations="More"
+    )
+    report = create_weekly_report(db_session, seeded["mentee_id"], report_data)
+    update_weekly_report(db_session, report.id, report_data.model_copy(update={"accomplishments": "Even more"}))
+    delete_weekly_report(db_session, report.id)
+
+    assert len(captured) >= 3
+    assert full_scans(engine, captured) == []
@@ -0,0 +1,128 @@
+"""
+Tests for the filtered, keyset-paginated mentor report query endpoint
+"""
+
+from datetime import datetime
+
+from app.utils.helpers import encode_cursor
+
+
+def test_query_pages_through_all_reports_newest_week_first(client, login_as, make_user, make_report):
+    mentor = login_as(make_user("Mentor"))
+    mentee = make_user("Mentee", mentor=mentor)
+    for year in (2023, 2024):
+        for week in range(1, 6):
+            make_report(mentee, week, year)
+
+    seen = []
+    cursor = None
+    while True:
+        url = f"/reports/mentors/{mentor.id}/query?limit=3"
+        if cursor:
+            url += f"&cursor={cursor}"
+        response = client.get(url)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 3
+        seen.extend((r["year"], r["week_number"]) for r in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == [(year, week) for year in (2024, 2023) for week in range(5, 0, -1)]
+
+
+def test_query_filters_in_sql(client, login_as, make_user, make_report):
+    mentor = login_as(make_user("Mentor"))
+    other_mentor = make_user("Other Mentor")
+    alice = make_user("Alice", mentor=mentor)
+    bob = make_user("Bob", mentor=mentor)
+    carol = make_user("Carol", mentor=other_mentor)
+    make_report(alice, 10, 2024, submission_date=datetime(2024, 3, 8))
+    make_report(alice, 11, 2024, submission_date=datetime(2024, 3, 15))
+    make_report(alice, 10, 2023)
+    make_report(bob, 10, 2024)
+    make_report(carol, 10, 2024)
+
+    response = client.get(f"/reports/mentors/{mentor.id}/query?mentee_id={alice.id}&week_number=10")
+    assert [(r["mentee_name"], r["year"]) for r in response.json()["items"]] == [("Alice", 2024), ("Alice", 2023)]
+
+    response = client.get(f"/reports/mentors/{mentor.id}/query?year=2024&week_number=10")
+    assert sorted(r["mentee_name"] for r in response.json()["items"]) == ["Alice", "Bob"]
+
+    response = client.get(f"/reports/mentors/{mentor.id}/query?date_from=2024-03-09&date_to=2024-03-15")
+    assert [r["week_number"] for r in response.json()["items"]] == [11]
+
+
+def test_query_rejects_bad_cursor_and_unknown_mentor(client, login_as, make_user):
+    mentor = login_as(make_user("Mentor"))
+
+    assert client.get(f"/reports/mentors/{mentor.id}/query?cursor=not-a-cursor").status_code == 400
+    huge = encode_cursor(99999999999999999999, 1, 1)
+    assert client.get(f"/reports/mentors/{mentor.id}/query", params={"cursor": huge}).status_code == 400
+    for view in ("query", "summaries"):
+        assert client.get(f"/reports/mentors/{mentor.id}/{view}", params={"year": 10**20}).status_code == 422
+    assert client.get("/reports/mentors/999/query").status_code == 403
+    login_as(make_user("Admin"), admin=True)
+    assert client.get("/reports/mentors/999/query").status_code == 404
+
+
+def test_week_lookup_returns_single_report_with_etag(client, login_as, make_user, make_report):
+    mentor = login_as(make_user("Mentor"))
+    mentee = make_user("Mentee", mentor=mentor)
+    sibling = make_user("Sibling", mentor=mentor)
+    report = make_report(mentee, 12, 2024)
+    make_report(sibling, 12, 2024)
+
+    response = client.get(f"/reports/mentees/{mentee.id}/weeks/2024/12")
+    assert response.status_code == 200
+    assert client.get(f"/reports/mentees/{mentee.id}/weeks/99999999999999999999/12").status_code == 422
+    assert response.json()["id"] == report.id
+    assert response.json()["mentee_name"] == "Mentee"
+    etag = response.headers["etag"]
+
+    cached = client.get(f"/reports/mentees/{mentee.id}/weeks/2024/12", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    stale = client.get(f"/reports/mentees/{mentee.id}/weeks/2024/12", headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+
+    assert client.get(f"/reports/mentees/{mentee.id}/weeks/2024/13").status_code == 404
+
+
+def test_summaries_page_like_the_query_without_report_text(client, login_as, sql_statements, make_user, make_report):
+    mentor = login_as(make_user("Mentor"))
+    mentee = make_user("Mentee", mentor=mentor)
+    for week in range(1, 6):
+        make_report(mentee, week, 2024, accomplishments=f"Week {week} " + "x" * 200, aspirations="Keep going")
+
+    sql_statements.clear()
+    page = client.get(f"/reports/mentors/{mentor.id}/summaries", params={"limit": 3}).json()
+    assert [(r["week_number"], r["mentee_name"]) for r in page["items"]] == [(5, "Mentee"), (4, "Mentee"), (3, "Mentee")]
+    assert "accomplishments" not in page["items"][0] and page["items"][0]["preview"] is None
+    # Only the header columns are read
+    assert not any("weekly_reports.accomplishments" in statement for statement in sql_statements)
+
+    rest = client.get(f"/reports/mentors/{mentor.id}/summaries",
+                      params={"cursor": page["next_cursor"], "preview": True}).json()
+    assert [r["week_number"] for r in rest["items"]] == [2, 1] and rest["next_cursor"] is None
+    assert rest["items"][0]["preview"] == ("Week 2 " + "x" * 200)[:120]
+    assert (rest["items"][0]["accomplishments_chars"], rest["items"][0]["aspirations_chars"]) == (207, 10)
+
+
+def test_report_text_is_fetched_one_by_one_or_in_batch(client, login_as, make_user, make_report):
+    mentee = login_as(make_user("Mentee", mentor=make_user("Mentor")))
+    first, second = make_report(mentee, 1, 2024), make_report(mentee, 2, 2024)
+    # Reports of other mentees look like missing ones
+    others = make_report(make_user("Other", mentor=make_user("Other mentor")), 1, 2024)
+
+    report = client.get(f"/reports/{first.id}").json()
+    assert (report["accomplishments"], report["mentee_name"]) == ("Work done in week 1", "Mentee")
+    assert client.get("/reports/999").status_code == 404
+
+    assert client.get(f"/reports/{others.id}").status_code == 404
+
+    batch = client.get("/reports/batch", params={"ids": [second.id, 999, others.id, first.id]}).json()
+    assert [r["id"] for r in batch] == [second.id, first.id]
+    assert client.get("/reports/batch").status_code == 422
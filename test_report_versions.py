@@ -0,0 +1,95 @@
+"""
+Tests for report writes: validation, optimistic locking with versions and If-Match, and PATCH
+"""
+
+from datetime import date
+
+import pytest
+
+from models import WeeklyReport
+
+REPORT = {
+    "week_number": 10,
+    "year": 2024,
+    "accomplishments": "Shipped",
+    "blockers_concerns_comments": "None",
+    "aspirations": "More"
+}
+
+
+@pytest.fixture
+def mentee(make_user, login_as):
+    """A mentee, who the client sends requests as"""
+    return login_as(make_user("Mentee", mentor=make_user("Mentor")))
+
+
+def test_writes_reject_weeks_that_dont_exist(client, mentee, make_report):
+    report = make_report(mentee, 10, 2024)
+    # 2024 has 52 ISO weeks, 2020 has 53
+    for week_number, year in ((99, 2024), (0, 2024), (53, 2024), (10, 10000)):
+        bad = {**REPORT, "week_number": week_number, "year": year}
+        assert client.post("/reports/", params={"mentee_id": mentee.id}, json=bad).status_code == 422
+        assert client.put(f"/reports/{report.id}", json=bad).status_code == 422
+    created = client.post("/reports/", params={"mentee_id": mentee.id}, json={**REPORT, "week_number": 53, "year": 2020})
+    assert created.status_code == 200
+
+
+def test_if_match_stops_lost_updates(client, sql_statements, mentee, make_report):
+    report = make_report(mentee, 10, 2024)
+    read = client.get(f"/reports/{report.id}")
+    assert (read.json()["version"], read.headers["etag"]) == (1, f'"{report.id}.1"')
+
+    # The first of two editors who read version 1 wins, in one statement
+    sql_statements.clear()
+    first = client.put(f"/reports/{report.id}", json={**REPORT, "accomplishments": "First"},
+                       headers={"If-Match": read.headers["etag"]})
+    assert first.status_code == 200 and len(sql_statements) == 1
+    assert (first.json()["version"], first.headers["etag"]) == (2, f'"{report.id}.2"')
+
+    second = client.put(f"/reports/{report.id}", json={**REPORT, "accomplishments": "Second"},
+                        headers={"If-Match": read.headers["etag"]})
+    assert second.status_code == 412 and "version 2" in second.json()["detail"]
+    assert client.get(f"/reports/{report.id}").json()["accomplishments"] == "First"
+
+    # The ETag of a write response is good for the next write; weak or other reports' ETags never match
+    assert client.patch(f"/reports/{report.id}", json={"aspirations": "Later"},
+                        headers={"If-Match": first.headers["etag"]}).status_code == 200
+    assert client.patch(f"/reports/{report.id}", json={"aspirations": "x"},
+                        headers={"If-Match": f'W/"{report.id}.3", "999.3"'}).status_code == 412
+    assert client.put(f"/reports/{report.id}", json=REPORT, headers={"If-Match": "*"}).json()["version"] == 4
+    assert client.put("/reports/999", json=REPORT, headers={"If-Match": '"999.1"'}).status_code == 404
+
+    # The mentee/week read carries the same ETag
+    week = client.get(f"/reports/mentees/{mentee.id}/weeks/2024/10")
+    assert week.headers["etag"] == f'"{report.id}.4"'
+
+
+def test_patch_writes_only_the_fields_given(client, db_session, sql_statements, mentee, make_report):
+    report = make_report(mentee, 10, 2024, aspirations="Keep going")
+    make_report(mentee, 11, 2024)
+
+    sql_statements.clear()
+    patched = client.patch(f"/reports/{report.id}", json={"accomplishments": "Edited"})
+    assert patched.status_code == 200 and len(sql_statements) == 1
+    assert "aspirations" not in sql_statements[0].split(" RETURNING ")[0]
+    assert (patched.json()["accomplishments"], patched.json()["aspirations"]) == ("Edited", "Keep going")
+
+    moved = client.patch(f"/reports/{report.id}", json={"week_number": 12, "year": 2024})
+    assert (moved.json()["week_number"], moved.json()["version"]) == (12, 3)
+    db_session.expire_all()
+    assert db_session.get(WeeklyReport, report.id).iso_week_start == date(2024, 3, 18)
+
+    assert client.patch(f"/reports/{report.id}", json={"week_number": 11, "year": 2024}).status_code == 400
+    assert client.patch(f"/reports/{report.id}", json={"week_number": 13}).status_code == 400
+    for week_number, year in ((60, 2024), (53, 2024), (10, 10000)):
+        assert client.patch(f"/reports/{report.id}", json={"week_number": week_number, "year": year}).status_code == 422
+    assert client.patch(f"/reports/{report.id}", json={}).status_code == 400
+    assert client.patch("/reports/999", json={"aspirations": "x"}).status_code == 404
+
+
+def test_orm_writes_check_the_version(db_session, mentee, make_report):
+    report = make_report(mentee, 10, 2024)
+    assert report.version == 1
+    report.aspirations = "Changed"
+    db_session.commit()
+    assert report.version == 2
@@ -0,0 +1,83 @@
+"""
+Tests for full-text search over report bodies
+"""
+
+from app.utils.security import create_token
+
+
+def test_search_is_scoped_ranked_and_highlighted(client, login_as, make_user, make_report):
+    mentor = login_as(make_user("Mentor"))
+    other_mentor = make_user("Other Mentor")
+    mentee = make_user("Mentee", mentor=mentor)
+    other_mentee = make_user("Other Mentee", mentor=other_mentor)
+
+    blocked = make_report(mentee, 1, 2024, blockers_concerns_comments="The deploy pipeline is broken again")
+    mentioned = make_report(mentee, 2, 2024, accomplishments="Sped up the deploy pipeline, deploy pipeline docs",
+                            blockers_concerns_comments="None")
+    make_report(mentee, 3, 2024, accomplishments="Wrote tests")
+    make_report(other_mentee, 1, 2024, blockers_concerns_comments="Deploy pipeline flaky")
+
+    response = client.get(f"/reports/mentors/{mentor.id}/search", params={"q": '"deploy pipeline"'})
+    assert response.status_code == 200
+    hits = response.json()["items"]
+    assert [hit["report"]["id"] for hit in hits] == [mentioned.id, blocked.id]
+    assert hits[0]["rank"] > hits[1]["rank"]
+    assert "The <mark>deploy pipeline</mark> is broken" in hits[1]["highlights"]["blockers_concerns_comments"]
+
+    blockers_only = client.get(
+        f"/reports/mentors/{mentor.id}/search",
+        params={"q": "deploying", "fields": "blockers_concerns_comments"}
+    ).json()["items"]
+    assert [hit["report"]["id"] for hit in blockers_only] == [blocked.id]
+    assert list(blockers_only[0]["highlights"]) == ["blockers_concerns_comments"]
+
+
+def test_search_follows_updates_and_deletes(client, login_as, make_user, make_report):
+    mentor = make_user("Mentor")
+    mentee = login_as(make_user("Mentee", mentor=mentor))
+    report = make_report(mentee, 1, 2024)
+    headers = {"Authorization": f"Bearer {create_token(mentor.id)}"}
+    search = lambda q: client.get(f"/reports/mentors/{mentor.id}/search", params={"q": q}, headers=headers).json()["items"]
+
+    assert search("kubernetes") == []
+    client.put(f"/reports/{report.id}", json={
+        "week_number": 1, "year": 2024, "accomplishments": "Migrated to Kubernetes",
+        "blockers_concerns_comments": "None", "aspirations": "More infra work"
+    })
+    assert [hit["report"]["id"] for hit in search("kube*")] == [report.id]
+
+    client.delete(f"/reports/{report.id}")
+    assert search("kubernetes") == []
+
+
+def test_search_paginates_and_validates(client, login_as, make_user, make_report):
+    mentor = login_as(make_user("Mentor"))
+    mentee = make_user("Mentee", mentor=mentor)
+    for week in range(1, 6):
+        make_report(mentee, week, 2024, accomplishments="Shipped the release")
+
+    seen, offset = [], 0
+    while offset is not None:
+        page = client.get(f"/reports/mentors/{mentor.id}/search",
+                          params={"q": "release", "limit": 2, "offset": offset}).json()
+        seen.extend(hit["report"]["id"] for hit in page["items"])
+        offset = page["next_offset"]
+    assert len(seen) == len(set(seen)) == 5
+
+    assert client.get(f"/reports/mentors/{mentor.id}/search", params={"q": "* ( -"}).status_code == 400
+    assert client.get(f"/reports/mentors/{mentor.id}/search", params={"q": "x", "fields": "name"}).status_code == 400
+    assert client.get(f"/reports/mentors/{mentee.id}/search", params={"q": "release"}).status_code == 403
+
+
+def test_search_excerpts_escape_report_markup(client, login_as, make_user, make_report):
+    mentor = login_as(make_user("Mentor"))
+    mentee = make_user("Mentee", mentor=mentor)
+    make_report(mentee, 1, 2024, accomplishments="Fixed <script>alert(1)</script> in the <mark>deploy</mark> pipeline")
+
+    hit, = client.get(f"/reports/mentors/{mentor.id}/search", params={"q": "script pipeline"}).json()["items"]
+    assert hit["highlights"]["accomplishments"] == (
+        "Fixed &lt;<mark>script</mark>&gt;alert(1)&lt;/<mark>script</mark>&gt; in the "
+        "&lt;mark&gt;deploy&lt;/mark&gt; <mark>pipeline</mark>"
+    )
+    # Hits are summaries; the text comes from GET /reports/{report_id}
+    assert "accomplishments" not in hit["report"] and hit["report"]["mentee_name"] == "Mentee"
@@ -0,0 +1,37 @@
+"""
+Tests for the multi-worker launch mode: fork safety and the serve command's startup checks
+"""
+
+import os
+
+import models
+from app.cli import main
+from app.utils import security
+
+
+def test_forked_child_gets_fresh_pools_and_hashing_threads():
+    parent_pools = (models.engine.pool, models.async_engine.sync_engine.pool, security._executor)
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        child_pools = (models.engine.pool, models.async_engine.sync_engine.pool, security._executor)
+        fresh = all(child is not parent for child, parent in zip(child_pools, parent_pools))
+        os.write(write_end, b"1" if fresh else b"0")
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read_end, 1) == b"1"
+    # The parent keeps its own
+    assert (models.engine.pool, models.async_engine.sync_engine.pool, security._executor) == parent_pools
+
+
+def test_serve_refuses_several_workers_without_a_shared_secret(monkeypatch, capsys):
+    monkeypatch.delenv("SECRET_KEY", raising=False)
+    assert main(["serve", "--workers", "2"]) == 2
+    assert "SECRET_KEY" in capsys.readouterr().err
+
+
+def test_serve_refuses_a_database_behind_the_migrations(monkeypatch, capsys, tmp_path):
+    monkeypatch.setenv("SECRET_KEY", "test")
+    monkeypatch.setattr("app.cli.engine", models.create_db_engine(f"sqlite:///{tmp_path / 'empty.db'}"))
+    assert main(["serve", "--workers", "2"]) == 1
+    assert "db upgrade" in capsys.readouterr().err